@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -49,6 +49,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'translation_service.middleware.profiling_middleware',
+    'django.middleware.gzip.GZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -153,7 +155,80 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # API Keys and Configuration
 LOKALISE_API_KEY = config('LOKALISE_API_KEY', default='')
 LOKALISE_PROJECT_ID = config('LOKALISE_PROJECT_ID', default='')
+# File uploads: bigger files are spooled to disk and streamed to Lokalise
+LOKALISE_UPLOAD_MAX_SIZE = config('LOKALISE_UPLOAD_MAX_SIZE', default=500 * 1024 * 1024, cast=int)
+LOKALISE_STREAMING_UPLOAD_THRESHOLD = config('LOKALISE_STREAMING_UPLOAD_THRESHOLD', default=2 * 1024 * 1024, cast=int)
+LOKALISE_UPLOAD_CHUNK_SIZE = config('LOKALISE_UPLOAD_CHUNK_SIZE', default=3 * 256 * 1024, cast=int)
+LOKALISE_UPLOAD_TIMEOUT_SECONDS = config('LOKALISE_UPLOAD_TIMEOUT_SECONDS', default=600.0, cast=float)
+FILE_UPLOAD_MAX_MEMORY_SIZE = LOKALISE_STREAMING_UPLOAD_THRESHOLD
+# Bulk uploads: Lokalise allows about 6 requests per second per token
+BULK_UPLOAD_MAX_FILES = config('BULK_UPLOAD_MAX_FILES', default=1000, cast=int)
+LOKALISE_UPLOAD_CONCURRENCY = config('LOKALISE_UPLOAD_CONCURRENCY', default=4, cast=int)
+LOKALISE_REQUESTS_PER_SECOND = config('LOKALISE_REQUESTS_PER_SECOND', default=5.0, cast=float)
+LOKALISE_PROCESS_POLL_INTERVAL_SECONDS = config('LOKALISE_PROCESS_POLL_INTERVAL_SECONDS', default=2.0, cast=float)
+LOKALISE_PROCESS_POLL_TIMEOUT_SECONDS = config('LOKALISE_PROCESS_POLL_TIMEOUT_SECONDS', default=300.0, cast=float)
+# Exported bundles are cached under TRANSLATION_STATE_DIR/exports
+EXPORT_CACHE_MAX_AGE_SECONDS = config('EXPORT_CACHE_MAX_AGE_SECONDS', default=3600, cast=int)
+EXPORT_FINGERPRINT_TTL_SECONDS = config('EXPORT_FINGERPRINT_TTL_SECONDS', default=30.0, cast=float)
+# Split JSON/YAML uploads into chunks of this many keys (`split` option)
+LOKALISE_UPLOAD_KEYS_PER_CHUNK = config('LOKALISE_UPLOAD_KEYS_PER_CHUNK', default=2000, cast=int)
 OPEN_ROUTER_API_KEY = config('OPEN_ROUTER_API_KEY', default='')
+# Point at translation_service.utils.fake_openrouter for offline runs and benchmarks
+OPEN_ROUTER_BASE_URL = config('OPEN_ROUTER_BASE_URL', default='https://openrouter.ai/api/v1')
+OPEN_ROUTER_MAX_RETRIES = config('OPEN_ROUTER_MAX_RETRIES', default=3, cast=int)
+OPEN_ROUTER_RETRY_BACKOFF_SECONDS = config('OPEN_ROUTER_RETRY_BACKOFF_SECONDS', default=0.5, cast=float)
+OPEN_ROUTER_TIMEOUT_SECONDS = config('OPEN_ROUTER_TIMEOUT_SECONDS', default=60.0, cast=float)
+
+# LLM model routing
+LLM_MODEL = config('LLM_MODEL', default='openai/gpt-4o-mini')
+LLM_FALLBACK_MODELS = config('LLM_FALLBACK_MODELS', default='google/gemini-2.0-flash-001', cast=Csv())
+# Hedge delay used until a model has enough latency samples for a p95 deadline
+LLM_HEDGE_DELAY_SECONDS = config('LLM_HEDGE_DELAY_SECONDS', default=8.0, cast=float)
+
+# Translation pipeline
+# Local state kept by the services (source hashes, caches, ...)
+TRANSLATION_STATE_DIR = Path(config('TRANSLATION_STATE_DIR', default=str(BASE_DIR / 'var')))
+# LLM requests in flight per worker process, across all runs and event loops
+TRANSLATION_CONCURRENCY = config('TRANSLATION_CONCURRENCY', default=10, cast=int)
+TRANSLATION_MEMORY_SIZE = config('TRANSLATION_MEMORY_SIZE', default=50000, cast=int)
+GLOSSARY_CACHE_SIZE = config('GLOSSARY_CACHE_SIZE', default=50000, cast=int)
+# Scheduling order of translation work (criteria: tagged, new, short)
+TRANSLATION_PRIORITY_ORDER = config('TRANSLATION_PRIORITY_ORDER', default='tagged,new,short', cast=Csv())
+TRANSLATION_PRIORITY_TAGS = config('TRANSLATION_PRIORITY_TAGS', default='release', cast=Csv())
+# Retries when a translation loses or duplicates a masked placeholder
+PLACEHOLDER_MAX_RETRIES = config('PLACEHOLDER_MAX_RETRIES', default=2, cast=int)
+# Product names and other terms copied to every language without translation
+DO_NOT_TRANSLATE_TERMS = config('DO_NOT_TRANSLATE_TERMS', default='Lokalise', cast=Csv())
+# Per-call latency used by dry-run estimates until the model router has samples
+TRANSLATION_ESTIMATED_LATENCY_SECONDS = config('TRANSLATION_ESTIMATED_LATENCY_SECONDS', default=3.0, cast=float)
+
+# Quality checks: 'native' (built-in BLEU) or 'nltk'
+BLEU_ENGINE = config('BLEU_ENGINE', default='native')
+# chrF word n-gram order: 0 for chrF, 2 for chrF++
+CHRF_WORD_ORDER = config('CHRF_WORD_ORDER', default=2, cast=int)
+QUALITY_BATCH_MAX_PAIRS = config('QUALITY_BATCH_MAX_PAIRS', default=50000, cast=int)
+# Batches this large are scored across a process pool (0 workers = one per CPU)
+QUALITY_BATCH_PROCESS_THRESHOLD = config('QUALITY_BATCH_PROCESS_THRESHOLD', default=5000, cast=int)
+QUALITY_BATCH_WORKERS = config('QUALITY_BATCH_WORKERS', default=0, cast=int)
+
+# Run results: details are paged from files under TRANSLATION_STATE_DIR/runs
+RESULT_PAGE_SIZE = config('RESULT_PAGE_SIZE', default=500, cast=int)
+RESULT_PAGE_MAX_SIZE = config('RESULT_PAGE_MAX_SIZE', default=5000, cast=int)
+RESULT_STORE_RETENTION_SECONDS = config('RESULT_STORE_RETENTION_SECONDS', default=7 * 24 * 3600, cast=int)
+
+# Opt-in profiling: `X-Profile: 1` profiles a request when enabled, PROFILE_ALL_REQUESTS every request.
+# Profiles are kept under TRANSLATION_STATE_DIR/profiles
+REQUEST_PROFILING_ENABLED = config('REQUEST_PROFILING_ENABLED', default=False, cast=bool)
+PROFILE_ALL_REQUESTS = config('PROFILE_ALL_REQUESTS', default=False, cast=bool)
+PROFILE_SAMPLE_INTERVAL_SECONDS = config('PROFILE_SAMPLE_INTERVAL_SECONDS', default=0.005, cast=float)
+PROFILE_RETENTION_SECONDS = config('PROFILE_RETENTION_SECONDS', default=24 * 3600, cast=int)
+
+# Tracing: spans of each run go to 'jsonl' (TRANSLATION_STATE_DIR/traces) and/or 'otlp' (OTLP/HTTP JSON collector)
+TRACE_EXPORTERS = config('TRACE_EXPORTERS', default='jsonl', cast=Csv())
+TRACE_OTLP_ENDPOINT = config('TRACE_OTLP_ENDPOINT', default='http://localhost:4318/v1/traces')
+TRACE_OTLP_TIMEOUT_SECONDS = config('TRACE_OTLP_TIMEOUT_SECONDS', default=5.0, cast=float)
+TRACE_MAX_SPANS = config('TRACE_MAX_SPANS', default=50000, cast=int)
+TRACE_RETENTION_SECONDS = config('TRACE_RETENTION_SECONDS', default=7 * 24 * 3600, cast=int)
 
 # REST Framework settings
 REST_FRAMEWORK = {
@@ -161,6 +236,10 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_RENDERER_CLASSES': [
+        'translation_service.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 # Redis Configuration (for Celery)
@@ -18,10 +18,12 @@ from django.urls import path, include, re_path
 from django.views.generic import TemplateView
 from django.conf import settings
 from django.conf.urls.static import static
+from translation_service.views import metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('translation_service.urls')),
+    path('metrics', metrics, name='metrics'),
     # Serve frontend for all other routes
-    re_path(r'^(?!api/).*$', TemplateView.as_view(template_name='index.html')),
+    re_path(r'^(?!api/|metrics$).*$', TemplateView.as_view(template_name='index.html')),
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
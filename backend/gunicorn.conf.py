@@ -0,0 +1,42 @@
+"""
+Gunicorn settings, read automatically from the working directory
+
+SERVER_MODE selects how the Django app is served:
+    wsgi: sync workers running core.wsgi (default)
+    asgi: uvicorn workers running core.asgi; async views run natively, so one
+          worker serves many concurrent translation runs
+"""
+import os
+
+server_mode = os.environ.get('SERVER_MODE', 'wsgi')
+if server_mode not in ('wsgi', 'asgi'):
+    raise Exception(f"Unknown SERVER_MODE: {server_mode}")
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', '1'))
+
+if server_mode == 'asgi':
+    wsgi_app = 'core.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    # Long translation runs keep a request open while the worker stays responsive
+    timeout = int(os.environ.get('GUNICORN_TIMEOUT', '600'))
+else:
+    wsgi_app = 'core.wsgi:application'
+    timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+
+
+def post_worker_init(worker):
+    """Build the service singletons before the worker accepts requests"""
+    from translation_service.services import registry
+    try:
+        registry.warm_up()
+    except Exception as e:
+        # Services are built lazily on the first request instead
+        print(f"Service warm-up failed: {str(e)}")
+
+
+def child_exit(server, worker):
+    """Drop the metrics of a finished worker when they are aggregated across workers"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,10 +1,15 @@
 import pytest
 from unittest.mock import MagicMock, patch
-from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from translation_service.views import TranslationViewSet
 
+@pytest.fixture(autouse=True)
+def translation_state_dir(settings, tmp_path):
+    """Keep state written by the services out of the source tree"""
+    settings.TRANSLATION_STATE_DIR = tmp_path / 'var'
+    return settings.TRANSLATION_STATE_DIR
+
 @pytest.fixture
 def mock_lokalise_client():
     """Mock Lokalise client for testing"""
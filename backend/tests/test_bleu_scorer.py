@@ -1,6 +1,24 @@
+import warnings
 import pytest
 from unittest.mock import MagicMock, patch
-from translation_service.utils.bleu_scorer import preprocess_text, compute_bleu_score
+from concurrent.futures import ProcessPoolExecutor
+from translation_service.utils.bleu_scorer import (
+    preprocess_text,
+    compute_bleu_score,
+    compute_bleu_scores,
+    benchmark,
+    corpus_bleu,
+    score_bleu_batch,
+    bleu_from_statistics,
+    chrf_statistics,
+    chrf_from_statistics,
+    compute_chrf_score,
+    score_translation_batch,
+    merge_batch_scores,
+    score_pairs,
+    _random_pairs,
+    SMOOTHING_METHODS,
+)
 
 
 def test_preprocess_text():
@@ -71,5 +89,133 @@ def test_compute_bleu_score():
 def test_compute_bleu_score_nltk_error(mock_sentence_bleu):
     """Test BLEU score computation with NLTK error"""
     mock_sentence_bleu.side_effect = Exception("NLTK Error")
-    score = compute_bleu_score("Test", "Test")
-    assert score == 0.0
\ No newline at end of file
+    score = compute_bleu_score("Test", "Test", engine='nltk')
+    assert score == 0.0
+
+
+@pytest.mark.parametrize('smoothing', list(SMOOTHING_METHODS))
+def test_native_engine_matches_nltk(smoothing):
+    """Test the native engine reproduces NLTK's scores"""
+    pairs = _random_pairs(200, seed=1) + [
+        ("This is a test sentence", "This is a trial sentence"),
+        ("The quick brown fox", "The quick brown fox jumps over the lazy dog"),
+        ("one two three four five six", "one two"),
+        ("a a a a", "a a a a a a a"),
+    ]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # NLTK warns on zero n-gram overlaps
+        nltk_scores = compute_bleu_scores(pairs, engine='nltk', smoothing=smoothing)
+    native_scores = compute_bleu_scores(pairs, engine='native', smoothing=smoothing)
+
+    for native, expected in zip(native_scores, nltk_scores):
+        assert native == pytest.approx(expected, rel=1e-9, abs=1e-12)
+
+
+def test_native_engine_is_default(settings):
+    """Test the engine comes from settings and NLTK is not called by default"""
+    settings.BLEU_ENGINE = 'native'
+    with patch('translation_service.utils.bleu_scorer.sentence_bleu') as mock_sentence_bleu:
+        assert compute_bleu_score("This is a test", "This is a test") == 1.0
+    mock_sentence_bleu.assert_not_called()
+
+
+def test_compute_bleu_score_unknown_options():
+    """Test unknown engines and smoothing methods score 0"""
+    assert compute_bleu_score("Test", "Test", engine='other') == 0.0
+    assert compute_bleu_score("Test", "Test", smoothing='other') == 0.0
+
+
+@pytest.mark.parametrize('smoothing', list(SMOOTHING_METHODS))
+def test_corpus_bleu_matches_nltk(smoothing):
+    """Test corpus BLEU sums statistics over pairs like NLTK's corpus_bleu"""
+    from nltk.translate.bleu_score import corpus_bleu as nltk_corpus_bleu, SmoothingFunction
+    pairs = _random_pairs(100, seed=3)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        expected = nltk_corpus_bleu(
+            [[preprocess_text(reference)] for reference, _ in pairs],
+            [preprocess_text(candidate) for _, candidate in pairs],
+            smoothing_function=getattr(SmoothingFunction(), SMOOTHING_METHODS[smoothing])
+        )
+    assert corpus_bleu(pairs, smoothing=smoothing) == pytest.approx(expected, rel=1e-9)
+
+
+def test_score_bleu_batch_statistics_add_up():
+    """Test batch statistics of split batches add up to the whole"""
+    pairs = _random_pairs(50, seed=4)
+    scores, statistics = score_bleu_batch(pairs, engine='native')
+    first_scores, first = score_bleu_batch(pairs[:20], engine='native')
+    second_scores, second = score_bleu_batch(pairs[20:], engine='native')
+
+    assert scores == first_scores + second_scores
+    assert statistics == [a + b for a, b in zip(first, second)]
+    assert bleu_from_statistics(statistics) == corpus_bleu(pairs)
+    assert scores == compute_bleu_scores(pairs, engine='native')
+
+
+def test_benchmark():
+    """Test the benchmark reports both engines and agreeing scores"""
+    result = benchmark(_random_pairs(20, seed=2), smoothing='epsilon')
+    assert result['pairs'] == 20
+    assert set(result['seconds']) == {'native', 'nltk'}
+    assert result['max_abs_difference'] < 1e-9
+
+
+def test_preprocess_text_character_languages():
+    """Test zh/ja texts are tokenized per character, keeping Latin words whole"""
+    assert preprocess_text("我喜欢Python编程。", "zh_CN") == ["我", "喜", "欢", "python", "编", "程"]
+    assert preprocess_text("これはテストです！", "ja") == ["こ", "れ", "は", "テ", "ス", "ト", "で", "す"]
+    # Other languages keep whitespace tokenization
+    assert preprocess_text("我喜欢 编程", "ko") == ["我喜欢", "编程"]
+
+
+def test_compute_bleu_score_chinese():
+    """Test BLEU is meaningful for Chinese once tokenized per character"""
+    reference = "今天天气很好，我们去公园散步吧。"
+    candidate = "今天天气很好，我们去公园走走吧。"
+    assert compute_bleu_score(reference, candidate) == 0.0
+    assert 0.5 < compute_bleu_score(reference, candidate, "zh_CN") < 1.0
+
+
+def test_compute_chrf_score():
+    """Test chrF averages character n-gram precision and recall"""
+    assert compute_chrf_score("Hola mundo", "Hola mundo") == 1.0
+    assert compute_chrf_score("Hola", "") == 0.0
+    # Orders 1-3 present in both: precision = recall = (2/3 + 1/2 + 0) / 3
+    assert compute_chrf_score("abc", "abd", word_order=0) == pytest.approx(7 / 18)
+    # chrF++ also counts word unigrams and bigrams
+    chrf = compute_chrf_score("the cat sat", "the cat sits", word_order=0)
+    chrf_plus_plus = compute_chrf_score("the cat sat", "the cat sits", word_order=2)
+    assert chrf != chrf_plus_plus
+
+
+def test_chrf_statistics_layout():
+    """Test chrF statistics hold (candidate, reference, matches) per order"""
+    statistics = chrf_statistics("a b", "a c", word_order=1, char_order=2)
+    assert statistics == [2, 2, 1, 1, 1, 0, 2, 2, 1]
+    assert chrf_from_statistics(statistics) == pytest.approx((0.5 + 0 + 0.5) / 3)
+
+
+def test_score_translation_batch_merge():
+    """Test merged batch results equal scoring everything at once"""
+    pairs = _random_pairs(30, seed=5)
+    whole = score_translation_batch(pairs, engine='native')
+    merged = merge_batch_scores([
+        score_translation_batch(pairs[:10], engine='native'),
+        score_translation_batch(pairs[10:], engine='native'),
+    ])
+    assert merged == whole
+    assert len(whole['chrf_scores']) == 30
+
+def test_score_pairs_process_pool(settings):
+    """Test big batches are scored across processes with the same results"""
+    pairs = _random_pairs(12, seed=7)
+    expected = score_pairs(pairs, 'es')
+
+    settings.QUALITY_BATCH_PROCESS_THRESHOLD = 4
+    settings.QUALITY_BATCH_WORKERS = 2
+    with patch('translation_service.utils.bleu_scorer.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as mock_pool:
+        result = score_pairs(pairs, 'es')
+
+    mock_pool.assert_called_once_with(max_workers=2)
+    assert result == expected
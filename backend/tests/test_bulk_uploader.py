@@ -0,0 +1,239 @@
+import pytest
+import io
+import tempfile
+import zipfile
+from unittest.mock import MagicMock, patch
+from translation_service.services.bulk_uploader import BulkUploader
+
+
+@pytest.fixture
+def uploader(settings):
+    settings.LOKALISE_REQUESTS_PER_SECOND = 0
+    settings.LOKALISE_PROCESS_POLL_INTERVAL_SECONDS = 0.01
+    lokalise_service = MagicMock()
+    lokalise_service.upload_file.side_effect = lambda file, filename, **kwargs: {
+        "process_id": f"p-{filename}", "file_format": "JSON"
+    }
+    return BulkUploader(lokalise_service=lokalise_service)
+
+def make_archive(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+@pytest.mark.asyncio
+async def test_upload_and_poll_in_one_loop(uploader):
+    """Test every process is polled with one request per cycle until it ends"""
+    polls = []
+
+    def statuses(process_ids, throttle):
+        polls.append(sorted(process_ids))
+        if len(polls) == 1:
+            return {pid: {"status": "running", "message": "", "details": {}} for pid in process_ids}
+        return {
+            "p-en.json": {"status": "finished", "message": "", "details": {"files": []}},
+            "p-fr.json": {"status": "failed", "message": "Invalid JSON", "details": {}},
+        }
+    uploader.lokalise_service.get_process_statuses.side_effect = statuses
+
+    outcomes = await uploader.upload(
+        [("en.json", io.BytesIO(b"{}")), ("fr.json", io.BytesIO(b"{")), ("notes.txt", io.BytesIO(b""))],
+        lang_iso="en"
+    )
+
+    assert polls == [["p-en.json", "p-fr.json"], ["p-en.json", "p-fr.json"]]
+    assert [o["status"] for o in outcomes] == ["success", "error", "skipped"]
+    assert outcomes[0]["process_status"] == "finished"
+    assert outcomes[1]["error"] == "Invalid JSON"
+    assert uploader.lokalise_service.upload_file.call_count == 2
+
+@pytest.mark.asyncio
+async def test_upload_errors_and_no_wait(uploader):
+    """Test failed uploads are reported and `wait=False` skips polling"""
+    def upload_file(file, filename, **kwargs):
+        if filename == "bad.json":
+            raise Exception("Error uploading file: quota")
+        return {"process_id": "p-1"}
+    uploader.lokalise_service.upload_file.side_effect = upload_file
+
+    outcomes = await uploader.upload(
+        [("bad.json", io.BytesIO(b"{}")), ("good.json", io.BytesIO(b"{}"))],
+        lang_iso="en",
+        wait=False
+    )
+
+    assert outcomes[0] == {"filename": "bad.json", "status": "error", "error": "Error uploading file: quota"}
+    assert outcomes[1]["status"] == "pending"
+    uploader.lokalise_service.get_process_statuses.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_uploads_are_bounded(uploader, settings):
+    """Test at most LOKALISE_UPLOAD_CONCURRENCY uploads run at once"""
+    import threading
+    import time
+    settings.LOKALISE_UPLOAD_CONCURRENCY = 2
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def upload_file(file, filename, **kwargs):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return {"process_id": filename}
+    uploader.lokalise_service.upload_file.side_effect = upload_file
+
+    await uploader.upload([(f"{i}.json", io.BytesIO(b"{}")) for i in range(6)], lang_iso="en", wait=False)
+
+    assert max_running == 2
+
+@pytest.mark.asyncio
+async def test_poll_timeout_leaves_pending(uploader, settings):
+    """Test imports still running at the deadline are reported as pending"""
+    settings.LOKALISE_PROCESS_POLL_TIMEOUT_SECONDS = 0
+    uploader.lokalise_service.get_process_statuses.return_value = {
+        "p-en.json": {"status": "running", "message": "", "details": {}}
+    }
+
+    outcomes = await uploader.upload([("en.json", io.BytesIO(b"{}"))], lang_iso="en")
+
+    assert outcomes[0]["status"] == "pending"
+    assert outcomes[0]["process_status"] == "running"
+
+@pytest.mark.asyncio
+async def test_split_upload_merges_chunk_reports(uploader, settings):
+    """Test big files upload as parallel chunks and report as one file"""
+    import json
+    settings.LOKALISE_UPLOAD_KEYS_PER_CHUNK = 2
+    uploaded = []
+
+    def upload_file(file, filename, **kwargs):
+        uploaded.append(json.loads(file.read()))
+        return {"process_id": f"p{len(uploaded)}", "file_format": "JSON"}
+    uploader.lokalise_service.upload_file.side_effect = upload_file
+    uploader.lokalise_service.get_process_statuses.side_effect = lambda ids, throttle: {
+        pid: {"status": "finished", "message": "", "details": {"files": [
+            {"name_original": "en.json", "key_count_total": 2, "key_count_inserted": 1, "status": "finished"}
+        ]}} for pid in ids
+    }
+
+    data = {f"key_{i}": str(i) for i in range(5)}
+    outcomes = await uploader.upload(
+        [("en.json", io.BytesIO(json.dumps(data).encode())), ("fr.json", io.BytesIO(b'{"a": "b"}'))],
+        lang_iso="en",
+        split=True
+    )
+
+    assert sorted(map(len, uploaded)) == [1, 1, 2, 2]
+    assert outcomes[0]["status"] == "success"
+    assert outcomes[0]["chunks"] == 3
+    assert len(outcomes[0]["process_ids"]) == 3
+    assert outcomes[0]["details"] == {"key_count_total": 6, "key_count_inserted": 3}
+    assert outcomes[1]["status"] == "success"
+    assert "chunks" not in outcomes[1]
+
+@pytest.mark.asyncio
+async def test_split_upload_reports_failures(uploader, settings):
+    """Test unparseable files and failed chunks mark the file as failed"""
+    import json
+    settings.LOKALISE_UPLOAD_KEYS_PER_CHUNK = 1
+    uploader.lokalise_service.get_process_statuses.side_effect = lambda ids, throttle: {
+        pid: {"status": "failed" if pid.endswith("1") else "finished", "message": "Bad chunk", "details": {}}
+        for pid in ids
+    }
+    counter = iter(range(1, 10))
+    uploader.lokalise_service.upload_file.side_effect = lambda file, filename, **kwargs: {"process_id": f"p{next(counter)}"}
+
+    outcomes = await uploader.upload(
+        [("broken.json", io.BytesIO(b"{")), ("en.json", io.BytesIO(json.dumps({"a": "1", "b": "2"}).encode()))],
+        lang_iso="en",
+        split=True
+    )
+
+    assert outcomes[0]["status"] == "error"
+    assert "Could not parse broken.json" in outcomes[0]["error"]
+    assert outcomes[1]["status"] == "error"
+    assert outcomes[1]["error"].endswith("Bad chunk")
+
+@pytest.mark.asyncio
+async def test_diff_upload_sends_only_changed_keys(uploader):
+    """Test diffed uploads carry new/changed keys, overwrite them and report the rest"""
+    import json
+    uploader.lokalise_service.get_all_keys.return_value = [
+        {"key_name": {"web": "a"}, "translations": [{"language_iso": "en", "translation": "A"}]},
+        {"key_name": {"web": "b"}, "translations": [{"language_iso": "en", "translation": "old"}]},
+        {"key_name": {"web": "x"}, "translations": [{"language_iso": "en", "translation": "X"}]},
+    ]
+    sent = []
+
+    def upload_file(file, filename, **kwargs):
+        content = file.read()
+        sent.append((filename, json.loads(content) if filename.endswith(".json") else content, kwargs["replace_modified"]))
+        return {"process_id": filename}
+    uploader.lokalise_service.upload_file.side_effect = upload_file
+
+    outcomes = await uploader.upload(
+        [
+            ("en.json", io.BytesIO(json.dumps({"a": "A", "b": "new", "c": "C"}).encode())),
+            ("same.json", io.BytesIO(json.dumps({"x": "X"}).encode())),
+            ("en.xml", io.BytesIO(b"<resources/>")),
+        ],
+        lang_iso="en",
+        wait=False,
+        diff=True
+    )
+
+    # Formats that are not diffed upload whole, without overwriting translations
+    assert sent == [("en.json", {"b": "new", "c": "C"}, True), ("en.xml", b"<resources/>", False)]
+    assert "diff" not in outcomes[2]
+    assert outcomes[0]["diff"] == {"new_keys": 1, "changed_keys": 1, "skipped_keys": ["a"]}
+    assert outcomes[1]["status"] == "skipped"
+    assert outcomes[1]["diff"]["skipped_keys"] == ["x"]
+    uploader.lokalise_service.get_all_keys.assert_called_once_with(include_translations=True)
+
+def test_expand_archive(settings):
+    """Test supported members are extracted and the rest reported"""
+    settings.LOKALISE_UPLOAD_MAX_SIZE = 100
+    archive = make_archive({
+        "locales/en.json": '{"a": "b"}',
+        "locales/fr.yml": "a: b",
+        "README.md": "docs",
+        "locales/huge.json": "x" * 200,
+        "__MACOSX/locales/._en.json": "",
+    })
+
+    files, skipped = BulkUploader.expand_archive(archive)
+
+    assert [name for name, _ in files] == ["locales/en.json", "locales/fr.yml"]
+    assert files[0][1].read() == b'{"a": "b"}'
+    for _, file in files:
+        file.close()
+    assert skipped == [
+        {"filename": "README.md", "status": "skipped", "reason": "Unsupported file type"},
+        {"filename": "locales/huge.json", "status": "skipped", "reason": "File too large"},
+    ]
+
+def test_expand_archive_errors(settings):
+    """Test invalid archives and archives with too many files are rejected"""
+    with pytest.raises(Exception, match="not a valid zip"):
+        BulkUploader.expand_archive(io.BytesIO(b"not a zip"))
+
+    settings.BULK_UPLOAD_MAX_FILES = 1
+    spooled = []
+    original = tempfile.SpooledTemporaryFile
+
+    def spool(*args, **kwargs):
+        spooled.append(original(*args, **kwargs))
+        return spooled[-1]
+    with patch("translation_service.services.bulk_uploader.tempfile.SpooledTemporaryFile", side_effect=spool):
+        with pytest.raises(Exception, match="more than 1 files"):
+            BulkUploader.expand_archive(make_archive({"en.json": "{}", "fr.json": "{}"}))
+
+    assert len(spooled) == 1 and spooled[0].closed
@@ -0,0 +1,72 @@
+import pytest
+import asyncio
+import threading
+from translation_service.utils.concurrency_limit import ConcurrencyLimit
+
+
+def test_limit_holds_across_event_loops():
+    """Test tasks on loops in different threads share the same slots"""
+    limit = ConcurrencyLimit(2)
+    in_flight = 0
+    max_in_flight = 0
+    counter_lock = threading.Lock()
+
+    async def work():
+        nonlocal in_flight, max_in_flight
+        async with limit:
+            with counter_lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            with counter_lock:
+                in_flight -= 1
+
+    async def run_many():
+        await asyncio.gather(*(work() for _ in range(5)))
+
+    threads = [threading.Thread(target=asyncio.run, args=(run_many(),)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max_in_flight == 2
+    assert limit.in_use == 0
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_frees_its_place():
+    """Test cancelling a waiting task neither leaks nor double-frees a slot"""
+    limit = ConcurrencyLimit(1)
+    await limit.acquire()
+    waiter = asyncio.ensure_future(limit.acquire())
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    limit.release()
+
+    assert limit.in_use == 0
+    async with limit:
+        assert limit.in_use == 1
+
+@pytest.mark.asyncio
+async def test_cancelled_after_hand_over_releases_slot():
+    """Test a slot handed to a task cancelled before it resumed is given back"""
+    limit = ConcurrencyLimit(1)
+    await limit.acquire()
+    waiter = asyncio.ensure_future(limit.acquire())
+    await asyncio.sleep(0)
+
+    limit.release()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await asyncio.sleep(0)
+
+    assert limit.in_use == 0
+
+def test_invalid_limit():
+    """Test the limit must allow at least one task"""
+    with pytest.raises(Exception):
+        ConcurrencyLimit(0)
@@ -0,0 +1,97 @@
+import pytest
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+from translation_service.services.export_cache import ExportCache
+
+
+@pytest.fixture
+def lokalise_service():
+    service = MagicMock()
+    service.project_id = "project.1"
+    service.get_all_keys.return_value = [
+        {"key_id": 1, "modified_at_timestamp": 100, "translations_modified_at_timestamp": 150},
+        {"key_id": 2, "modified_at_timestamp": 120, "translations_modified_at_timestamp": None},
+    ]
+    service.exports = 0
+
+    def download_bundle(file_format, destination, languages=None):
+        service.exports += 1
+        time.sleep(0.05)
+        destination.write_bytes(f"{file_format}:{languages}:{service.exports}".encode())
+    service.download_bundle.side_effect = download_bundle
+    return service
+
+def test_bundle_is_exported_once_and_cached(lokalise_service, translation_state_dir):
+    """Test repeated requests for the same bundle reuse the cached export"""
+    cache = ExportCache(lokalise_service=lokalise_service)
+
+    path, etag = cache.get_bundle("json", ["fr", "es"])
+    again, same_etag = cache.get_bundle("json", ["es", "fr"])
+
+    assert (again, same_etag) == (path, etag)
+    assert path.parent == translation_state_dir / "exports"
+    assert path.read_bytes() == b"json:['fr', 'es']:1"
+    assert lokalise_service.exports == 1
+    lokalise_service.get_all_keys.assert_called_once_with(include_translations=False)
+
+    other, other_etag = cache.get_bundle("yaml", ["fr", "es"])
+    assert other_etag != etag
+    assert lokalise_service.exports == 2
+
+def test_project_changes_invalidate_bundles(lokalise_service, settings):
+    """Test edited translations, deleted keys or an expired bundle trigger a new export"""
+    settings.EXPORT_FINGERPRINT_TTL_SECONDS = 0
+    cache = ExportCache(lokalise_service=lokalise_service)
+    _, etag = cache.get_bundle("json")
+
+    # A translation edit changes no count, only the modification time
+    lokalise_service.get_all_keys.return_value[1]["translations_modified_at_timestamp"] = 200
+    _, edited_etag = cache.get_bundle("json")
+    assert edited_etag != etag
+    assert lokalise_service.exports == 2
+
+    lokalise_service.get_all_keys.return_value = lokalise_service.get_all_keys.return_value[1:]
+    _, new_etag = cache.get_bundle("json")
+    assert new_etag not in (etag, edited_etag)
+    assert lokalise_service.exports == 3
+
+    settings.EXPORT_CACHE_MAX_AGE_SECONDS = 0
+    _, same_etag = cache.get_bundle("json")
+    assert same_etag == new_etag
+    assert lokalise_service.exports == 4
+
+def test_concurrent_requests_share_one_export(lokalise_service):
+    """Test threads asking for a missing bundle wait for a single export"""
+    cache = ExportCache(lokalise_service=lokalise_service)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_bundle("json"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert lokalise_service.exports == 1
+    assert len(set(results)) == 1
+
+@pytest.mark.asyncio
+async def test_async_requests_share_one_export(lokalise_service):
+    """Test requests on one event loop await the same export task"""
+    cache = ExportCache(lokalise_service=lokalise_service)
+
+    results = await asyncio.gather(*(cache.get_bundle_async("json", ["de"]) for _ in range(20)))
+
+    assert lokalise_service.exports == 1
+    assert len(set(results)) == 1
+    assert not cache._in_flight
+
+def test_failed_export_leaves_no_bundle(lokalise_service):
+    """Test export errors are raised and nothing is cached"""
+    lokalise_service.download_bundle.side_effect = Exception("Error exporting files: quota")
+    cache = ExportCache(lokalise_service=lokalise_service)
+
+    with pytest.raises(Exception, match="quota"):
+        cache.get_bundle("json")
+    assert not list(cache.directory().glob("*.zip"))
+    assert not list(cache.directory().glob("*.tmp"))
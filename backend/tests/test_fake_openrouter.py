@@ -0,0 +1,137 @@
+import pytest
+import pytest_asyncio
+import json
+import random
+import aiohttp
+from aiohttp.test_utils import TestServer
+from unittest.mock import patch
+from translation_service.services.translation_pipeline import TranslationPipeline
+from translation_service.utils.fake_openrouter import (
+    FakeOpenRouter,
+    LatencyModel,
+    create_app,
+    pseudo_translate
+)
+
+
+@pytest_asyncio.fixture
+async def fake_openrouter():
+    """Start a fake OpenRouter server and return (fake, base_url)"""
+    servers = []
+
+    async def _start(**kwargs):
+        fake = FakeOpenRouter(**kwargs)
+        server = TestServer(create_app(fake))
+        await server.start_server()
+        servers.append(server)
+        return fake, str(server.make_url('/api/v1'))
+
+    yield _start
+
+    for server in servers:
+        await server.close()
+
+@pytest.fixture
+def pipeline(settings):
+    """TranslationPipeline without Lokalise access and with fast retries"""
+    settings.OPEN_ROUTER_RETRY_BACKOFF_SECONDS = 0
+    with patch('translation_service.services.translation_pipeline.LokaliseService'):
+        return TranslationPipeline()
+
+def test_latency_model_parse_and_sample():
+    """Test latency specs and sampling"""
+    model = LatencyModel.parse('uniform:100:50')
+    rng = random.Random(1)
+    samples = [model.sample(rng) for _ in range(100)]
+
+    assert all(0.05 <= s <= 0.15 for s in samples)
+    assert LatencyModel.parse('fixed:250').sample(rng) == 0.25
+    with pytest.raises(Exception):
+        LatencyModel.parse('gaussian:1')
+
+def test_pseudo_translate_keeps_placeholders():
+    """Test pseudo-translations are deterministic and keep protected tokens"""
+    result = pseudo_translate("Save ⟦1⟧ {name} <b>now</b>", "es")
+
+    assert result == "[es] Sávé ⟦1⟧ {name} <b>ñów</b>"
+    assert pseudo_translate("Save", "es") == result.split(" ⟦")[0]
+
+@pytest.mark.asyncio
+async def test_pipeline_against_fake_server(fake_openrouter, pipeline):
+    """Test translate_with_ai end to end, including placeholder restoration"""
+    fake, base_url = await fake_openrouter()
+    pipeline.openrouter_base_url = base_url
+
+    async with aiohttp.ClientSession() as session:
+        result = await pipeline.translate_with_ai("Hello {name}, see <b>docs</b>", "es", session)
+
+    assert result == "[es] Hélló {name}, šéé <b>dóçš</b>"
+    assert fake.stats['completed'] == 1
+
+@pytest.mark.asyncio
+async def test_pipeline_retries_rate_limits(fake_openrouter, pipeline):
+    """Test 429 responses are retried"""
+    fake, base_url = await fake_openrouter(rate_limit_rate=1.0, retry_after=0)
+    pipeline.openrouter_base_url = base_url
+
+    async with aiohttp.ClientSession() as session:
+        with pytest.raises(Exception) as exc_info:
+            await pipeline.translate_with_ai("Hello", "es", session)
+
+    assert "Rate limit exceeded" in str(exc_info.value)
+    # Every model gets the initial attempt plus OPEN_ROUTER_MAX_RETRIES retries
+    assert fake.stats['rate_limited'] == len(pipeline.model_router.models) * 4
+
+@pytest.mark.asyncio
+async def test_concurrent_translations_respect_concurrency(fake_openrouter, pipeline):
+    """Test the scheduler keeps at most `concurrency` requests in flight"""
+    fake, base_url = await fake_openrouter(latency=LatencyModel('fixed', 20))
+    pipeline.openrouter_base_url = base_url
+    pipeline.concurrency = 3
+    texts = [f"Text number {i}" for i in range(12)]
+
+    async with aiohttp.ClientSession() as session:
+        translations, errors, deferred = await pipeline._translate_texts(texts, "fr", session)
+
+    assert len(translations) == 12
+    assert not errors and not deferred
+    assert fake.stats['max_in_flight'] == 3
+
+@pytest.mark.asyncio
+async def test_hedged_requests_respect_concurrency(fake_openrouter, pipeline):
+    """Test hedges to fallback models count against the concurrency limit"""
+    fake, base_url = await fake_openrouter(latency=LatencyModel('fixed', 20))
+    pipeline.openrouter_base_url = base_url
+    pipeline.concurrency = 3
+    # Hedge every request almost at once
+    pipeline.model_router.hedge_delay = 0.001
+    pipeline.model_router.min_samples = 10 ** 6
+    texts = [f"Text number {i}" for i in range(12)]
+
+    async with aiohttp.ClientSession() as session:
+        translations, errors, deferred = await pipeline._translate_texts(texts, "fr", session)
+
+    assert len(translations) == 12
+    assert not errors and not deferred
+    assert fake.stats['max_in_flight'] <= 3
+
+@pytest.mark.asyncio
+async def test_fake_server_streaming(fake_openrouter):
+    """Test streamed completions are sent as server-sent events"""
+    fake, base_url = await fake_openrouter()
+
+    async with aiohttp.ClientSession() as session:
+        async with session.post(
+            f"{base_url}/chat/completions",
+            json={
+                "model": "fake/model",
+                "stream": True,
+                "messages": [{"role": "user", "content": "Translate the following text to fr.\n\nText to translate:\nGood morning everyone\n\nTranslation:"}]
+            }
+        ) as response:
+            body = await response.text()
+
+    events = [line[len("data: "):] for line in body.split("\n\n") if line.startswith("data: ")]
+    assert events[-1] == "[DONE]"
+    content = ''.join(json.loads(e)["choices"][0]["delta"]["content"] for e in events[:-1])
+    assert content == pseudo_translate("Good morning everyone", "fr")
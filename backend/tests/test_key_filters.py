@@ -0,0 +1,51 @@
+import pytest
+from datetime import datetime, timezone
+from translation_service.utils.key_filters import build_lokalise_key_params, key_matches_filters
+
+
+@pytest.fixture
+def key():
+    return {
+        'key_id': 123,
+        'key_name': {'ios': 'checkout.title', 'android': 'checkout_title', 'web': 'checkout.title', 'other': 'checkout.title'},
+        'tags': ['release-2.0', 'checkout'],
+        'platforms': ['web', 'ios'],
+        'modified_at_timestamp': 1700000000,
+        'translations_modified_at_timestamp': 1710000000
+    }
+
+def test_build_lokalise_key_params():
+    """Test filters the API supports are pushed down"""
+    params = build_lokalise_key_params({
+        'tags': ['release-2.0', 'checkout'],
+        'platforms': ['web'],
+        'key_ids': [1, 2],
+        'key_name_pattern': 'checkout.title',
+        'key_name_regex': '^checkout',
+    })
+
+    assert params == {
+        'filter_tags': 'release-2.0,checkout',
+        'filter_platforms': 'web',
+        'filter_key_ids': '1,2',
+        'filter_keys': 'checkout.title',
+    }
+    assert build_lokalise_key_params({'key_name_pattern': 'checkout.*'}) == {}
+    assert build_lokalise_key_params(None) == {}
+
+def test_key_matches_filters(key):
+    """Test local filtering"""
+    assert key_matches_filters(key, None)
+    assert key_matches_filters(key, {'tags': ['checkout']})
+    assert not key_matches_filters(key, {'tags': ['onboarding']})
+    assert key_matches_filters(key, {'key_name_pattern': 'checkout.*'})
+    assert not key_matches_filters(key, {'key_name_pattern': 'cart.*'})
+    assert key_matches_filters(key, {'key_name_regex': r'\.title$'})
+    assert not key_matches_filters(key, {'platforms': ['android']})
+    assert key_matches_filters(key, {'key_ids': ['123']})
+    assert not key_matches_filters(key, {'key_ids': [1]})
+
+def test_key_matches_modified_since(key):
+    """Test modified-since uses the latest key or translation change"""
+    assert key_matches_filters(key, {'modified_since': 1705000000})
+    assert not key_matches_filters(key, {'modified_since': datetime(2024, 6, 1, tzinfo=timezone.utc)})
@@ -0,0 +1,91 @@
+import pytest
+import json
+import yaml
+from translation_service.utils.localization_files import (
+    build_key_index,
+    diff_units,
+    file_format,
+    flatten,
+    key_name,
+    parse_file,
+    split_file,
+    unflatten
+)
+
+
+NESTED = {
+    "home": {
+        "title": "Welcome",
+        "items": {"one": "{count} item", "other": "{count} items"},
+        "menu": {"open": "Open", "close": "Close"},
+    },
+    "footer": "Bye",
+}
+
+def test_flatten_keeps_plurals_whole():
+    """Test nested mappings become keys while plural objects stay one key"""
+    units = flatten(NESTED)
+
+    assert [key_name(path) for path, _ in units] == [
+        "home::title", "home::items", "home::menu::open", "home::menu::close", "footer"
+    ]
+    assert units[1][1] == {"one": "{count} item", "other": "{count} items"}
+    assert unflatten(units) == NESTED
+
+def test_parse_formats():
+    """Test JSON and YAML are parsed and other formats rejected"""
+    assert file_format("en.nested.json") == "json"
+    assert file_format("config/en.yml") == "yaml"
+    assert file_format("en.xml") is None
+
+    assert parse_file("en.yaml", "en:\n  hello: Hello\n".encode()) == {"en": {"hello": "Hello"}}
+    assert parse_file("empty.yml", b"") == {}
+    with pytest.raises(Exception, match="Could not parse en.json"):
+        parse_file("en.json", b"{")
+    with pytest.raises(Exception, match="not a mapping"):
+        parse_file("en.json", b"[1, 2]")
+
+def test_split_json_into_key_ranges():
+    """Test chunks are consecutive key ranges that add up to the original"""
+    data = {f"key_{i}": f"Value {i}" for i in range(7)}
+    chunks = split_file("en.json", flatten(data), chunk_keys=3)
+
+    parsed = [json.loads(chunk) for chunk in chunks]
+    assert [list(chunk) for chunk in parsed] == [
+        ["key_0", "key_1", "key_2"], ["key_3", "key_4", "key_5"], ["key_6"]
+    ]
+    assert {k: v for chunk in parsed for k, v in chunk.items()} == data
+
+def test_split_nested_yaml_keeps_structure():
+    """Test nested YAML chunks keep their parents and unicode text"""
+    content = yaml.safe_dump({"en": NESTED | {"greeting": "こんにちは"}}, allow_unicode=True, sort_keys=False).encode()
+    chunks = split_file("en.nested.yml", flatten(yaml.safe_load(content)), chunk_keys=2)
+
+    parsed = [yaml.safe_load(chunk) for chunk in chunks]
+    assert len(parsed) == 3
+    assert parsed[0] == {"en": {"home": {"title": "Welcome", "items": NESTED["home"]["items"]}}}
+    assert "こんにちは".encode() in chunks[-1]
+    assert unflatten([unit for chunk in parsed for unit in flatten(chunk)]) == yaml.safe_load(content)
+
+def test_diff_against_project_keys():
+    """Test only new and changed keys are kept and the rest reported"""
+    keys = [
+        {"key_name": {"web": "home::title", "ios": "HomeTitle"}, "translations": [
+            {"language_iso": "en", "translation": "Welcome"}, {"language_iso": "fr", "translation": "Bienvenue"}
+        ]},
+        {"key_name": {"web": "home::items"}, "translations": [
+            {"language_iso": "en", "translation": '{"one": "{count} item", "other": "{count} items"}'}
+        ]},
+        {"key_name": {"web": "home::menu::open"}, "translations": [
+            {"language_iso": "en", "translation": "Open it"}
+        ]},
+        {"key_name": {"web": "footer"}, "translations": []},
+    ]
+    index = build_key_index(keys, "en")
+    assert index["HomeTitle"] == "Welcome"
+    assert index["footer"] is None
+
+    units, report = diff_units(flatten(NESTED), index)
+
+    assert [key_name(path) for path, _ in units] == ["home::menu::open", "home::menu::close", "footer"]
+    assert report == {"new_keys": 1, "changed_keys": 2, "skipped_keys": ["home::title", "home::items"]}
@@ -73,6 +73,112 @@ def test_upload_file_success(lokalise_service, mock_lokalise_client):
     assert result["project_id"] == lokalise_service.project_id
     mock_lokalise_client.upload_file.assert_called_once()
 
+def test_upload_file_streams_large_files(lokalise_service, mock_lokalise_client, mock_requests, settings, tmp_path):
+    """Test large files are base64-encoded in chunks into the request body"""
+    import base64
+    import json
+    settings.LOKALISE_STREAMING_UPLOAD_THRESHOLD = 1000
+    settings.LOKALISE_UPLOAD_CHUNK_SIZE = 100
+    content = bytes(range(256)) * 20 + b"tail"
+    path = tmp_path / "big.json"
+    path.write_bytes(content)
+
+    sent = {}
+
+    def fake_post(url, headers, data, timeout):
+        chunks = list(data)
+        sent["length"] = len(data)
+        sent["chunks"] = chunks
+        sent["body"] = json.loads(b"".join(chunks))
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {"process": {"process_id": "456"}}
+        return response
+    mock_requests.post.side_effect = fake_post
+
+    with open(path, "rb") as file:
+        result = lokalise_service.upload_file(file=file, filename="big.json", lang_iso="en", tags=["big"])
+
+    assert result["process_id"] == "456"
+    assert result["file_format"] == "JSON"
+    mock_lokalise_client.upload_file.assert_not_called()
+    assert base64.b64decode(sent["body"].pop("data")) == content
+    assert sent["body"]["filename"] == "big.json"
+    assert sent["body"]["tags"] == ["big"]
+    assert sent["length"] == sum(len(chunk) for chunk in sent["chunks"])
+    assert max(len(chunk) for chunk in sent["chunks"][1:-1]) <= 4 * 99 // 3
+
+def test_upload_file_streaming_error(lokalise_service, mock_requests, settings):
+    """Test API errors from the streaming path are raised"""
+    import io
+    settings.LOKALISE_STREAMING_UPLOAD_THRESHOLD = 1
+    mock_requests.post.return_value.status_code = 400
+    mock_requests.post.return_value.text = "Invalid file"
+
+    with pytest.raises(Exception, match="Error uploading file: API error: Invalid file"):
+        lokalise_service.upload_file(file=io.BytesIO(b"{}"), filename="a.json", lang_iso="en")
+
+def test_get_process_statuses(lokalise_service, mock_lokalise_client):
+    """Test process statuses are read from the list pages, with lookups for missing ones"""
+    def page(process_ids, number, count):
+        return {
+            "processes": [
+                {"process_id": pid, "status": "finished", "message": "", "details": {"files": []}}
+                for pid in process_ids
+            ],
+            "_pagination": {
+                "x-pagination-total-count": 3, "x-pagination-page-count": count,
+                "x-pagination-limit": 2, "x-pagination-page": number
+            }
+        }
+    endpoint = mock_lokalise_client.get_endpoint.return_value
+    endpoint.all.side_effect = [page(["p0", "p1"], 1, 2), page(["p3"], 2, 2)]
+    mock_lokalise_client.queued_process.return_value = MagicMock(status="failed", message="Invalid file", details={})
+    throttle = MagicMock()
+
+    statuses = lokalise_service.get_process_statuses(["p3", "p2"], throttle=throttle)
+
+    assert statuses == {
+        "p3": {"status": "finished", "message": "", "details": {"files": []}},
+        "p2": {"status": "failed", "message": "Invalid file", "details": {}},
+    }
+    assert [c.kwargs["params"]["page"] for c in endpoint.all.call_args_list] == [1, 2]
+    mock_lokalise_client.queued_process.assert_called_once_with(lokalise_service.project_id, "p2")
+    assert throttle.call_count == 3
+
+def test_get_process_statuses_stops_paging(lokalise_service, mock_lokalise_client):
+    """Test later pages are not read once every process is found"""
+    endpoint = mock_lokalise_client.get_endpoint.return_value
+    endpoint.all.return_value = {
+        "processes": [{"process_id": "p1", "status": "queued", "message": "", "details": {}}],
+        "_pagination": {
+            "x-pagination-total-count": 9, "x-pagination-page-count": 9,
+            "x-pagination-limit": 1, "x-pagination-page": 1
+        }
+    }
+
+    statuses = lokalise_service.get_process_statuses(["p1"])
+
+    assert statuses["p1"]["status"] == "queued"
+    endpoint.all.assert_called_once()
+    mock_lokalise_client.queued_process.assert_not_called()
+
+def test_download_bundle(lokalise_service, mock_lokalise_client, mock_requests, tmp_path):
+    """Test exports request a bundle and stream it to disk"""
+    mock_lokalise_client.download_files.return_value = {"bundle_url": "https://bundles/x.zip"}
+    response = mock_requests.get.return_value.__enter__.return_value
+    response.status_code = 200
+    response.iter_content.return_value = [b"PK", b"data"]
+    destination = tmp_path / "bundle.zip"
+
+    lokalise_service.download_bundle("json", destination, ["fr"])
+
+    assert destination.read_bytes() == b"PKdata"
+    params = mock_lokalise_client.download_files.call_args.args[1]
+    assert params["format"] == "json"
+    assert params["filter_langs"] == ["fr"]
+    assert mock_requests.get.call_args.args[0] == "https://bundles/x.zip"
+
 def test_get_all_keys_success(lokalise_service, mock_lokalise_client):
     """Test successful all keys fetch"""
     mock_response = MagicMock()
@@ -173,4 +279,39 @@ def test_upload_translation_error(lokalise_service, mock_requests):
     
     assert len(result) == 1
     assert result[0]["status"] == "error"
-    assert "API error" in result[0]["error"] 
\ No newline at end of file
+    assert "API error" in result[0]["error"] 
+
+
+def test_get_all_keys_with_filters(lokalise_service, mock_lokalise_client):
+    """Test filters are pushed down to the API and applied locally across pages"""
+    def make_key(key_id, key_name):
+        mock_key = MagicMock()
+        mock_key.key_id = key_id
+        mock_key.key_name = key_name
+        mock_key.translations = []
+        mock_key.tags = ["release"]
+        mock_key.platforms = ["web"]
+        mock_key.modified_at_timestamp = 0
+        mock_key.translations_modified_at_timestamp = 0
+        return mock_key
+
+    first_page = MagicMock()
+    first_page.items = [make_key(1, "checkout.title")]
+    first_page.current_page = 1
+    first_page.has_next_page.return_value = True
+    second_page = MagicMock()
+    second_page.items = [make_key(2, "cart.title")]
+    second_page.current_page = 2
+    second_page.has_next_page.return_value = False
+    mock_lokalise_client.keys.side_effect = [first_page, second_page]
+
+    result = lokalise_service.get_all_keys(
+        include_translations=True,
+        filters={'tags': ['release'], 'key_name_pattern': 'checkout.*'}
+    )
+
+    assert [key["key_id"] for key in result] == [1]
+    assert mock_lokalise_client.keys.call_count == 2
+    first_params = mock_lokalise_client.keys.call_args_list[0].kwargs['params']
+    assert first_params['filter_tags'] == 'release'
+    assert mock_lokalise_client.keys.call_args_list[1].kwargs['params']['page'] == 2
@@ -0,0 +1,107 @@
+import pytest
+import aiohttp
+from aiohttp.test_utils import TestServer
+from unittest.mock import MagicMock, patch
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+from translation_service.services.lokalise_service import LokaliseService
+from translation_service.services.translation_pipeline import TranslationPipeline
+from translation_service.services.translation_scheduler import TranslationScheduler
+from translation_service.utils.fake_openrouter import FakeOpenRouter, create_app
+from translation_service.utils.metrics import record_cache_lookup
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+@pytest.mark.django_db
+def test_metrics_endpoint():
+    """Test /metrics serves the Prometheus text format"""
+    record_cache_lookup('glossary', 'es', True)
+
+    response = APIClient().get('/metrics')
+
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain')
+    body = response.content.decode()
+    assert 'translation_cache_lookups_total{cache="glossary",language="es",result="hit"}' in body
+    assert 'lokalise_request_seconds' in body
+
+def test_lokalise_calls_are_timed():
+    """Test Lokalise calls are observed with their operation and outcome"""
+    with patch('translation_service.services.lokalise_service.LokaliseClient') as mock_client:
+        mock_lokalise_client = mock_client.return_value
+        service = LokaliseService()
+    service.project_id = 'metrics-project'
+    mock_lokalise_client.project.return_value.statistics = {'keys_total': 1}
+    mock_lokalise_client.get_endpoint.return_value.all.side_effect = Exception("boom")
+    before_ok = sample('lokalise_request_seconds_count', operation='get_project', project='metrics-project', outcome='success')
+    before_error = sample('lokalise_request_seconds_count', operation='get_processes', project='metrics-project', outcome='error')
+
+    service.get_project_statistics()
+    with pytest.raises(Exception):
+        service.get_process_statuses(['p1'])
+
+    assert sample('lokalise_request_seconds_count', operation='get_project', project='metrics-project', outcome='success') == before_ok + 1
+    assert sample('lokalise_request_seconds_count', operation='get_processes', project='metrics-project', outcome='error') == before_error + 1
+
+@pytest.mark.asyncio
+async def test_scheduler_queue_depth_drains():
+    """Test the queue depth gauge goes back to zero after a run"""
+    scheduler = TranslationScheduler(concurrency=2, language='metrics-queue')
+    seen = []
+
+    async def worker(item):
+        seen.append(sample('translation_queue_depth', language='metrics-queue'))
+        return item
+
+    priorities = {item: scheduler.priority(item, True, False) for item in ('a', 'b', 'c')}
+    await scheduler.run(priorities, worker)
+
+    assert max(seen) >= 1
+    assert sample('translation_queue_depth', language='metrics-queue') == 0
+
+@pytest.mark.asyncio
+async def test_openrouter_requests_and_tokens():
+    """Test completion latency and reported token usage are recorded"""
+    server = TestServer(create_app(FakeOpenRouter()))
+    await server.start_server()
+    with patch('translation_service.services.translation_pipeline.LokaliseService'):
+        translation_pipeline = TranslationPipeline()
+    translation_pipeline.openrouter_base_url = str(server.make_url('/api/v1'))
+    model = translation_pipeline.model_router.primary_model
+    before_requests = sample('openrouter_request_seconds_count', model=model, language='metrics-or', status='200')
+    before_tokens = sample('openrouter_tokens_total', model=model, language='metrics-or', kind='completion_tokens')
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            await translation_pipeline.translate_with_ai("Hello", "metrics-or", session)
+    finally:
+        await server.close()
+
+    assert sample('openrouter_request_seconds_count', model=model, language='metrics-or', status='200') == before_requests + 1
+    assert sample('openrouter_tokens_total', model=model, language='metrics-or', kind='completion_tokens') > before_tokens
+
+@pytest.mark.asyncio
+async def test_pipeline_stages_and_outcomes():
+    """Test a run records its stage durations and per-key outcomes"""
+    with patch('translation_service.services.translation_pipeline.LokaliseService'):
+        translation_pipeline = TranslationPipeline()
+    translation_pipeline.lokalise_service = MagicMock(project_id='metrics-run')
+    translation_pipeline.lokalise_service.get_all_keys.return_value = [
+        {'key_id': '1', 'key_name': 'a', 'translations': [{'language_iso': 'en', 'translation': 'Hello'}]},
+        {'key_id': '2', 'key_name': 'b', 'translations': [{'language_iso': 'en', 'translation': ''}]},
+    ]
+    translation_pipeline.lokalise_service.upload_translation.side_effect = lambda updates: [
+        {'key_id': update['key_id'], 'status': 'success'} for update in updates
+    ]
+    before_fetch = sample('translation_stage_seconds_count', stage='fetch_keys', project='metrics-run', language='metrics-lang')
+    before_success = sample('translation_key_outcomes_total', status='success', project='metrics-run', language='metrics-lang')
+
+    with patch.object(translation_pipeline, 'translate_with_ai', return_value='Hola'):
+        results = await translation_pipeline.process_translations(target_language='metrics-lang')
+
+    successes = sum(1 for result in results if result['status'] == 'success')
+    assert sample('translation_stage_seconds_count', stage='fetch_keys', project='metrics-run', language='metrics-lang') == before_fetch + 1
+    assert sample('translation_stage_seconds_count', stage='upload', project='metrics-run', language='metrics-lang') >= 1
+    assert sample('translation_key_outcomes_total', status='success', project='metrics-run', language='metrics-lang') == before_success + successes
@@ -0,0 +1,147 @@
+import pytest
+import asyncio
+from translation_service.services.model_router import ModelRouter, ModelStats
+
+
+@pytest.fixture
+def router():
+    """Create a ModelRouter with a short hedge delay"""
+    return ModelRouter(
+        primary_model='primary',
+        fallback_models=['fallback'],
+        hedge_delay=0.05,
+        min_samples=3
+    )
+
+def test_model_stats_percentile_and_error_rate():
+    """Test rolling statistics"""
+    stats = ModelStats(window_size=10)
+    for latency in [0.1, 0.2, 0.3, 0.4]:
+        stats.record_success(latency)
+    stats.record_error()
+
+    assert stats.percentile(50) == 0.2
+    assert stats.percentile(95) == 0.4
+    assert stats.error_rate == pytest.approx(0.2)
+    assert ModelStats().percentile(95) is None
+
+def test_hedge_deadline_uses_p95_once_warm(router):
+    """Test the hedge deadline switches from the default delay to p95"""
+    assert router.hedge_deadline('primary') == 0.05
+
+    for latency in [0.5, 0.6, 0.7]:
+        router.stats['primary'].record_success(latency)
+
+    assert router.hedge_deadline('primary') == 0.7
+
+def test_degraded_primary_is_ranked_last(router):
+    """Test that a failing primary model is tried after its fallbacks"""
+    for _ in range(3):
+        router.stats['primary'].record_error()
+
+    assert router.ranked_models() == ['fallback', 'primary']
+
+@pytest.mark.asyncio
+async def test_run_primary_answers_before_deadline(router):
+    """Test that no hedge is sent when the primary is fast"""
+    calls = []
+
+    async def request(model, started):
+        started()
+        calls.append(model)
+        return f'{model} result'
+
+    result = await router.run(request)
+
+    assert result == 'primary result'
+    assert calls == ['primary']
+
+@pytest.mark.asyncio
+async def test_run_hedges_and_cancels_slow_primary(router):
+    """Test that a slow primary is hedged and cancelled when the fallback wins"""
+    cancelled = []
+
+    async def request(model, started):
+        started()
+        try:
+            await asyncio.sleep(1 if model == 'primary' else 0)
+        except asyncio.CancelledError:
+            cancelled.append(model)
+            raise
+        return f'{model} result'
+
+    result = await router.run(request)
+    await asyncio.sleep(0)
+
+    assert result == 'fallback result'
+    assert cancelled == ['primary']
+    assert router.stats['primary'].sample_count == 1
+
+@pytest.mark.asyncio
+async def test_run_falls_back_on_error(router):
+    """Test that a failing primary falls through to the fallback immediately"""
+    async def request(model, started):
+        started()
+        if model == 'primary':
+            raise Exception('primary down')
+        return 'fallback result'
+
+    result = await router.run(request)
+
+    assert result == 'fallback result'
+    assert router.stats['primary'].error_rate == 1.0
+
+@pytest.mark.asyncio
+async def test_run_raises_when_all_models_fail(router):
+    """Test that the last error is raised when every model fails"""
+    async def request(model, started):
+        raise Exception(f'{model} down')
+
+    with pytest.raises(Exception) as exc_info:
+        await router.run(request)
+
+    assert 'fallback down' in str(exc_info.value)
+
+@pytest.mark.asyncio
+async def test_queueing_before_send_is_not_latency(router):
+    """Test time before a request is sent neither starts the hedge clock nor counts as latency"""
+    slot = asyncio.Lock()
+    sent = []
+
+    async def request(model, started):
+        async with slot:
+            started()
+            sent.append(model)
+            await asyncio.sleep(0.01)
+            return f'{model} result'
+
+    await slot.acquire()
+    run = asyncio.ensure_future(router.run(request))
+    # Queued for three hedge delays: no hedge is sent meanwhile
+    await asyncio.sleep(0.15)
+    assert sent == []
+    slot.release()
+
+    assert await run == 'primary result'
+    assert sent == ['primary']
+    assert router.stats['primary'].percentile(50) < 0.05
+
+@pytest.mark.asyncio
+async def test_hedge_cancelled_before_send_is_not_recorded(router):
+    """Test a hedge still queued when the primary answers leaves no latency sample"""
+    primary_sent = asyncio.Event()
+
+    async def request(model, started):
+        if model == 'primary':
+            started()
+            primary_sent.set()
+            await asyncio.sleep(0.1)
+            return 'primary result'
+        # The fallback never gets to send
+        await asyncio.sleep(1)
+
+    assert await router.run(request) == 'primary result'
+    await asyncio.sleep(0)
+
+    assert router.stats['primary'].sample_count == 1
+    assert router.stats['fallback'].sample_count == 0
@@ -0,0 +1,53 @@
+import pytest
+from translation_service.utils.placeholder_masking import (
+    mask_placeholders,
+    unmask_placeholders,
+    find_placeholder_issues
+)
+
+
+@pytest.mark.parametrize("text", [
+    "Hello {name}, you have <b>%d</b> new messages",
+    "Welcome back, {{ user.name }}&nbsp;!",
+    "Price: %1$s (%(currency)s) [%s]",
+    "{count, plural, =0 {No items} one {# item for {name}} other {# items}}",
+    "{gender, select, male {He} female {She} other {They}} replied",
+    "Broken {count, plural, one {item",
+    "Plain text",
+    "Literal ⟦7⟧ and ⟦1⟧ next to {name}",
+])
+def test_mask_round_trip(text):
+    """Test that masking and restoring returns the original text"""
+    masked, placeholders = mask_placeholders(text)
+
+    assert unmask_placeholders(masked, placeholders) == text
+    assert find_placeholder_issues(masked, len(placeholders)) == []
+
+def test_mask_keeps_plural_branch_text_translatable():
+    """Test ICU structure is masked but branch texts are left for translation"""
+    masked, placeholders = mask_placeholders("{count, plural, one {# item} other {# items}}")
+
+    assert masked == "⟦1⟧⟦2⟧ item⟦3⟧⟦4⟧ items⟦5⟧"
+    assert placeholders == ["{count, plural, one {", "#", "} other {", "#", "}}"]
+
+def test_mask_numbers_sentinels_in_reading_order():
+    """Test sentinels are numbered in the order they appear"""
+    masked, placeholders = mask_placeholders("<a href=\"/x\">{name}</a>")
+
+    assert masked == "⟦1⟧⟦2⟧⟦3⟧"
+    assert placeholders == ["<a href=\"/x\">", "{name}", "</a>"]
+
+def test_mask_literal_sentinels():
+    """Test sentinel-like source text is kept as a fragment instead of being renumbered"""
+    masked, placeholders = mask_placeholders("Press ⟦3⟧ then {key}")
+
+    assert masked == "Press ⟦1⟧ then ⟦2⟧"
+    assert placeholders == ["⟦3⟧", "{key}"]
+    assert unmask_placeholders("Pulse ⟦1⟧ y luego ⟦2⟧", placeholders) == "Pulse ⟦3⟧ y luego {key}"
+
+def test_find_placeholder_issues():
+    """Test validation of masked translations"""
+    assert find_placeholder_issues("⟦2⟧ hola ⟦1⟧", 2) == []
+    assert find_placeholder_issues("hola ⟦1⟧", 2) == ["missing ⟦2⟧"]
+    assert find_placeholder_issues("⟦1⟧⟦1⟧⟦2⟧", 2) == ["duplicated ⟦1⟧"]
+    assert find_placeholder_issues("⟦1⟧⟦3⟧", 1) == ["unknown ⟦3⟧"]
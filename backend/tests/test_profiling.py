@@ -0,0 +1,98 @@
+import pytest
+import time
+from unittest.mock import MagicMock, patch
+from django.test import AsyncClient, Client
+from translation_service.services.translation_pipeline import TranslationPipeline
+from translation_service.utils.profiling import RequestProfile, STAGE_TIMINGS, record_stage_timing
+
+
+@pytest.fixture
+def profiling(settings):
+    settings.REQUEST_PROFILING_ENABLED = True
+    settings.PROFILE_SAMPLE_INTERVAL_SECONDS = 0.001
+    return settings
+
+def test_request_profile_samples_and_times_stages(profiling):
+    """Test a profile collects stacks and the stage timings recorded while active"""
+    profile = RequestProfile()
+    profile.start()
+    record_stage_timing('translate', 0.25)
+    record_stage_timing('translate', 0.25)
+    time.sleep(0.02)
+    profile.stop()
+    path = profile.save()
+
+    assert STAGE_TIMINGS.get() is None
+    assert profile.stage_timings == {'translate': 0.5}
+    assert profile.server_timing().startswith('translate;dur=500.0, total;dur=')
+    lines = path.read_text().splitlines()
+    assert lines and all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    assert any(line.startswith('MainThread;') for line in lines)
+
+def test_record_stage_timing_without_profile():
+    """Test stage timings are dropped outside profiled requests"""
+    record_stage_timing('translate', 1.0)
+
+    assert STAGE_TIMINGS.get() is None
+
+@pytest.mark.django_db
+def test_middleware_requires_header(profiling):
+    """Test only requests sent with X-Profile are profiled"""
+    response = Client().get('/metrics')
+
+    assert 'X-Profile-Id' not in response
+
+@pytest.mark.django_db
+def test_middleware_ignores_header_when_disabled(settings):
+    """Test the header does nothing unless profiling is enabled"""
+    settings.REQUEST_PROFILING_ENABLED = False
+
+    response = Client().get('/metrics', headers={'X-Profile': '1'})
+
+    assert 'X-Profile-Id' not in response
+
+@pytest.mark.django_db
+@pytest.mark.asyncio
+async def test_profiled_request_can_be_downloaded(profiling):
+    """Test an async request is profiled and its profile downloaded"""
+    client = AsyncClient()
+    response = await client.get(
+        '/api/translations/runs/0123456789abcdef0123456789abcdef/details/',
+        headers={'X-Profile': '1'}
+    )
+
+    profile_id = response['X-Profile-Id']
+    assert 'total;dur=' in response['Server-Timing']
+
+    download = await client.get(f'/api/translations/profiles/{profile_id}/')
+    assert download.status_code == 200
+    body = b''.join([chunk async for chunk in download.streaming_content]).decode()
+    assert body.strip()
+
+@pytest.mark.django_db
+def test_profile_download_unknown(profiling):
+    """Test unknown profiles are not found"""
+    response = Client().get('/api/translations/profiles/0123456789abcdef0123456789abcdef/')
+
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_pipeline_stages_are_timed(profiling):
+    """Test the stages of a run are recorded in the active profile"""
+    with patch('translation_service.services.translation_pipeline.LokaliseService'):
+        translation_pipeline = TranslationPipeline()
+    translation_pipeline.lokalise_service = MagicMock(project_id='profiled')
+    translation_pipeline.lokalise_service.get_all_keys.return_value = [
+        {'key_id': '1', 'key_name': 'a', 'translations': [{'language_iso': 'en', 'translation': 'Hello'}]},
+    ]
+    translation_pipeline.lokalise_service.upload_translation.return_value = [{'key_id': '1', 'status': 'success'}]
+
+    profile = RequestProfile()
+    profile.start()
+    try:
+        with patch.object(translation_pipeline, 'translate_with_ai', return_value='Hola'):
+            await translation_pipeline.process_translations(target_language='es')
+    finally:
+        profile.stop()
+
+    assert {'fetch_keys', 'select', 'translate', 'upload'} <= set(profile.stage_timings)
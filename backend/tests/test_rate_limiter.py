@@ -0,0 +1,48 @@
+import pytest
+import asyncio
+import time
+from translation_service.utils.rate_limiter import RateLimiter
+
+
+@pytest.mark.asyncio
+async def test_calls_are_spaced_out():
+    """Test concurrent callers are released one interval apart"""
+    limiter = RateLimiter(rate=50)
+    released = []
+
+    async def call():
+        await limiter.acquire()
+        released.append(time.monotonic())
+
+    await asyncio.gather(*(call() for _ in range(5)))
+
+    gaps = [later - earlier for earlier, later in zip(released, released[1:])]
+    assert min(gaps) >= 0.015
+    assert released[-1] - released[0] >= 0.075
+
+@pytest.mark.asyncio
+async def test_zero_rate_disables_limit():
+    """Test a rate of 0 never sleeps"""
+    limiter = RateLimiter(rate=0)
+    start = time.monotonic()
+    for _ in range(100):
+        await limiter.acquire()
+    assert time.monotonic() - start < 0.05
+
+@pytest.mark.asyncio
+async def test_threads_share_the_schedule():
+    """Test blocking waits in worker threads are spaced out with async callers"""
+    limiter = RateLimiter(rate=50)
+    released = []
+
+    def call_in_thread():
+        limiter.wait()
+        released.append(time.monotonic())
+
+    async def call():
+        await limiter.acquire()
+        released.append(time.monotonic())
+
+    await asyncio.gather(call(), asyncio.to_thread(call_in_thread), asyncio.to_thread(call_in_thread), call())
+
+    assert max(released) - min(released) >= 0.055
@@ -0,0 +1,79 @@
+import runpy
+import threading
+from pathlib import Path
+from unittest.mock import DEFAULT, MagicMock, patch
+from translation_service.services.registry import ServiceRegistry, registry
+
+
+def mock_services():
+    return patch.multiple(
+        'translation_service.services.registry',
+        LokaliseService=DEFAULT,
+        TranslationPipeline=DEFAULT,
+        TranslationService=DEFAULT
+    )
+
+
+def test_services_are_built_once_and_shared():
+    """Test each service is constructed once and wired to the shared dependencies"""
+    with mock_services() as mocks:
+        registry = ServiceRegistry()
+        service = registry.translation_service
+        assert registry.translation_service is service
+        assert registry.translation_pipeline is registry.translation_pipeline
+
+    assert mocks['LokaliseService'].call_count == 1
+    assert mocks['TranslationPipeline'].call_count == 1
+    mocks['TranslationPipeline'].assert_called_once_with(lokalise_service=mocks['LokaliseService'].return_value)
+    mocks['TranslationService'].assert_called_once_with(pipeline=mocks['TranslationPipeline'].return_value)
+
+
+def test_concurrent_first_access_builds_once():
+    """Test threads racing on first access get the same instance"""
+    with mock_services() as mocks:
+        registry = ServiceRegistry()
+        instances = []
+        threads = [
+            threading.Thread(target=lambda: instances.append(registry.translation_service))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+    assert len(instances) == 8
+    assert mocks['TranslationService'].call_count == 1
+
+
+def test_warm_up_and_reset():
+    """Test warm-up builds every service and reset drops them"""
+    with mock_services() as mocks:
+        registry = ServiceRegistry()
+        registry.warm_up()
+        assert mocks['LokaliseService'].call_count == 1
+        assert mocks['TranslationPipeline'].call_count == 1
+        assert mocks['TranslationService'].call_count == 1
+
+        registry.reset()
+        registry.lokalise_service
+        assert mocks['LokaliseService'].call_count == 2
+
+
+def test_gunicorn_worker_warms_up_services():
+    """Test the gunicorn post_worker_init hook warms up the registry"""
+    config = runpy.run_path(str(Path(__file__).resolve().parent.parent / 'gunicorn.conf.py'))
+    with patch.object(registry, 'warm_up') as mock_warm_up:
+        config['post_worker_init'](MagicMock())
+    mock_warm_up.assert_called_once()
+
+
+def test_gunicorn_asgi_mode(monkeypatch):
+    """Test SERVER_MODE=asgi serves core.asgi with uvicorn workers"""
+    path = str(Path(__file__).resolve().parent.parent / 'gunicorn.conf.py')
+    assert runpy.run_path(path)['wsgi_app'] == 'core.wsgi:application'
+
+    monkeypatch.setenv('SERVER_MODE', 'asgi')
+    config = runpy.run_path(path)
+    assert config['wsgi_app'] == 'core.asgi:application'
+    assert config['worker_class'] == 'uvicorn.workers.UvicornWorker'
@@ -0,0 +1,83 @@
+import os
+import pytest
+from translation_service.services.result_store import RunResultStore
+
+
+def make_results(count):
+    return [{"key_id": str(i), "status": "success", "is_new_translation": i % 2 == 0} for i in range(count)]
+
+def test_counters_follow_added_results():
+    """Test the summary counters are updated as results are added"""
+    with RunResultStore() as store:
+        store.extend(make_results(4))
+        store.add({"key_id": "a", "status": "error", "error": "boom"})
+        store.add({"key_id": "b", "status": "skipped", "reason": "Translation unchanged",
+                   "quality": {"bleu_score": 1.0, "chrf_score": 1.0}})
+        store.add({"key_id": "c", "status": "deferred"})
+        store.add({"key_id": "d", "status": "success", "is_new_translation": True,
+                   "source_text": "https://example.com", "passthrough_reason": "url"})
+        store.add({"key_id": "e", "status": "success", "is_new_translation": True,
+                   "source_text": "https://example.com", "passthrough_reason": "url"})
+
+    assert store.counters == {
+        'total_processed': 9,
+        'successful': 6,
+        'failed': 1,
+        'skipped': 1,
+        'deferred': 1,
+        'new_translations': 4,
+        'updated_translations': 2,
+        'llm_calls_avoided': 1,
+        'evaluated': 1,
+        'unchanged_translations': 1,
+    }
+
+def test_cursor_pagination(translation_state_dir):
+    """Test pages chain through every result exactly once"""
+    with RunResultStore() as store:
+        store.extend(make_results(7))
+
+    reopened = RunResultStore.open(store.run_id)
+    assert reopened.path.parent == translation_state_dir / "runs"
+    assert reopened.counters == store.counters
+
+    keys = []
+    cursor = None
+    pages = 0
+    while True:
+        page, cursor = reopened.page(cursor, limit=3)
+        keys.extend(result["key_id"] for result in page)
+        pages += 1
+        if cursor is None:
+            break
+    assert keys == [str(i) for i in range(7)]
+    assert pages == 3
+
+    page, cursor = reopened.page(limit=7)
+    assert len(page) == 7
+    assert cursor is None
+
+def test_invalid_run_and_cursor():
+    """Test unknown runs, malformed run ids and cursors are rejected"""
+    with pytest.raises(Exception, match="Invalid run id"):
+        RunResultStore.open("../secrets")
+    with pytest.raises(Exception, match="Unknown run"):
+        RunResultStore.open("0" * 32)
+
+    with RunResultStore() as store:
+        store.extend(make_results(1))
+    with pytest.raises(Exception, match="Invalid cursor"):
+        store.page("not-a-cursor")
+
+def test_old_runs_are_pruned(settings):
+    """Test run files past the retention period are removed"""
+    with RunResultStore() as old:
+        old.extend(make_results(1))
+    os.utime(old.path, (0, 0))
+
+    settings.RESULT_STORE_RETENTION_SECONDS = 3600
+    with RunResultStore() as store:
+        store.extend(make_results(1))
+
+    assert not old.path.exists()
+    assert store.path.exists()
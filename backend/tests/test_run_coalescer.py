@@ -0,0 +1,60 @@
+import pytest
+import asyncio
+import os
+from translation_service.services.run_coalescer import RunCoalescer
+
+
+def test_run_key_depends_on_all_inputs():
+    """Test identical requests share a key and any difference changes it"""
+    key = RunCoalescer.run_key("p1", "en", "es", {"evaluate": False, "key_filters": {"tags": ["a"]}})
+
+    assert key == RunCoalescer.run_key("p1", "en", "es", {"key_filters": {"tags": ["a"]}, "evaluate": False})
+    assert key != RunCoalescer.run_key("p2", "en", "es", {"evaluate": False, "key_filters": {"tags": ["a"]}})
+    assert key != RunCoalescer.run_key("p1", "en", "fr", {"evaluate": False, "key_filters": {"tags": ["a"]}})
+    assert key != RunCoalescer.run_key("p1", "en", "es", {"evaluate": True, "key_filters": {"tags": ["a"]}})
+
+@pytest.mark.asyncio
+async def test_failures_reach_every_caller_and_are_not_kept():
+    """Test a failed run is reported to all attached callers, then retried fresh"""
+    coalescer = RunCoalescer()
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise Exception("Lokalise down")
+
+    results = await asyncio.gather(coalescer.run("k", failing), coalescer.run("k", failing), return_exceptions=True)
+    assert calls == 1
+    assert [str(result) for result in results] == ["Lokalise down", "Lokalise down"]
+
+    with pytest.raises(Exception):
+        await coalescer.run("k", failing)
+    assert calls == 2
+
+@pytest.mark.asyncio
+async def test_run_survives_cancelled_caller():
+    """Test cancelling the request that started a run doesn't cancel the run"""
+    coalescer = RunCoalescer()
+
+    async def run():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.ensure_future(coalescer.run("k", run))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await coalescer.run("k", run) == ("done", True)
+
+def test_idempotency_records_expire(settings):
+    """Test idempotency keys are remembered until the retention period ends"""
+    coalescer = RunCoalescer()
+    assert coalescer.get_idempotent("key-1") is None
+
+    coalescer.save_idempotent("key-1", "run-key", "a" * 32)
+    assert coalescer.get_idempotent("key-1") == {"run_key": "run-key", "run_id": "a" * 32}
+
+    os.utime(coalescer._idempotency_path("key-1"), (0, 0))
+    assert coalescer.get_idempotent("key-1") is None
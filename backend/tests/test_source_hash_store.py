@@ -0,0 +1,36 @@
+from translation_service.services.source_hash_store import SourceHashStore
+
+
+def test_update_and_get(translation_state_dir):
+    """Test hashes are persisted per key and language"""
+    store = SourceHashStore(project_id="project.1")
+    store.update([(123, "es", "Hello"), (123, "fr", "Hello")])
+
+    reloaded = SourceHashStore(project_id="project.1")
+    assert reloaded.get(123, "es") == SourceHashStore.hash_text("Hello")
+    assert reloaded.get("123", "fr") == SourceHashStore.hash_text("Hello")
+    assert reloaded.get(123, "it") is None
+    assert reloaded.path.parent == translation_state_dir / "source_hashes"
+
+def test_has_changed():
+    """Test change detection only fires when a hash was recorded"""
+    store = SourceHashStore(project_id="project.1")
+    assert not store.has_changed(1, "es", "Hello")
+
+    store.update([(1, "es", "Hello")])
+
+    assert not store.has_changed(1, "es", "Hello")
+    assert store.has_changed(1, "es", "Hello!")
+
+def test_stores_share_the_file():
+    """Test stores of other workers see and keep each other's hashes"""
+    first = SourceHashStore(project_id="project.1")
+    second = SourceHashStore(project_id="project.1")
+    assert first.get(1, "es") is None
+    assert second.get(2, "es") is None
+
+    first.update([(1, "es", "Hello")])
+    second.update([(2, "es", "Bye")])
+
+    assert first.get(2, "es") == SourceHashStore.hash_text("Bye")
+    assert SourceHashStore(project_id="project.1").get(1, "es") == SourceHashStore.hash_text("Hello")
@@ -0,0 +1,39 @@
+import pytest
+from translation_service.utils.text_classifier import classify_source_text
+
+
+@pytest.mark.parametrize("text,reason", [
+    ("", "empty"),
+    ("   ", "empty"),
+    ("https://example.com/help", "url"),
+    ("support@example.com", "email"),
+    ("1,234.56", "numeric"),
+    ("+1 (555) 010-0000", "numeric"),
+    ("25%", "numeric"),
+    ("{count}", "placeholders_only"),
+    ("%s: %d", "placeholders_only"),
+    ("{{ user.name }}", "placeholders_only"),
+    ("<br/>", "placeholders_only"),
+    ("[%1$s]", "placeholders_only"),
+    ("→ •", "no_letters"),
+])
+def test_classify_non_translatable(text, reason):
+    """Test detection of texts that need no translation"""
+    assert classify_source_text(text) == reason
+
+@pytest.mark.parametrize("text", [
+    "Hello",
+    "Hello, {name}!",
+    "You have %d new messages",
+    "<b>Save</b> changes",
+    "{count, plural, one {# item} other {# items}}",
+    "你好",
+])
+def test_classify_translatable(text):
+    """Test that texts with translatable words are left for the LLM"""
+    assert classify_source_text(text) is None
+
+def test_classify_do_not_translate_terms():
+    """Test product names are passed through"""
+    assert classify_source_text("NBBO", frozenset({"nbbo"})) == "do_not_translate"
+    assert classify_source_text("NBBO rules", frozenset({"nbbo"})) is None
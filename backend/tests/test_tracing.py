@@ -0,0 +1,164 @@
+import pytest
+import asyncio
+from aiohttp.test_utils import TestServer
+from unittest.mock import MagicMock, patch
+from translation_service.services.lokalise_service import LokaliseService
+from translation_service.services.translation_pipeline import TranslationPipeline
+from translation_service.utils.fake_openrouter import FakeOpenRouter, create_app
+from translation_service.utils.tracing import (
+    CURRENT_TRACE,
+    Trace,
+    export,
+    load_trace,
+    span,
+    to_otlp,
+    trace_run,
+    waterfall
+)
+
+
+def test_span_outside_run_is_noop():
+    """Test spans are not recorded without a traced run"""
+    with span('orphan', size=1) as attributes:
+        attributes['extra'] = True
+
+    assert CURRENT_TRACE.get() is None
+
+@pytest.mark.asyncio
+async def test_spans_nest_across_tasks_and_threads():
+    """Test spans keep their parent in gathered tasks and to_thread workers"""
+    def blocking():
+        with span('blocking'):
+            pass
+
+    async def child(name):
+        with span(name):
+            await asyncio.to_thread(blocking)
+
+    async with trace_run('a' * 32) as trace:
+        with span('root'):
+            await asyncio.gather(child('first'), child('second'))
+        with pytest.raises(ValueError):
+            with span('failing'):
+                raise ValueError("boom")
+
+    spans = {record['name']: record for record in trace.spans}
+    assert all(record['run_id'] == 'a' * 32 for record in trace.spans)
+    assert spans['first']['parent_id'] == spans['root']['span_id']
+    assert spans['second']['parent_id'] == spans['root']['span_id']
+    assert spans['root']['parent_id'] is None
+    blocking_parents = {r['parent_id'] for r in trace.spans if r['name'] == 'blocking'}
+    assert blocking_parents == {spans['first']['span_id'], spans['second']['span_id']}
+    assert spans['failing']['status'] == 'error'
+    assert spans['failing']['error'] == 'boom'
+
+@pytest.mark.asyncio
+async def test_nested_trace_run_joins_outer_run():
+    """Test a run started inside a traced run records into the outer trace"""
+    async with trace_run('b' * 32) as outer:
+        async with trace_run() as inner:
+            with span('inner'):
+                pass
+
+    assert inner is outer
+    assert [record['name'] for record in outer.spans] == ['inner']
+
+@pytest.mark.asyncio
+async def test_trace_exported_to_jsonl_and_waterfall():
+    """Test finished runs are written to JSON lines and laid out as a waterfall"""
+    async with trace_run('c' * 32):
+        with span('run'):
+            with span('fetch_keys'):
+                await asyncio.sleep(0.01)
+            with span('upload'):
+                pass
+
+    rows = waterfall(load_trace('c' * 32))
+
+    assert [(row['name'], row['depth']) for row in rows] == [('run', 0), ('fetch_keys', 1), ('upload', 1)]
+    assert rows[0]['offset_ms'] == 0
+    assert rows[2]['offset_ms'] >= rows[1]['duration_ms']
+    with pytest.raises(Exception):
+        load_trace('d' * 32)
+
+def test_otlp_export(settings):
+    """Test spans are posted to the collector as OTLP/JSON"""
+    settings.TRACE_EXPORTERS = ['otlp']
+    trace = Trace('e' * 32)
+    trace.add({
+        'run_id': 'e' * 32, 'span_id': '1' * 16, 'parent_id': None, 'name': 'llm_request',
+        'start': 1.5, 'duration_ms': 250.0, 'attributes': {'model': 'm'}, 'status': 'ok'
+    })
+    trace.add({
+        'run_id': 'e' * 32, 'span_id': '2' * 16, 'parent_id': '1' * 16, 'name': 'lokalise.update_key',
+        'start': 1.6, 'duration_ms': 10.0, 'attributes': {}, 'status': 'error', 'error': 'boom'
+    })
+
+    with patch('translation_service.utils.tracing.requests.post') as mock_post:
+        mock_post.return_value.status_code = 200
+        export(trace)
+
+    payload = mock_post.call_args.kwargs['json']
+    spans = payload['resourceSpans'][0]['scopeSpans'][0]['spans']
+    assert mock_post.call_args.args[0] == settings.TRACE_OTLP_ENDPOINT
+    assert spans[0]['traceId'] == 'e' * 32
+    assert spans[0]['startTimeUnixNano'] == '1500000000'
+    assert spans[0]['endTimeUnixNano'] == '1750000000'
+    assert {'key': 'model', 'value': {'stringValue': 'm'}} in spans[0]['attributes']
+    assert spans[1]['parentSpanId'] == '1' * 16
+    assert spans[1]['status'] == {'code': 2, 'message': 'boom'}
+    assert payload == to_otlp(trace)
+
+def test_trace_max_spans(settings):
+    """Test spans beyond TRACE_MAX_SPANS are dropped"""
+    settings.TRACE_MAX_SPANS = 1
+    trace = Trace('f' * 32)
+    trace.add({'name': 'kept'})
+    trace.add({'name': 'dropped'})
+
+    assert [record['name'] for record in trace.spans] == ['kept']
+    assert trace.dropped == 1
+
+@pytest.mark.asyncio
+async def test_pipeline_run_is_traced(settings):
+    """Test a pipeline run records spans for its phases and external calls"""
+    settings.OPEN_ROUTER_RETRY_BACKOFF_SECONDS = 0
+    server = TestServer(create_app(FakeOpenRouter()))
+    await server.start_server()
+    with patch('translation_service.services.translation_pipeline.LokaliseService'):
+        translation_pipeline = TranslationPipeline()
+    translation_pipeline.openrouter_base_url = str(server.make_url('/api/v1'))
+    translation_pipeline.lokalise_service = MagicMock(project_id='traced')
+    translation_pipeline.lokalise_service.get_all_keys.return_value = [
+        {'key_id': '1', 'key_name': 'a', 'translations': [{'language_iso': 'en', 'translation': 'Hello'}]},
+    ]
+    translation_pipeline.lokalise_service.upload_translation.return_value = [{'key_id': '1', 'status': 'success'}]
+
+    try:
+        async with trace_run('0' * 32) as trace:
+            await translation_pipeline.process_translations(target_language='es')
+    finally:
+        await server.close()
+
+    names = [record['name'] for record in trace.spans]
+    for name in ('run', 'fetch_keys', 'select', 'translate', 'translate_text', 'build_prompt',
+                 'glossary_lookup', 'llm_request', 'upload', 'record_hashes'):
+        assert name in names
+    by_id = {record['span_id']: record for record in trace.spans}
+    llm_request = next(record for record in trace.spans if record['name'] == 'llm_request')
+    assert llm_request['attributes']['status'] == 200
+    assert by_id[llm_request['parent_id']]['name'] == 'translate_text'
+    with open(settings.TRANSLATION_STATE_DIR / 'traces' / f"{'0' * 32}.jsonl") as f:
+        assert len(f.readlines()) == len(trace.spans)
+
+@pytest.mark.asyncio
+async def test_lokalise_calls_are_traced():
+    """Test Lokalise calls get a span named after the operation"""
+    with patch('translation_service.services.lokalise_service.LokaliseClient') as mock_client:
+        mock_client.return_value.project.return_value.statistics = {}
+        service = LokaliseService()
+
+    async with trace_run('9' * 32) as trace:
+        await asyncio.to_thread(service.get_project_statistics)
+
+    assert [record['name'] for record in trace.spans] == ['lokalise.get_project']
@@ -3,6 +3,7 @@ import json
 from unittest.mock import MagicMock, patch, mock_open
 from translation_service.services.translation_pipeline import TranslationPipeline
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
 
 class MockResponse:
     def __init__(self, status=200, json_data=None):
@@ -217,4 +218,316 @@ async def test_process_translations_no_source(translation_pipeline, mock_lokalis
     
     assert len(result) == 1
     assert result[0]["status"] == "skipped"
-    assert "No en source text available" in result[0]["reason"] 
\ No newline at end of file
+    assert "No en source text available" in result[0]["reason"] 
+
+@pytest.mark.asyncio
+async def test_process_translations_deduplicates_source_texts(translation_pipeline, mock_lokalise_service):
+    """Test that keys sharing a source text are translated once"""
+    mock_lokalise_service.get_all_keys.return_value = [
+        {'key_id': "1", 'key_name': "a", 'translations': [{"language_iso": "en", "translation": "Save"}]},
+        {'key_id': "2", 'key_name': "b", 'translations': [{"language_iso": "en", "translation": "Save"}]},
+    ]
+    mock_lokalise_service.upload_translation.return_value = []
+
+    calls = []
+
+    async def fake_translate(source_text, target_language, session):
+        calls.append(source_text)
+        return "Guardar"
+
+    with patch.object(translation_pipeline, 'translate_with_ai', side_effect=fake_translate):
+        result = await translation_pipeline.process_translations(target_language="es")
+
+    assert calls == ["Save"]
+    assert [r["translated_text"] for r in result] == ["Guardar", "Guardar"]
+    assert translation_pipeline.translation_memory.peek(("Save", "es")) == "Guardar"
+
+@pytest.mark.asyncio
+async def test_process_translations_streams_to_result_store(translation_pipeline, mock_lokalise_service):
+    """Test results are written to the run's store as stages finish them"""
+    from translation_service.services.result_store import RunResultStore
+    mock_lokalise_service.get_all_keys.return_value = [
+        {'key_id': "1", 'key_name': "a", 'translations': []},
+        {'key_id': "2", 'key_name': "b", 'translations': [{"language_iso": "en", "translation": "Save"}]},
+    ]
+    mock_lokalise_service.upload_translation.return_value = [{"key_id": "2", "status": "error", "error": "Locked"}]
+    written_before_translation = []
+
+    async def fake_translate(source_text, target_language, session):
+        written_before_translation.extend(store.page()[0])
+        return "Guardar"
+
+    with RunResultStore() as store:
+        with patch.object(translation_pipeline, 'translate_with_ai', side_effect=fake_translate):
+            result = await translation_pipeline.process_translations(target_language="es", result_store=store)
+
+    assert result == []
+    assert [r["key_id"] for r in written_before_translation] == ["1"]
+    details, _ = store.page()
+    assert [(r["key_id"], r["status"]) for r in details] == [("1", "skipped"), ("2", "error")]
+    assert store.counters["skipped"] == 1 and store.counters["failed"] == 1
+
+def test_plan_translations(translation_pipeline, mock_lokalise_service):
+    """Test dry-run planning without LLM calls or uploads"""
+    mock_lokalise_service.get_all_keys.return_value = [
+        {'key_id': "1", 'key_name': "a", 'translations': [{"language_iso": "en", "translation": "Buy cryptocurrency"}]},
+        {'key_id': "2", 'key_name': "b", 'translations': [{"language_iso": "en", "translation": "Buy cryptocurrency"}]},
+        {'key_id': "3", 'key_name': "c", 'translations': [{"language_iso": "en", "translation": "Sell"}]},
+        {'key_id': "4", 'key_name': "d", 'translations': [
+            {"language_iso": "en", "translation": "Hi"},
+            {"language_iso": "es", "translation": "Hola"}
+        ]},
+    ]
+    translation_pipeline.translation_memory.put(("Sell", "es"), "Vender")
+
+    plan = translation_pipeline.plan_translations(target_language="es")
+
+    assert plan["total_keys"] == 4
+    assert plan["keys_to_translate"] == 3
+    assert plan["skip_reasons"] == {"Translation already exists": 1}
+    assert plan["unique_source_texts"] == 2
+    assert plan["llm_calls"] == 1
+    assert plan["glossary_matches"] == 1
+    assert plan["cache_hits"]["duplicate_source_texts"] == 1
+    assert plan["cache_hits"]["translation_memory"] == 1
+    assert plan["estimated_tokens"]["total"] > 0
+    assert plan["estimated_duration_seconds"] > 0
+    mock_lokalise_service.upload_translation.assert_not_called()
+
+def test_plan_counts_avoided_calls_per_text(translation_pipeline, mock_lokalise_service):
+    """Test keys sharing a passthrough text count as one avoided LLM call"""
+    mock_lokalise_service.get_all_keys.return_value = [
+        {'key_id': "1", 'key_name': "a", 'translations': [{"language_iso": "en", "translation": "12345"}]},
+        {'key_id': "2", 'key_name': "b", 'translations': [{"language_iso": "en", "translation": "12345"}]},
+        {'key_id': "3", 'key_name': "c", 'translations': [{"language_iso": "en", "translation": "{count}"}]},
+    ]
+
+    plan = translation_pipeline.plan_translations(target_language="es")
+
+    assert plan["llm_calls_avoided"] == 2
+    assert plan["llm_calls"] == 0
+
+@pytest.mark.asyncio
+async def test_process_translations_passes_through_non_translatable(translation_pipeline, mock_lokalise_service):
+    """Test that placeholder-only and numeric keys are copied without an LLM call"""
+    mock_lokalise_service.get_all_keys.return_value = [
+        {'key_id': "1", 'key_name': "a", 'translations': [{"language_iso": "en", "translation": "{count}"}]},
+        {'key_id': "2", 'key_name': "b", 'translations': [{"language_iso": "en", "translation": "100%"}]},
+        {'key_id': "3", 'key_name': "c", 'translations': [{"language_iso": "en", "translation": "Save"}]},
+    ]
+    mock_lokalise_service.upload_translation.return_value = []
+
+    calls = []
+
+    async def fake_translate(source_text, target_language, session):
+        calls.append(source_text)
+        return "Guardar"
+
+    with patch.object(translation_pipeline, 'translate_with_ai', side_effect=fake_translate):
+        result = await translation_pipeline.process_translations(target_language="es")
+
+    assert calls == ["Save"]
+    by_name = {r["key_name"]: r for r in result}
+    assert by_name["a"]["translated_text"] == "{count}"
+    assert by_name["a"]["passthrough_reason"] == "placeholders_only"
+    assert by_name["b"]["passthrough_reason"] == "numeric"
+    assert "passthrough_reason" not in by_name["c"]
+
+@pytest.mark.asyncio
+async def test_translate_with_ai_masks_placeholders(translation_pipeline):
+    """Test placeholders are masked in the prompt and restored in the result"""
+    prompts = []
+
+    async def fake_completion(prompt, model, session, target_language, started=None):
+        prompts.append(prompt)
+        return "Hola ⟦1⟧, tienes ⟦2⟧ mensajes"
+
+    with patch.object(translation_pipeline, '_request_completion', side_effect=fake_completion):
+        result = await translation_pipeline.translate_with_ai(
+            source_text="Hello {name}, you have %d messages",
+            target_language="es",
+            session=None
+        )
+
+    assert result == "Hola {name}, tienes %d mensajes"
+    assert "{name}" not in prompts[0]
+    assert "⟦1⟧" in prompts[0]
+
+@pytest.mark.asyncio
+async def test_request_completion_frees_slot_while_backing_off(translation_pipeline, settings):
+    """Test the LLM slot is given back during the Retry-After wait and taken again for the retry"""
+    settings.OPEN_ROUTER_MAX_RETRIES = 1
+    translation_pipeline.concurrency = 1
+    started = MagicMock()
+
+    class Response:
+        def __init__(self, status):
+            self.status = status
+            self.headers = {'Retry-After': '0.05'}
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            pass
+
+        async def json(self):
+            return {"choices": [{"message": {"content": "Hola"}}]}
+
+    responses = iter([Response(429), Response(200)])
+    session = MagicMock()
+    session.post.side_effect = lambda *args, **kwargs: next(responses)
+
+    async def slots_in_use_while_backing_off():
+        await asyncio.sleep(0.02)
+        return translation_pipeline.llm_slots.in_use
+
+    result, in_use = await asyncio.gather(
+        translation_pipeline._request_completion("Hello", "model", session, started=started),
+        slots_in_use_while_backing_off()
+    )
+
+    assert result == "Hola"
+    assert in_use == 0
+    assert started.call_count == 2
+    assert translation_pipeline.llm_slots.in_use == 0
+
+@pytest.mark.asyncio
+async def test_translate_with_ai_retries_broken_placeholders(translation_pipeline):
+    """Test translations that drop a placeholder are retried, then rejected"""
+    with patch.object(translation_pipeline, '_request_completion', side_effect=["Hola", "Hola ⟦1⟧"]):
+        result = await translation_pipeline.translate_with_ai("Hello {name}", "es", session=None)
+
+    assert result == "Hola {name}"
+
+    with patch.object(translation_pipeline, '_request_completion', return_value="Hola") as mock_completion:
+        with pytest.raises(Exception) as exc_info:
+            await translation_pipeline.translate_with_ai("Hello {name}", "es", session=None)
+
+    assert "Placeholder validation failed" in str(exc_info.value)
+    assert mock_completion.call_count == 3
+
+@pytest.mark.asyncio
+async def test_process_translations_incremental(translation_pipeline, mock_lokalise_service):
+    """Test incremental runs only retranslate keys whose source changed"""
+    def make_keys(source_a, source_b):
+        return [
+            {'key_id': "1", 'key_name': "a", 'translations': [
+                {"language_iso": "en", "translation": source_a},
+                {"language_iso": "es", "translation": "Guardar"}
+            ]},
+            {'key_id': "2", 'key_name': "b", 'translations': [
+                {"language_iso": "en", "translation": source_b},
+                {"language_iso": "es", "translation": "Cancelar"}
+            ]},
+        ]
+
+    mock_lokalise_service.upload_translation.return_value = []
+    calls = []
+
+    async def fake_translate(source_text, target_language, session):
+        calls.append(source_text)
+        return "Guardar cambios"
+
+    with patch.object(translation_pipeline, 'translate_with_ai', side_effect=fake_translate):
+        # First incremental run records a baseline for existing translations
+        mock_lokalise_service.get_all_keys.return_value = make_keys("Save", "Cancel")
+        result = await translation_pipeline.process_translations(target_language="es", incremental=True)
+        assert [r["status"] for r in result] == ["skipped", "skipped"]
+
+        mock_lokalise_service.get_all_keys.return_value = make_keys("Save changes", "Cancel")
+        result = await translation_pipeline.process_translations(target_language="es", incremental=True)
+
+    assert calls == ["Save changes"]
+    by_name = {r["key_name"]: r for r in result}
+    assert by_name["a"]["status"] == "success"
+    assert by_name["a"]["source_changed"] is True
+    assert by_name["b"]["status"] == "skipped"
+    assert not translation_pipeline.source_hash_store.has_changed("1", "es", "Save changes")
+
+@pytest.mark.asyncio
+async def test_process_translations_time_budget(translation_pipeline, mock_lokalise_service):
+    """Test priority keys run first and keys past the time budget are deferred"""
+    mock_lokalise_service.get_all_keys.return_value = [
+        {'key_id': "1", 'key_name': "a", 'tags': [], 'translations': [{"language_iso": "en", "translation": "Hello"}]},
+        {'key_id': "2", 'key_name': "b", 'tags': ["release"], 'translations': [{"language_iso": "en", "translation": "Release notes"}]},
+    ]
+    mock_lokalise_service.upload_translation.return_value = []
+    translation_pipeline.concurrency = 1
+
+    async def slow_translate(source_text, target_language, session):
+        await asyncio.sleep(0.1)
+        return f"es:{source_text}"
+
+    with patch.object(translation_pipeline, 'translate_with_ai', side_effect=slow_translate):
+        result = await translation_pipeline.process_translations(
+            target_language="es",
+            priority_tags=["release"],
+            time_budget=0.05
+        )
+
+    by_name = {r["key_name"]: r for r in result}
+    assert by_name["b"]["status"] == "success"
+    assert by_name["a"]["status"] == "deferred"
+    uploaded = mock_lokalise_service.upload_translation.call_args[0][0]
+    assert [key["key_name"] for key in uploaded] == ["b"]
+
+@pytest.mark.asyncio
+async def test_process_translations_evaluates_and_skips_similar(translation_pipeline, mock_lokalise_service):
+    """Test existing translations are scored and near-identical ones are not uploaded"""
+    mock_lokalise_service.get_all_keys.return_value = [
+        {'key_id': "1", 'key_name': "a", 'translations': [
+            {"language_iso": "en", "translation": "Save your changes now"},
+            {"language_iso": "es", "translation": "Guarde sus cambios ahora"}
+        ]},
+        {'key_id': "2", 'key_name': "b", 'translations': [
+            {"language_iso": "en", "translation": "Cancel"},
+            {"language_iso": "es", "translation": "Salir"}
+        ]},
+        {'key_id': "3", 'key_name': "c", 'translations': [{"language_iso": "en", "translation": "Delete"}]},
+    ]
+    mock_lokalise_service.upload_translation.return_value = []
+    translations = {
+        "Save your changes now": "Guarde sus cambios ahora.",
+        "Cancel": "Cancelar",
+        "Delete": "Eliminar",
+    }
+
+    async def fake_translate(source_text, target_language, session):
+        return translations[source_text]
+
+    with patch.object(translation_pipeline, 'translate_with_ai', side_effect=fake_translate):
+        result = await translation_pipeline.process_translations(
+            target_language="es",
+            force_translate=True,
+            skip_similar_threshold=0.9
+        )
+
+    by_name = {r["key_name"]: r for r in result}
+    assert by_name["a"]["quality"]["bleu_score"] == 1.0
+    assert by_name["a"]["status"] == "skipped"
+    assert by_name["a"]["reason"] == "Translation unchanged"
+    assert by_name["b"]["status"] == "success"
+    assert by_name["b"]["quality"]["chrf_score"] < 0.9
+    assert "quality" not in by_name["c"]
+    uploaded = mock_lokalise_service.upload_translation.call_args[0][0]
+    assert [key["key_name"] for key in uploaded] == ["b", "c"]
+    assert not translation_pipeline.source_hash_store.has_changed("1", "es", "Save your changes now")
+
+@pytest.mark.asyncio
+async def test_evaluate_translations_process_pool(translation_pipeline, settings):
+    """Test large evaluations are scored across processes with the same scores"""
+    results = [
+        {'existing_translation': f"esto es la frase {i}", 'translated_text': f"esta es la frase {i}"}
+        for i in range(12)
+    ]
+    await translation_pipeline._evaluate_translations(results, "es")
+    expected = [result.pop('quality') for result in results]
+
+    settings.QUALITY_BATCH_PROCESS_THRESHOLD = 4
+    settings.QUALITY_BATCH_WORKERS = 2
+    with patch('translation_service.utils.bleu_scorer.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as mock_pool:
+        await translation_pipeline._evaluate_translations(results, "es")
+
+    mock_pool.assert_called_once_with(max_workers=2)
+    assert [result['quality'] for result in results] == expected
@@ -0,0 +1,57 @@
+import pytest
+import asyncio
+import time
+from translation_service.services.translation_scheduler import TranslationScheduler
+
+
+def test_priority_order():
+    """Test tagged keys come first, then new keys, then shorter texts"""
+    scheduler = TranslationScheduler(concurrency=1)
+    jobs = {
+        'long new': scheduler.priority('long new text', is_new=True, is_tagged=False),
+        'update': scheduler.priority('upd', is_new=False, is_tagged=False),
+        'short new': scheduler.priority('new', is_new=True, is_tagged=False),
+        'tagged update': scheduler.priority('a tagged update', is_new=False, is_tagged=True),
+    }
+
+    assert sorted(jobs, key=jobs.get) == ['tagged update', 'short new', 'long new', 'update']
+
+def test_unknown_priority_criteria():
+    """Test configuration errors are reported"""
+    with pytest.raises(Exception) as exc_info:
+        TranslationScheduler(concurrency=1, priority_order=['tagged', 'oldest'])
+
+    assert "oldest" in str(exc_info.value)
+
+@pytest.mark.asyncio
+async def test_run_in_priority_order_and_collect_errors():
+    """Test jobs start in priority order and failures are isolated"""
+    scheduler = TranslationScheduler(concurrency=1)
+    started = []
+
+    async def worker(job):
+        started.append(job)
+        if job == 'b':
+            raise Exception('boom')
+        return job.upper()
+
+    results, errors, deferred = await scheduler.run({'a': (2,), 'b': (1,), 'c': (0,)}, worker)
+
+    assert started == ['c', 'b', 'a']
+    assert results == {'a': 'A', 'c': 'C'}
+    assert str(errors['b']) == 'boom'
+    assert deferred == []
+
+@pytest.mark.asyncio
+async def test_run_defers_work_after_deadline():
+    """Test no new jobs start once the deadline has passed"""
+    scheduler = TranslationScheduler(concurrency=2, deadline=time.monotonic() + 0.05)
+
+    async def worker(job):
+        await asyncio.sleep(0.1)
+        return job
+
+    results, errors, deferred = await scheduler.run({'a': (0,), 'b': (1,), 'c': (2,), 'd': (3,)}, worker)
+
+    assert set(results) == {'a', 'b'}
+    assert deferred == ['c', 'd']
@@ -2,6 +2,8 @@ import pytest
 from unittest.mock import MagicMock, patch
 from translation_service.services.translation_service import TranslationService
 from django.conf import settings
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 
 @pytest.fixture
 def translation_service():
@@ -67,3 +69,153 @@ def test_check_translation_quality(translation_service):
     assert result['translations']['source_text'] == source_text
     assert result['translations']['reference_translation'] == reference
     assert result['translations']['candidate_translation'] == candidate
+
+
+def test_check_translation_quality_batch(translation_service):
+    """Test batch quality check in-process"""
+    pairs = [
+        {"id": "1", "existing_translation": "Esto es una prueba", "llm_translation": "Esto es una prueba"},
+        {"existing_translation": "This is a test", "llm_translation": "Something completely different"},
+    ]
+
+    result = translation_service.check_translation_quality_batch(pairs)
+
+    assert result['count'] == 2
+    assert result['results'][0] == {"id": "1", "bleu_score": 1.0, "chrf_score": 1.0}
+    assert result['results'][1]['bleu_score'] == 0.0
+    assert result['results'][1]['chrf_score'] < 0.5
+    assert result['mean_bleu'] == 0.5
+    assert 0 < result['corpus_bleu'] < 1
+    assert 0 < result['corpus_chrf'] < 1
+
+
+def test_check_translation_quality_chinese(translation_service):
+    """Test the target language selects character tokenization"""
+    result = translation_service.check_translation_quality(
+        source_text="The weather is nice today",
+        reference_translation="今天天气很好。",
+        candidate_translation="今天天气很好。",
+        target_language="zh_CN"
+    )
+
+    assert result['bleu_score'] == 1.0
+    assert result['chrf_score'] == 1.0
+
+
+def test_check_translation_quality_batch_process_pool(translation_service, settings):
+    """Test large batches are scored across processes with the same results"""
+    pairs = [
+        {"existing_translation": f"this is test sentence number {i}", "llm_translation": f"this is a test sentence {i}"}
+        for i in range(40)
+    ]
+    expected = translation_service.check_translation_quality_batch(pairs)
+
+    settings.QUALITY_BATCH_PROCESS_THRESHOLD = 10
+    settings.QUALITY_BATCH_WORKERS = 3
+    with patch('translation_service.utils.bleu_scorer.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as mock_pool:
+        result = translation_service.check_translation_quality_batch(pairs)
+
+    mock_pool.assert_called_once_with(max_workers=3)
+    assert result == expected
+
+
+@pytest.fixture
+def shared_pipeline():
+    """Pipeline with Lokalise mocked out, for the async translation methods"""
+    with patch('translation_service.services.translation_pipeline.LokaliseService'):
+        from translation_service.services.translation_pipeline import TranslationPipeline
+        pipeline = TranslationPipeline()
+    pipeline.concurrency = 2
+    return pipeline
+
+
+def test_translate_with_ai_uses_configured_model(translation_service, mock_requests, settings):
+    """Test the blocking variant uses the pipeline's model and a timeout"""
+    settings.LLM_MODEL = 'test/model'
+    mock_requests['post'].return_value = MagicMock(
+        status_code=200, json=MagicMock(return_value={'choices': [{'message': {'content': 'Hola'}}]})
+    )
+
+    translation_service.translate_with_ai("Hello", "es")
+
+    call_kwargs = mock_requests['post'].call_args[1]
+    assert call_kwargs['json']['model'] == 'test/model'
+    assert call_kwargs['timeout'] == settings.OPEN_ROUTER_TIMEOUT_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_translate_batch(shared_pipeline):
+    """Test ad-hoc batches share the pipeline's memory, passthrough and error handling"""
+    service = TranslationService(pipeline=shared_pipeline)
+    requests_made = []
+
+    async def fake_completion(prompt, model, session, target_language, started=None):
+        requests_made.append(prompt)
+        if "Broken" in prompt:
+            raise Exception("OpenRouter API error: boom")
+        return "Hola"
+
+    with patch.object(shared_pipeline, '_request_completion', side_effect=fake_completion):
+        results = await service.translate_batch(["Hello", "12345", "Hello", "Broken"], "es")
+        assert await service.translate_with_ai_async("Hello", "es") == "Hola"
+        with pytest.raises(Exception, match="boom"):
+            await service.translate_with_ai_async("Broken", "es")
+
+    assert [r['status'] for r in results] == ['success', 'success', 'success', 'error']
+    assert results[0]['translated_text'] == results[2]['translated_text'] == "Hola"
+    assert results[1] == {'status': 'success', 'source_text': '12345', 'translated_text': '12345', 'passthrough_reason': 'numeric'}
+    assert "boom" in results[3]['error']
+    # Repeats of "Hello" were served from the translation memory
+    assert sum("Hello" in prompt for prompt in requests_made) == 1
+
+
+@pytest.mark.asyncio
+async def test_translate_batch_shares_session_and_concurrency(shared_pipeline):
+    """Test concurrent callers borrow one session and respect one concurrency limit"""
+    service = TranslationService(pipeline=shared_pipeline)
+    sessions = set()
+    in_flight = 0
+    max_in_flight = 0
+
+    class SlowResponse:
+        status = 200
+
+        async def __aenter__(self):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            return self
+
+        async def __aexit__(self, *exc_info):
+            nonlocal in_flight
+            in_flight -= 1
+
+        async def json(self):
+            return {"choices": [{"message": {"content": "ok"}}]}
+
+    def fake_post(session, url, **kwargs):
+        sessions.add(id(session))
+        return SlowResponse()
+
+    with patch('aiohttp.ClientSession.post', new=fake_post):
+        await asyncio.gather(
+            service.translate_batch([f"First {i}" for i in range(4)], "es"),
+            service.translate_batch([f"Second {i}" for i in range(4)], "es"),
+        )
+
+    assert len(sessions) == 1
+    assert max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_client_session_is_closed_by_last_user(shared_pipeline):
+    """Test the shared session lives while borrowed and closes afterwards"""
+    async with shared_pipeline.client_session() as first:
+        async with shared_pipeline.client_session() as second:
+            assert first is second
+        assert not first.closed
+    assert first.closed
+
+    async with shared_pipeline.client_session() as third:
+        assert third is not first
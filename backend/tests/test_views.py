@@ -4,10 +4,12 @@ from rest_framework.test import APIRequestFactory, force_authenticate
 from rest_framework import status
 from django.core.files.uploadedfile import SimpleUploadedFile
 from translation_service.views import TranslationViewSet
+from translation_service.services import registry
 from rest_framework.test import APIClient
 from django.urls import reverse
 import json
 from asgiref.sync import async_to_sync
+import asyncio
 
 @pytest.fixture
 def api_client():
@@ -17,9 +19,10 @@ def api_client():
 @pytest.fixture
 def mock_services():
     """Mock all service initializations"""
-    with patch('translation_service.views.TranslationService') as mock_translation_service, \
-         patch('translation_service.views.LokaliseService') as mock_lokalise_service, \
-         patch('translation_service.views.TranslationPipeline') as mock_translation_pipeline:
+    with patch('translation_service.services.registry.TranslationService') as mock_translation_service, \
+         patch('translation_service.services.registry.LokaliseService') as mock_lokalise_service, \
+         patch('translation_service.services.registry.TranslationPipeline') as mock_translation_pipeline:
+        registry.reset()
         
         # Create mock instances
         mock_translation_service_instance = MagicMock()
@@ -36,6 +39,7 @@ def mock_services():
             'lokalise_service': mock_lokalise_service_instance,
             'translation_pipeline': mock_translation_pipeline_instance
         }
+        registry.reset()
 
 @pytest.fixture
 def translation_viewset(mock_services):
@@ -85,6 +89,39 @@ def test_upload_file_invalid_data(api_client, translation_viewset):
     
     assert response.status_code == status.HTTP_400_BAD_REQUEST
 
+def test_upload_file_split(api_client, translation_viewset, mock_services):
+    """Test `split` uploads through the bulk uploader and returns the merged report"""
+    report = {"filename": "en.json", "status": "success", "chunks": 3, "process_ids": ["1", "2", "3"]}
+
+    async def upload(files, **kwargs):
+        return [report]
+
+    with patch.object(registry.bulk_uploader, 'upload', side_effect=upload) as mock_upload:
+        response = api_client.post(
+            reverse('translation-upload-file'),
+            {"file": SimpleUploadedFile("en.json", b"{}"), "lang_iso": "en", "split": True},
+            format='multipart'
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == report
+    assert mock_upload.call_args.kwargs["split"] is True
+    mock_services['lokalise_service'].upload_file.assert_not_called()
+
+def test_upload_file_too_large(api_client, translation_viewset, settings):
+    """Test uploads above LOKALISE_UPLOAD_MAX_SIZE are rejected"""
+    settings.LOKALISE_UPLOAD_MAX_SIZE = 10
+    file = SimpleUploadedFile("test.json", b'{"key1": "value1"}', content_type="application/json")
+
+    response = api_client.post(
+        reverse('translation-upload-file'),
+        {"file": file, "lang_iso": "es"},
+        format='multipart'
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "file" in response.data
+
 def test_upload_file_error(api_client, translation_viewset, mock_services):
     """Test file upload error handling"""
     # Create a valid JSON file content
@@ -115,6 +152,90 @@ def test_upload_file_error(api_client, translation_viewset, mock_services):
     assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
     assert "error" in response.data
 
+def test_bulk_upload(api_client, translation_viewset, mock_services):
+    """Test files and archive members are uploaded and reported per file"""
+    import io
+    import zipfile
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("locales/de.json", "{}")
+        archive.writestr("notes.txt", "")
+    archive_file = SimpleUploadedFile("locales.zip", buffer.getvalue(), content_type="application/zip")
+
+    uploaded = []
+
+    async def upload(files, **kwargs):
+        uploaded.extend(name for name, _ in files)
+        return [{"filename": name, "status": "success", "process_id": name} for name, _ in files]
+
+    with patch.object(registry.bulk_uploader, 'upload', side_effect=upload) as mock_upload:
+        response = api_client.post(
+            reverse('translation-bulk-upload'),
+            {
+                "files": [
+                    SimpleUploadedFile("en.json", b"{}", content_type="application/json"),
+                    SimpleUploadedFile("fr.json", b"{}", content_type="application/json"),
+                ],
+                "archive": archive_file,
+                "lang_iso": "EN",
+            },
+            format='multipart'
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert uploaded == ["en.json", "fr.json", "locales/de.json"]
+    assert mock_upload.call_args.kwargs["lang_iso"] == "en"
+    assert response.data["total"] == 4
+    assert response.data["success"] == 3
+    assert response.data["skipped"] == 1
+
+def test_bulk_upload_invalid(api_client, translation_viewset):
+    """Test bulk uploads need files or an archive, and a valid archive"""
+    url = reverse('translation-bulk-upload')
+    assert api_client.post(url, {"lang_iso": "en"}, format='multipart').status_code == status.HTTP_400_BAD_REQUEST
+
+    response = api_client.post(
+        url,
+        {"archive": SimpleUploadedFile("locales.zip", b"not a zip"), "lang_iso": "en"},
+        format='multipart'
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "zip" in response.data["error"]
+
+@pytest.mark.asyncio
+async def test_export_streams_bundle_with_etag(mock_services, tmp_path):
+    """Test exports stream the cached bundle and answer 304 to a matching ETag"""
+    from django.test import AsyncClient
+    bundle = tmp_path / "bundle.zip"
+    bundle.write_bytes(b"PK" + b"x" * 1000)
+
+    async def get_bundle(file_format, languages):
+        assert (file_format, languages) == ("yaml", ["es", "fr"])
+        return bundle, "abc"
+
+    client = AsyncClient()
+    url = reverse('translation-export')
+    with patch.object(registry.export_cache, 'get_bundle_async', side_effect=get_bundle):
+        response = await client.get(url, {"file_format": "yaml", "languages": "fr,ES"})
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        not_modified = await client.get(url, {"file_format": "yaml", "languages": "fr,es"}, headers={'If-None-Match': 'W/"abc"'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] == '"abc"'
+    assert response['Content-Type'] == 'application/zip'
+    assert content == bundle.read_bytes()
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+def test_export_errors(api_client, translation_viewset):
+    """Test unknown formats and failed exports are reported"""
+    url = reverse('translation-export')
+    assert api_client.get(url, {"file_format": "exe"}).status_code == status.HTTP_400_BAD_REQUEST
+
+    with patch.object(registry.export_cache, 'get_bundle_async', side_effect=Exception("Error exporting files: quota")):
+        response = api_client.get(url)
+    assert response.status_code == status.HTTP_502_BAD_GATEWAY
+    assert "quota" in response.data["error"]
+
 def test_check_quality_success(api_client, translation_viewset, mock_services):
     """Test successful quality check"""
     # Set up mock response
@@ -177,6 +298,47 @@ def test_check_quality_error(api_client, translation_viewset, mock_services):
     assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
     assert "error" in response.data
 
+def test_check_quality_batch_success(api_client, translation_viewset, mock_services):
+    """Test batch quality check"""
+    mock_services['translation_service'].check_translation_quality_batch.return_value = {
+        "count": 2,
+        "corpus_bleu": 0.5,
+        "mean_bleu": 0.5,
+        "results": [{"id": "a", "bleu_score": 1.0}, {"id": "b", "bleu_score": 0.0}]
+    }
+
+    url = reverse('translation-check-quality-batch')
+    response = api_client.post(
+        url,
+        {
+            "target_language": "es",
+            "pairs": [
+                {"id": "a", "existing_translation": "Hola mundo", "llm_translation": "Hola mundo"},
+                {"id": "b", "existing_translation": "Hola", "llm_translation": "Adiós"}
+            ]
+        },
+        format='json'
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['corpus_bleu'] == 0.5
+    pairs = mock_services['translation_service'].check_translation_quality_batch.call_args[0][0]
+    assert [pair['id'] for pair in pairs] == ["a", "b"]
+
+def test_check_quality_batch_invalid(api_client, translation_viewset, mock_services, settings):
+    """Test batch quality check validation"""
+    url = reverse('translation-check-quality-batch')
+
+    response = api_client.post(url, {"target_language": "es", "pairs": []}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "pairs" in response.data
+
+    settings.QUALITY_BATCH_MAX_PAIRS = 1
+    pair = {"existing_translation": "Hola", "llm_translation": "Hola"}
+    response = api_client.post(url, {"target_language": "es", "pairs": [pair, pair]}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    mock_services['translation_service'].check_translation_quality_batch.assert_not_called()
+
 def test_process_translations_success(api_client, translation_viewset, mock_services):
     """Test successful translation processing"""
     mock_results = [
@@ -189,7 +351,8 @@ def test_process_translations_success(api_client, translation_viewset, mock_serv
     
     # Set up mock response - wrap the coroutine in a synchronous result
     async def mock_async_result(*args, **kwargs):
-        return mock_results
+        kwargs['result_store'].extend(mock_results)
+        return []
     mock_services['translation_pipeline'].process_translations = mock_async_result
     
     url = reverse('translation-process-translations')
@@ -208,6 +371,104 @@ def test_process_translations_success(api_client, translation_viewset, mock_serv
     assert "successful" in response.data
     assert "details" in response.data
 
+def test_process_translations_trace(api_client, translation_viewset, mock_services):
+    """Test a run's spans are served as a waterfall under its run id"""
+    from translation_service.utils.tracing import span
+
+    async def mock_async_result(*args, **kwargs):
+        with span('fetch_keys'):
+            pass
+        kwargs['result_store'].add({"key_id": "1", "status": "success"})
+        return []
+    mock_services['translation_pipeline'].process_translations = mock_async_result
+
+    response = api_client.post(
+        reverse('translation-process-translations'),
+        {"target_language": "es"},
+        format='json'
+    )
+    run_id = response.data["run_id"]
+    trace = api_client.get(f'/api/translations/runs/{run_id}/trace/')
+
+    assert trace.status_code == status.HTTP_200_OK
+    assert [(s["name"], s["run_id"], s["depth"]) for s in trace.data["spans"]] == [("fetch_keys", run_id, 0)]
+    assert api_client.get(f'/api/translations/runs/{"0" * 32}/trace/').status_code == status.HTTP_404_NOT_FOUND
+
+def test_process_translations_priority_tags(api_client, translation_viewset, mock_services):
+    """Test priority tags are validated as a list of strings"""
+    calls = []
+
+    async def mock_async_result(*args, **kwargs):
+        calls.append(kwargs)
+        return []
+    mock_services['translation_pipeline'].process_translations = mock_async_result
+    url = reverse('translation-process-translations')
+
+    response = api_client.post(url, {"target_language": "es", "priority_tags": "release"}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "priority_tags" in response.data
+
+    response = api_client.post(url, {"target_language": "es", "priority_tags": ["release", "beta"]}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert calls[0]["priority_tags"] == ["release", "beta"]
+
+def test_process_translations_paginates_details(api_client, translation_viewset, mock_services, settings):
+    """Test large runs return the first page of details and a cursor to the rest"""
+    settings.RESULT_PAGE_SIZE = 2
+    mock_results = [{"key_id": str(i), "status": "success"} for i in range(5)]
+
+    async def mock_async_result(*args, **kwargs):
+        kwargs['result_store'].extend(mock_results)
+        return []
+    mock_services['translation_pipeline'].process_translations = mock_async_result
+
+    response = api_client.post(
+        reverse('translation-process-translations'),
+        {"target_language": "es"},
+        format='json'
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["total_processed"] == 5
+    assert response.data["successful"] == 5
+    assert [d["key_id"] for d in response.data["details"]] == ["0", "1"]
+
+    keys = [d["key_id"] for d in response.data["details"]]
+    cursor = response.data["next_cursor"]
+    url = reverse('translation-run-details', kwargs={"run_id": response.data["run_id"]})
+    while cursor:
+        page = api_client.get(url, {"cursor": cursor, "limit": 2})
+        assert page.status_code == status.HTTP_200_OK
+        keys.extend(d["key_id"] for d in page.data["details"])
+        cursor = page.data["next_cursor"]
+    assert keys == ["0", "1", "2", "3", "4"]
+
+def test_run_details_errors(api_client, translation_viewset, settings):
+    """Test unknown runs and out-of-range limits are rejected"""
+    url = reverse('translation-run-details', kwargs={"run_id": "0" * 32})
+    assert api_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+    assert api_client.get(url, {"limit": settings.RESULT_PAGE_MAX_SIZE + 1}).status_code == status.HTTP_400_BAD_REQUEST
+
+def test_responses_are_gzipped(api_client, translation_viewset, mock_services):
+    """Test responses are rendered with orjson and gzipped when the client accepts it"""
+    mock_results = [{"key_id": str(i), "status": "success", "translated_text": "Hola mundo"} for i in range(50)]
+
+    async def mock_async_result(*args, **kwargs):
+        kwargs['result_store'].extend(mock_results)
+        return []
+    mock_services['translation_pipeline'].process_translations = mock_async_result
+
+    response = api_client.post(
+        reverse('translation-process-translations'),
+        {"target_language": "es"},
+        format='json',
+        HTTP_ACCEPT_ENCODING='gzip'
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Content-Type'] == 'application/json'
+
 def test_process_translations_missing_language(api_client, translation_viewset):
     """Test translation processing with missing target language"""
     url = reverse('translation-process-translations')
@@ -218,4 +479,207 @@ def test_process_translations_missing_language(api_client, translation_viewset):
     )
     
     assert response.status_code == status.HTTP_400_BAD_REQUEST
-    assert "error" in response.data 
\ No newline at end of file
+    assert "error" in response.data 
+
+
+def test_process_translations_dry_run(api_client, translation_viewset, mock_services):
+    """Test dry-run returns the plan without running the pipeline"""
+    mock_services['translation_pipeline'].plan_translations.return_value = {
+        "keys_to_translate": 3,
+        "llm_calls": 2
+    }
+
+    url = reverse('translation-process-translations')
+    response = api_client.post(
+        url,
+        {
+            "target_language": "es",
+            "dry_run": True
+        },
+        format='json'
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["llm_calls"] == 2
+    mock_services['translation_pipeline'].plan_translations.assert_called_once_with(
+        target_language="es",
+        source_language="en",
+        force_translate=False,
+        key_filters=None,
+        incremental=False
+    )
+
+def test_process_translations_with_filters(api_client, translation_viewset, mock_services):
+    """Test key filters are validated and passed to the pipeline"""
+    mock_services['translation_pipeline'].plan_translations.return_value = {}
+
+    url = reverse('translation-process-translations')
+    response = api_client.post(
+        url,
+        {
+            "target_language": "es",
+            "dry_run": True,
+            "filters": {"tags": ["release-2.0"], "key_name_pattern": "checkout.*"}
+        },
+        format='json'
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    call_kwargs = mock_services['translation_pipeline'].plan_translations.call_args.kwargs
+    assert call_kwargs['key_filters'] == {"tags": ["release-2.0"], "key_name_pattern": "checkout.*"}
+
+def test_process_translations_invalid_filters(api_client, translation_viewset):
+    """Test invalid key filters are rejected"""
+    url = reverse('translation-process-translations')
+    response = api_client.post(
+        url,
+        {
+            "target_language": "es",
+            "filters": {"key_name_regex": "("}
+        },
+        format='json'
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "error" in response.data
+
+def test_process_translations_evaluation(api_client, translation_viewset, mock_services):
+    """Test evaluation options are passed on and summarized"""
+    received = {}
+
+    async def mock_async_result(*args, **kwargs):
+        received.update(kwargs)
+        kwargs['result_store'].extend([
+            {"key_id": "1", "status": "skipped", "reason": "Translation unchanged", "quality": {"bleu_score": 1.0, "chrf_score": 1.0}},
+            {"key_id": "2", "status": "success", "quality": {"bleu_score": 0.2, "chrf_score": 0.4}},
+        ])
+        return []
+    mock_services['translation_pipeline'].process_translations = mock_async_result
+
+    url = reverse('translation-process-translations')
+    response = api_client.post(
+        url,
+        {"target_language": "es", "evaluate": True, "skip_similar_threshold": 0.95},
+        format='json'
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert received['evaluate'] is True
+    assert received['skip_similar_threshold'] == 0.95
+    assert response.data['evaluated'] == 2
+    assert response.data['unchanged_translations'] == 1
+
+    response = api_client.post(url, {"target_language": "es", "skip_similar_threshold": 2}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_services_built_once_per_process(api_client):
+    """Test requests reuse the registry's services instead of building their own"""
+    with patch('translation_service.services.registry.TranslationService') as mock_translation_service, \
+         patch('translation_service.services.registry.LokaliseService') as mock_lokalise_service, \
+         patch('translation_service.services.registry.TranslationPipeline') as mock_translation_pipeline:
+        registry.reset()
+        mock_translation_service.return_value.check_translation_quality.return_value = {"bleu_score": 1.0}
+
+        url = reverse('translation-check-quality')
+        data = {
+            "source_text": "Hello world",
+            "existing_translation": "Hola mundo",
+            "llm_translation": "Hola mundo",
+            "target_language": "es"
+        }
+        for _ in range(3):
+            response = api_client.post(url, data, format='json')
+            assert response.status_code == status.HTTP_200_OK
+        registry.reset()
+
+    assert mock_translation_service.call_count == 1
+    assert mock_translation_pipeline.call_count == 1
+    assert mock_lokalise_service.call_count == 1
+
+def test_views_are_async():
+    """Test the router serves coroutine views, run natively under ASGI"""
+    from asgiref.sync import iscoroutinefunction
+    from django.urls import resolve
+    assert iscoroutinefunction(resolve(reverse('translation-process-translations')).func)
+    assert iscoroutinefunction(resolve(reverse('translation-check-quality')).func)
+
+@pytest.mark.asyncio
+async def test_concurrent_runs_share_one_event_loop(mock_services):
+    """Test translation runs on one ASGI worker overlap instead of queueing"""
+    from django.test import AsyncClient
+    running = 0
+    max_running = 0
+
+    async def slow_run(*args, **kwargs):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        kwargs['result_store'].add({"key_id": "1", "status": "success"})
+        return []
+    mock_services['translation_pipeline'].process_translations = slow_run
+    mock_services['translation_service'].check_translation_quality.return_value = {"bleu_score": 1.0}
+
+    client = AsyncClient()
+    url = reverse('translation-process-translations')
+    responses = await asyncio.gather(
+        *(client.post(url, {"target_language": language}, content_type='application/json') for language in ("es", "fr", "de")),
+        client.post(reverse('translation-check-quality'), {
+            "source_text": "Hello", "existing_translation": "Hola", "llm_translation": "Hola", "target_language": "es"
+        }, content_type='application/json')
+    )
+
+    assert [response.status_code for response in responses] == [200, 200, 200, 200]
+    assert max_running == 3
+
+@pytest.mark.asyncio
+async def test_identical_runs_are_coalesced(mock_services):
+    """Test a second identical request attaches to the run in flight"""
+    from django.test import AsyncClient
+    calls = 0
+
+    async def slow_run(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        kwargs['result_store'].add({"key_id": "1", "status": "success"})
+        return []
+    mock_services['translation_pipeline'].process_translations = slow_run
+
+    client = AsyncClient()
+    url = reverse('translation-process-translations')
+    first, second, other = await asyncio.gather(
+        client.post(url, {"target_language": "es"}, content_type='application/json'),
+        client.post(url, {"target_language": "es"}, content_type='application/json'),
+        client.post(url, {"target_language": "es", "evaluate": True}, content_type='application/json')
+    )
+
+    assert calls == 2
+    assert first.json()["run_id"] == second.json()["run_id"] != other.json()["run_id"]
+    assert sorted([first.json()["coalesced"], second.json()["coalesced"]]) == [False, True]
+    assert other.json()["coalesced"] is False
+
+def test_idempotency_key_replays_run(api_client, translation_viewset, mock_services):
+    """Test a retried request with the same Idempotency-Key gets the stored run"""
+    calls = 0
+
+    async def run(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        kwargs['result_store'].add({"key_id": "1", "status": "success"})
+        return []
+    mock_services['translation_pipeline'].process_translations = run
+
+    url = reverse('translation-process-translations')
+    first = api_client.post(url, {"target_language": "es"}, format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+    retry = api_client.post(url, {"target_language": "es"}, format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+    misuse = api_client.post(url, {"target_language": "fr"}, format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+
+    assert calls == 1
+    assert retry.status_code == status.HTTP_200_OK
+    assert retry['Idempotent-Replayed'] == 'true'
+    assert retry.data["run_id"] == first.data["run_id"]
+    assert retry.data["successful"] == 1
+    assert retry.data["details"] == first.data["details"]
+    assert misuse.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
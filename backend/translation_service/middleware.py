@@ -0,0 +1,55 @@
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+from .utils.profiling import RequestProfile
+import asyncio
+
+
+def _wants_profile(request) -> bool:
+    if settings.PROFILE_ALL_REQUESTS:
+        return True
+    return settings.REQUEST_PROFILING_ENABLED and request.headers.get('X-Profile') == '1'
+
+
+def _attach_profile(response, profile: RequestProfile):
+    response['X-Profile-Id'] = profile.id
+    response['Server-Timing'] = profile.server_timing()
+    return response
+
+
+@sync_and_async_middleware
+def profiling_middleware(get_response):
+    """
+    Profile requests sent with `X-Profile: 1` (when REQUEST_PROFILING_ENABLED)
+    or every request (PROFILE_ALL_REQUESTS).
+
+    The response carries the pipeline stage timings in a Server-Timing header
+    and an X-Profile-Id to download the profile from
+    /api/translations/profiles/<id>/.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            if not _wants_profile(request):
+                return await get_response(request)
+            profile = RequestProfile()
+            profile.start()
+            try:
+                response = await get_response(request)
+            finally:
+                # Joins the sampler, which wakes up as soon as it is stopped
+                profile.stop()
+            await asyncio.to_thread(profile.save)
+            return _attach_profile(response, profile)
+    else:
+        def middleware(request):
+            if not _wants_profile(request):
+                return get_response(request)
+            profile = RequestProfile()
+            profile.start()
+            try:
+                response = get_response(request)
+            finally:
+                profile.stop()
+            profile.save()
+            return _attach_profile(response, profile)
+    return middleware
@@ -0,0 +1,55 @@
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.utils.decorators import classonlymethod
+from django.views.decorators.csrf import csrf_exempt
+import asyncio
+import functools
+
+
+class AsyncViewSetMixin:
+    """
+    Let ViewSet actions be `async def`.
+
+    The view returned by `as_view` is a coroutine function, so Django runs it
+    natively on the event loop under ASGI (and through `async_to_sync` under
+    WSGI). Authentication, permissions and throttling stay synchronous and run
+    in a thread; sync actions also run in a thread so they never block the loop.
+    """
+
+    @classonlymethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            # The sync view calls our async dispatch and returns its coroutine
+            return await view(request, *args, **kwargs)
+
+        functools.update_wrapper(async_view, view)
+        markcoroutinefunction(async_view)
+        return csrf_exempt(async_view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        """Async version of `APIView.dispatch`"""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler, thread_sensitive=False)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,23 @@
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import JSONRenderer
+import orjson
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson.
+
+    Large run summaries serialize several times faster than with the stdlib
+    encoder. Types orjson doesn't know (Decimal, lazy strings, ...) go through
+    DRF's encoder; indented output (`; indent=` in the Accept header) is left
+    to the stdlib renderer.
+    """
+
+    options = orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=JSONEncoder().default, option=self.options)
@@ -1,4 +1,7 @@
+from django.conf import settings
 from rest_framework import serializers
+from .validators import LOKALISE_EXPORT_FORMATS
+import re
 
 class QualityCheckSerializer(serializers.Serializer):
     source_text = serializers.CharField(required=True)
@@ -6,6 +9,31 @@ class QualityCheckSerializer(serializers.Serializer):
     llm_translation = serializers.CharField(required=True)
     target_language = serializers.CharField(required=True)
 
+class QualityPairSerializer(serializers.Serializer):
+    id = serializers.CharField(required=False)
+    source_text = serializers.CharField(required=False, allow_blank=True)
+    existing_translation = serializers.CharField(required=True)
+    llm_translation = serializers.CharField(required=True)
+
+class QualityCheckBatchSerializer(serializers.Serializer):
+    target_language = serializers.CharField(required=True)
+    pairs = serializers.ListField(child=QualityPairSerializer(), allow_empty=False)
+
+    def validate_pairs(self, value):
+        if len(value) > settings.QUALITY_BATCH_MAX_PAIRS:
+            raise serializers.ValidationError(
+                f"At most {settings.QUALITY_BATCH_MAX_PAIRS} pairs can be checked at once"
+            )
+        return value
+
+def validate_upload_size(value):
+    # Files above FILE_UPLOAD_MAX_MEMORY_SIZE are already spooled to disk
+    if value.size > settings.LOKALISE_UPLOAD_MAX_SIZE:
+        raise serializers.ValidationError(
+            f"File size cannot exceed {settings.LOKALISE_UPLOAD_MAX_SIZE // (1024 * 1024)}MB"
+        )
+    return value
+
 class FileUploadSerializer(serializers.Serializer):
     file = serializers.FileField(required=True)
     lang_iso = serializers.CharField(required=True)
@@ -16,13 +44,78 @@ class FileUploadSerializer(serializers.Serializer):
         allow_empty=True,
         default=list
     )
+    split = serializers.BooleanField(required=False, default=False)
+    diff = serializers.BooleanField(required=False, default=False)
 
     def validate_file(self, value):
-        # Check file size (10MB limit)
-        if value.size > 10 * 1024 * 1024:  # 10MB in bytes
-            raise serializers.ValidationError("File size cannot exceed 10MB")
-        return value
+        return validate_upload_size(value)
 
     def validate_lang_iso(self, value):
         # Add validation for supported languages if needed
-        return value.lower() 
\ No newline at end of file
+        return value.lower()
+
+class BulkUploadSerializer(serializers.Serializer):
+    files = serializers.ListField(child=serializers.FileField(), required=False, default=list)
+    archive = serializers.FileField(required=False)
+    lang_iso = serializers.CharField(required=True)
+    detect_icu_plurals = serializers.BooleanField(required=False, default=True)
+    tags = serializers.ListField(
+        child=serializers.CharField(),
+        required=False,
+        allow_empty=True,
+        default=list
+    )
+    wait = serializers.BooleanField(required=False, default=True)
+    split = serializers.BooleanField(required=False, default=False)
+    diff = serializers.BooleanField(required=False, default=False)
+
+    def validate_files(self, value):
+        if len(value) > settings.BULK_UPLOAD_MAX_FILES:
+            raise serializers.ValidationError(
+                f"At most {settings.BULK_UPLOAD_MAX_FILES} files can be uploaded at once"
+            )
+        for file in value:
+            validate_upload_size(file)
+        return value
+
+    def validate_archive(self, value):
+        return validate_upload_size(value)
+
+    def validate_lang_iso(self, value):
+        return value.lower()
+
+    def validate(self, data):
+        if not data.get('files') and not data.get('archive'):
+            raise serializers.ValidationError("Provide files or an archive")
+        return data
+
+class ExportSerializer(serializers.Serializer):
+    # Not `format`, which DRF reserves for picking the response renderer
+    file_format = serializers.ChoiceField(choices=LOKALISE_EXPORT_FORMATS, required=False, default='json')
+    # Comma-separated language codes; all languages when omitted
+    languages = serializers.CharField(required=False, default='')
+
+    def validate_languages(self, value):
+        return sorted({language.strip().lower() for language in value.split(',') if language.strip()})
+
+class SchedulingSerializer(serializers.Serializer):
+    # Tags whose keys are translated first; TRANSLATION_PRIORITY_TAGS when omitted
+    priority_tags = serializers.ListField(child=serializers.CharField(), required=False, allow_null=True, default=None)
+
+class KeyFilterSerializer(serializers.Serializer):
+    tags = serializers.ListField(child=serializers.CharField(), required=False)
+    platforms = serializers.ListField(
+        child=serializers.ChoiceField(choices=['ios', 'android', 'web', 'other']),
+        required=False
+    )
+    key_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    key_name_pattern = serializers.CharField(required=False)
+    key_name_regex = serializers.CharField(required=False)
+    modified_since = serializers.DateTimeField(required=False)
+
+    def validate_key_name_regex(self, value):
+        try:
+            re.compile(value)
+        except re.error as e:
+            raise serializers.ValidationError(f"Invalid regular expression: {e}")
+        return value
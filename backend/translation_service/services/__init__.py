@@ -1,5 +1,10 @@
+from .bulk_uploader import BulkUploader
+from .export_cache import ExportCache
 from .lokalise_service import LokaliseService
+from .model_router import ModelRouter
 from .translation_pipeline import TranslationPipeline
 from .translation_service import TranslationService
+from .run_coalescer import RunCoalescer
+from .registry import ServiceRegistry, registry
 
-__all__ = ['LokaliseService', 'TranslationPipeline', 'TranslationService']
+__all__ = ['BulkUploader', 'ExportCache', 'LokaliseService', 'ModelRouter', 'RunCoalescer', 'TranslationPipeline', 'TranslationService', 'ServiceRegistry', 'registry']
@@ -0,0 +1,284 @@
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from django.conf import settings
+from .lokalise_service import LokaliseService
+from ..utils.localization_files import (
+    build_key_index,
+    diff_units,
+    file_format,
+    flatten,
+    parse_file,
+    split_file
+)
+from ..utils.rate_limiter import RateLimiter
+from ..validators import LOKALISE_SUPPORTED_FORMATS
+import asyncio
+import io
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+
+# Lokalise process states after which nothing changes any more
+FINISHED_PROCESS_STATUSES = {'finished'}
+FAILED_PROCESS_STATUSES = {'failed', 'cancelled'}
+
+
+class BulkUploader:
+    """
+    Upload many files to Lokalise at once and wait for their imports.
+
+    Uploads run concurrently, at most LOKALISE_UPLOAD_CONCURRENCY at a time,
+    and every Lokalise request goes through one rate limiter shared by all
+    bulk uploads of the process. The queued import processes of a batch are
+    then polled together: each poll is a single request for the project's
+    process list.
+
+    With `split`, big JSON/YAML files are cut into key-range chunks that
+    upload and import in parallel; their outcomes are merged into one per file.
+    With `diff`, JSON/YAML files are compared against the project's keys and
+    only new or changed keys are uploaded.
+    """
+
+    def __init__(self, lokalise_service: Optional[LokaliseService] = None):
+        self.lokalise_service = lokalise_service or LokaliseService()
+        self.rate_limiter = RateLimiter(settings.LOKALISE_REQUESTS_PER_SECOND)
+
+    @staticmethod
+    def is_supported(filename: str) -> bool:
+        return os.path.splitext(filename.lower())[1] in LOKALISE_SUPPORTED_FORMATS
+
+    @staticmethod
+    def expand_archive(archive: BinaryIO) -> Tuple[List[Tuple[str, BinaryIO]], List[Dict]]:
+        """
+        Extract the localization files of a zip archive
+
+        Members are copied to spooled temporary files, so large ones go to disk.
+
+        Returns:
+            Tuple of (list of (filename, file), outcomes of skipped members)
+        """
+        try:
+            zip_file = zipfile.ZipFile(archive)
+        except zipfile.BadZipFile:
+            raise Exception("Archive is not a valid zip file")
+
+        files = []
+        skipped = []
+        with zip_file:
+            try:
+                for member in zip_file.infolist():
+                    name = member.filename
+                    if member.is_dir() or name.startswith('__MACOSX/') or os.path.basename(name).startswith('.'):
+                        continue
+                    if not BulkUploader.is_supported(name):
+                        skipped.append({'filename': name, 'status': 'skipped', 'reason': 'Unsupported file type'})
+                        continue
+                    if member.file_size > settings.LOKALISE_UPLOAD_MAX_SIZE:
+                        skipped.append({'filename': name, 'status': 'skipped', 'reason': 'File too large'})
+                        continue
+                    if len(files) >= settings.BULK_UPLOAD_MAX_FILES:
+                        raise Exception(f"Archive contains more than {settings.BULK_UPLOAD_MAX_FILES} files")
+
+                    spooled = tempfile.SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+                    files.append((name, spooled))
+                    with zip_file.open(member) as source:
+                        shutil.copyfileobj(source, spooled)
+                    spooled.seek(0)
+            except BaseException:
+                # Don't leave the members spooled so far to the garbage collector
+                for _, spooled in files:
+                    spooled.close()
+                raise
+        return files, skipped
+
+    async def upload(self, files: List[Tuple[str, BinaryIO]], lang_iso: str, detect_icu_plurals: bool = True, tags: Optional[List[str]] = None, wait: bool = True, split: bool = False, diff: bool = False) -> List[Dict]:
+        """
+        Upload files concurrently and optionally wait for their imports
+
+        Args:
+            files: List of (filename, file) tuples
+            lang_iso: Language of the files
+            detect_icu_plurals: Passed to every upload
+            tags: Tags added to the uploaded keys
+            wait: Poll the import processes until they end or
+                LOKALISE_PROCESS_POLL_TIMEOUT_SECONDS passes
+            split: Split files above LOKALISE_UPLOAD_KEYS_PER_CHUNK keys into
+                chunks uploaded in parallel
+            diff: Upload only keys that are new or differ from the project;
+                skipped keys are listed in each file's `diff` report
+
+        Returns:
+            Per-file outcomes, in the order of `files`. `status` is 'success'
+            once the import finished, 'pending' while it still runs, 'error'
+            when the upload or the import failed.
+        """
+        semaphore = asyncio.Semaphore(settings.LOKALISE_UPLOAD_CONCURRENCY)
+
+        async def upload_one(filename: str, file: BinaryIO, replace_modified: bool) -> Dict:
+            if not self.is_supported(filename):
+                return {'filename': filename, 'status': 'skipped', 'reason': 'Unsupported file type'}
+            async with semaphore:
+                await self.rate_limiter.acquire()
+                try:
+                    result = await asyncio.to_thread(
+                        self.lokalise_service.upload_file,
+                        file=file,
+                        filename=filename,
+                        lang_iso=lang_iso,
+                        detect_icu_plurals=detect_icu_plurals,
+                        tags=tags,
+                        replace_modified=replace_modified
+                    )
+                except Exception as e:
+                    return {'filename': filename, 'status': 'error', 'error': str(e)}
+            return {
+                'filename': filename,
+                'status': 'pending',
+                'process_id': result['process_id'],
+                'process_status': 'queued',
+                'file_format': result.get('file_format')
+            }
+
+        key_index = None
+        if diff:
+            await self.rate_limiter.acquire()
+            keys = await asyncio.to_thread(self.lokalise_service.get_all_keys, include_translations=True)
+            key_index = build_key_index(keys, lang_iso)
+
+        async def prepare_one(filename: str, file: BinaryIO) -> Tuple[List[BinaryIO], Dict]:
+            if not (split or diff) or not file_format(filename):
+                return [file], {}
+            return await asyncio.to_thread(self._prepare, filename, file, split, key_index)
+
+        # Each file becomes zero or more upload jobs
+        prepared = await asyncio.gather(
+            *(prepare_one(filename, file) for filename, file in files),
+            return_exceptions=True
+        )
+        jobs = []
+        for position, ((filename, _), result) in enumerate(zip(files, prepared)):
+            if isinstance(result, Exception):
+                continue
+            # Only files reduced to their new and changed keys may overwrite
+            # translations; the rest upload as they are
+            replace_modified = diff and bool(file_format(filename))
+            jobs.extend((position, filename, chunk, replace_modified) for chunk in result[0])
+
+        job_outcomes = await asyncio.gather(*(
+            upload_one(filename, file, replace_modified) for _, filename, file, replace_modified in jobs
+        ))
+        if wait:
+            await self.wait_for_processes(job_outcomes)
+
+        outcomes_by_file: Dict[int, List[Dict]] = {}
+        for (position, _, _, _), outcome in zip(jobs, job_outcomes):
+            outcomes_by_file.setdefault(position, []).append(outcome)
+
+        outcomes = []
+        for position, ((filename, _), result) in enumerate(zip(files, prepared)):
+            if isinstance(result, Exception):
+                outcomes.append({'filename': filename, 'status': 'error', 'error': str(result)})
+                continue
+            outcome = self._merge_chunks(filename, outcomes_by_file.get(position, []))
+            if diff and file_format(filename):
+                outcome['diff'] = result[1]
+            outcomes.append(outcome)
+        return outcomes
+
+    @staticmethod
+    def _prepare(filename: str, file: BinaryIO, split: bool, key_index: Optional[Dict[str, Optional[str]]]) -> Tuple[List[BinaryIO], Dict]:
+        """
+        Parse a file once and build the files to upload for it
+
+        Returns:
+            Tuple of (files to upload, diff report)
+        """
+        content = file.read()
+        units = flatten(parse_file(filename, content))
+
+        report = {}
+        if key_index is not None:
+            units, report = diff_units(units, key_index)
+            if not units:
+                return [], report
+        elif not split or len(units) <= settings.LOKALISE_UPLOAD_KEYS_PER_CHUNK:
+            return [io.BytesIO(content)], report
+
+        chunk_keys = settings.LOKALISE_UPLOAD_KEYS_PER_CHUNK if split else len(units)
+        return [io.BytesIO(chunk) for chunk in split_file(filename, units, chunk_keys)], report
+
+    @staticmethod
+    def _merge_chunks(filename: str, outcomes: List[Dict]) -> Dict:
+        """Merge the outcomes of the chunks of one file into a single report"""
+        if not outcomes:
+            return {'filename': filename, 'status': 'skipped', 'reason': 'No new or changed keys'}
+        if len(outcomes) == 1:
+            return outcomes[0]
+
+        statuses = {outcome['status'] for outcome in outcomes}
+        if 'error' in statuses:
+            merged_status = 'error'
+        elif 'pending' in statuses:
+            merged_status = 'pending'
+        else:
+            merged_status = 'success'
+
+        report = {
+            'filename': filename,
+            'status': merged_status,
+            'chunks': len(outcomes),
+            'process_ids': [outcome.get('process_id') for outcome in outcomes],
+            'file_format': outcomes[0].get('file_format'),
+        }
+        errors = [
+            f"chunk {number}: {outcome['error']}"
+            for number, outcome in enumerate(outcomes, 1) if outcome['status'] == 'error'
+        ]
+        if errors:
+            report['error'] = '; '.join(errors)
+
+        # Sum the key and word counts Lokalise reports for each imported file
+        counts: Dict[str, int] = {}
+        for outcome in outcomes:
+            for file_details in (outcome.get('details') or {}).get('files', []):
+                for name, value in file_details.items():
+                    if name.startswith(('key_count', 'word_count')) and isinstance(value, int):
+                        counts[name] = counts.get(name, 0) + value
+        if counts:
+            report['details'] = counts
+        return report
+
+    async def wait_for_processes(self, outcomes: List[Dict]) -> None:
+        """Poll the import processes of pending outcomes in one loop, updating them in place"""
+        pending = {outcome['process_id']: outcome for outcome in outcomes if outcome['status'] == 'pending'}
+        deadline = time.monotonic() + settings.LOKALISE_PROCESS_POLL_TIMEOUT_SECONDS
+
+        while pending:
+            try:
+                # Every page and lookup of the poll waits for the rate limiter
+                statuses = await asyncio.to_thread(
+                    self.lokalise_service.get_process_statuses,
+                    list(pending),
+                    throttle=self.rate_limiter.wait
+                )
+            except Exception as e:
+                print(f"Error polling upload processes: {str(e)}")
+                statuses = {}
+
+            for process_id, process in statuses.items():
+                outcome = pending[process_id]
+                outcome['process_status'] = process['status']
+                if process['status'] in FINISHED_PROCESS_STATUSES:
+                    outcome['status'] = 'success'
+                    outcome['details'] = process['details']
+                elif process['status'] in FAILED_PROCESS_STATUSES:
+                    outcome['status'] = 'error'
+                    outcome['error'] = process['message'] or f"Import {process['status']}"
+                else:
+                    continue
+                del pending[process_id]
+
+            if not pending or time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(settings.LOKALISE_PROCESS_POLL_INTERVAL_SECONDS)
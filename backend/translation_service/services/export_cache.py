@@ -0,0 +1,129 @@
+from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+from django.conf import settings
+from .lokalise_service import LokaliseService
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class ExportCache:
+    """
+    Translated bundles exported from Lokalise, cached on disk.
+
+    A bundle is identified by the project, the export format, the language set
+    and a fingerprint of the project's keys: their count and the last time a
+    key or a translation was modified, so any edit yields a new bundle. The
+    fingerprint is re-read at most every EXPORT_FINGERPRINT_TTL_SECONDS and
+    bundles older than EXPORT_CACHE_MAX_AGE_SECONDS are pruned.
+
+    Exports are single-flight: requests on one event loop await the same
+    export task, and a lock file per bundle makes other workers wait for the
+    export in progress instead of starting their own.
+    """
+
+    def __init__(self, lokalise_service: Optional[LokaliseService] = None):
+        self.lokalise_service = lokalise_service or LokaliseService()
+        self._fingerprint: Optional[str] = None
+        self._fingerprint_expires = 0.0
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+
+    @staticmethod
+    def directory() -> Path:
+        return Path(settings.TRANSLATION_STATE_DIR) / 'exports'
+
+    def fingerprint(self) -> str:
+        """Hash of the project's key count and last key and translation modification"""
+        with self._lock:
+            if self._fingerprint is None or time.monotonic() >= self._fingerprint_expires:
+                keys = self.lokalise_service.get_all_keys(include_translations=False)
+                # The count catches deleted keys, which leave no timestamp behind
+                state = {
+                    'keys': len(keys),
+                    'modified_at': max((key['modified_at_timestamp'] or 0 for key in keys), default=0),
+                    'translations_modified_at': max(
+                        (key['translations_modified_at_timestamp'] or 0 for key in keys), default=0
+                    ),
+                }
+                self._fingerprint = hashlib.sha256(
+                    json.dumps(state, sort_keys=True).encode('utf-8')
+                ).hexdigest()
+                self._fingerprint_expires = time.monotonic() + settings.EXPORT_FINGERPRINT_TTL_SECONDS
+            return self._fingerprint
+
+    def etag(self, file_format: str, languages: Optional[List[str]] = None) -> str:
+        """Identifier of the bundle currently matching the project state"""
+        parts = [
+            self.lokalise_service.project_id,
+            file_format,
+            ','.join(sorted(languages or [])),
+            self.fingerprint(),
+        ]
+        return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()[:32]
+
+    def _is_fresh(self, path: Path) -> bool:
+        try:
+            return time.time() - path.stat().st_mtime < settings.EXPORT_CACHE_MAX_AGE_SECONDS
+        except FileNotFoundError:
+            return False
+
+    def get_bundle(self, file_format: str, languages: Optional[List[str]] = None) -> Tuple[Path, str]:
+        """
+        Return a cached bundle, exporting it from Lokalise when needed
+
+        Returns:
+            Tuple of (path of the zip bundle, its ETag)
+        """
+        etag = self.etag(file_format, languages)
+        directory = self.directory()
+        path = directory / f'{etag}.zip'
+        if self._is_fresh(path):
+            return path, etag
+
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(directory / f'{etag}.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Another request may have exported it while we waited
+                if not self._is_fresh(path):
+                    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+                    os.close(fd)
+                    try:
+                        self.lokalise_service.download_bundle(file_format, Path(tmp_path), languages)
+                        os.replace(tmp_path, path)
+                    finally:
+                        if os.path.exists(tmp_path):
+                            os.remove(tmp_path)
+                    self._prune()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return path, etag
+
+    async def get_bundle_async(self, file_format: str, languages: Optional[List[str]] = None) -> Tuple[Path, str]:
+        """`get_bundle` for async views; concurrent callers share one export thread"""
+        etag = await asyncio.to_thread(self.etag, file_format, languages)
+        key = (asyncio.get_running_loop(), etag)
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(asyncio.to_thread(self.get_bundle, file_format, languages))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(future)
+
+    def _prune(self) -> None:
+        # Drop bundles of superseded project states. Lock files are rewritten
+        # on every export attempt, so old ones aren't held by anyone.
+        cutoff = time.time() - settings.EXPORT_CACHE_MAX_AGE_SECONDS
+        for pattern in ('*.zip', '*.lock'):
+            for path in self.directory().glob(pattern):
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        os.remove(path)
+                except FileNotFoundError:
+                    pass
@@ -1,13 +1,59 @@
-from typing import Dict, List, Optional, BinaryIO
+from typing import Callable, Dict, List, Optional, BinaryIO
+from pathlib import Path
 from lokalise import Client as LokaliseClient
+from lokalise.collections.queued_processes import QueuedProcessesCollection
 from django.conf import settings
 import json
 import os
 from ..validators import LOKALISE_SUPPORTED_FORMATS
+from ..utils.key_filters import build_lokalise_key_params, key_matches_filters
+from ..utils.metrics import lokalise_operation, track_lokalise_call
 import base64
 from pprint import pprint
 import requests
 
+
+class Base64JSONBody:
+    """
+    Request body of a file upload, produced in chunks.
+
+    Yields the JSON upload options with the file base64-encoded into `data`,
+    reading `chunk_size` bytes at a time. The encoded length is known up front,
+    so the request is sent with a Content-Length instead of chunked encoding.
+    """
+
+    def __init__(self, options: Dict, file: BinaryIO, size: int, chunk_size: int):
+        self.file = file
+        self.size = size
+        # Whole base64 groups only, so chunks concatenate without padding
+        self.chunk_size = max(3, chunk_size - chunk_size % 3)
+        self.prefix = (json.dumps(options)[:-1] + ', "data": "').encode()
+        self.suffix = b'"}'
+
+    def __len__(self) -> int:
+        return len(self.prefix) + 4 * -(-self.size // 3) + len(self.suffix)
+
+    def __iter__(self):
+        yield self.prefix
+        read = 0
+        pending = b''
+        while True:
+            chunk = self.file.read(self.chunk_size)
+            if not chunk:
+                break
+            read += len(chunk)
+            pending += chunk
+            whole = len(pending) - len(pending) % 3
+            if whole:
+                yield base64.b64encode(pending[:whole])
+                pending = pending[whole:]
+        if read != self.size:
+            raise Exception(f"File changed during upload: expected {self.size} bytes, read {read}")
+        if pending:
+            yield base64.b64encode(pending)
+        yield self.suffix
+
+
 class LokaliseService:
     def __init__(self):
         self.client = LokaliseClient(settings.LOKALISE_API_KEY)
@@ -53,40 +99,50 @@ class LokaliseService:
 
         return format_options.get(format_key, {})
 
-    def upload_file(self, file: BinaryIO, filename: str, lang_iso: str, detect_icu_plurals: bool = True, tags: List[str] = None) -> Dict:
+    @lokalise_operation('upload_file')
+    def upload_file(self, file: BinaryIO, filename: str, lang_iso: str, detect_icu_plurals: bool = True, tags: List[str] = None, replace_modified: bool = False) -> Dict:
         """
         Upload a file to Lokalise
+
+        `replace_modified` overwrites translations that were changed in Lokalise;
+        diffed uploads set it since they only carry keys that differ.
+
+        Files above LOKALISE_STREAMING_UPLOAD_THRESHOLD are base64-encoded in
+        chunks straight into the request body instead of being read into memory.
         """
         try:
             # Get format-specific options
             format_options = self._detect_file_format(filename)
 
             # Prepare upload options
-            file_content = file.read()
-            base64_data = base64.b64encode(file_content).decode("utf-8")
             options = {
                 "filename": filename,
-                "lang_iso": 'en',
+                "lang_iso": lang_iso,
                 "detect_icu_plurals": detect_icu_plurals,
-                "replace_modified": False,
+                "replace_modified": replace_modified,
                 "skip_detect_lang_iso": False,
                 "convert_placeholders": True,
-                "format_options": format_options,
-                "data": base64_data
+                "format_options": format_options
             }
 
             if tags:
                 options["tags"] = tags
 
-            # Upload the file using the correct API method
-            response = self.client.upload_file(
-                self.project_id,
-                options
-            )
+            size = self._file_size(file)
+            if size is not None and size > settings.LOKALISE_STREAMING_UPLOAD_THRESHOLD:
+                process_id = self._upload_file_streaming(file, size, options)
+            else:
+                options["data"] = base64.b64encode(file.read()).decode("utf-8")
+                # Upload the file using the correct API method
+                response = self.client.upload_file(
+                    self.project_id,
+                    options
+                )
+                process_id = response.process_id
 
             return {
                 "status": "success",
-                "process_id": response.process_id,
+                "process_id": process_id,
                 "project_id": self.project_id,
                 "file_format": LOKALISE_SUPPORTED_FORMATS.get(os.path.splitext(filename.lower())[1]),
             }
@@ -94,31 +150,175 @@ class LokaliseService:
         except Exception as e:
             raise Exception(f"Error uploading file: {str(e)}")
 
-    def get_all_keys(self, include_translations: bool = True) -> List[Dict]:
-        """Get all keys from the project"""
+    @staticmethod
+    def _file_size(file: BinaryIO) -> Optional[int]:
+        """Size of an uploaded or seekable file, None when it can't be told"""
+        size = getattr(file, 'size', None)
+        if isinstance(size, int):
+            return size
+        try:
+            position = file.tell()
+            file.seek(0, os.SEEK_END)
+            size = file.tell() - position
+            file.seek(position)
+        except (AttributeError, OSError):
+            return None
+        return size if isinstance(size, int) else None
+
+    def _upload_file_streaming(self, file: BinaryIO, size: int, options: Dict) -> str:
+        """
+        Upload a file with the request body streamed from disk
+
+        Returns:
+            The id of the queued import process
+        """
+        body = Base64JSONBody(options, file, size, settings.LOKALISE_UPLOAD_CHUNK_SIZE)
+        response = requests.post(
+            f'https://api.lokalise.com/api2/projects/{self.project_id}/files/upload',
+            headers={
+                'X-Api-Token': settings.LOKALISE_API_KEY,
+                'Content-Type': 'application/json'
+            },
+            data=body,
+            timeout=settings.LOKALISE_UPLOAD_TIMEOUT_SECONDS
+        )
+        if response.status_code != 200:
+            raise Exception(f"API error: {response.text}")
+        return response.json()['process']['process_id']
+
+    @lokalise_operation('get_processes')
+    def get_process_statuses(self, process_ids: List[str], throttle: Optional[Callable[[], None]] = None) -> Dict[str, Dict]:
+        """
+        Get the status of queued processes (file imports)
+
+        The project's process list is read page by page until every process
+        is found; only processes missing from it are looked up one by one.
+
+        Args:
+            process_ids: Ids of the processes
+            throttle: Called before every request, e.g. to wait for a rate limiter
+
+        Returns:
+            Dict mapping each process id to its status, message and details
+        """
+        wait = throttle or (lambda: None)
+        try:
+            wanted = {str(process_id) for process_id in process_ids}
+            processes = {}
+            page = 1
+            while True:
+                wait()
+                # `Client.queued_processes` takes no paging parameters
+                response = QueuedProcessesCollection(
+                    self.client.get_endpoint('queued_processes').all(
+                        params={'limit': 1000, 'page': page},
+                        parent_id=self.project_id
+                    )
+                )
+                for process in response.items:
+                    processes[str(process.process_id)] = process
+                if wanted <= set(processes) or not response.has_next_page():
+                    break
+                page += 1
+
+            statuses = {}
+            for process_id in process_ids:
+                process = processes.get(str(process_id))
+                if process is None:
+                    wait()
+                    process = self.client.queued_process(self.project_id, process_id)
+                statuses[process_id] = {
+                    'status': process.status,
+                    'message': process.message,
+                    'details': process.details
+                }
+            return statuses
+        except Exception as e:
+            raise Exception(f"Error fetching process status: {str(e)}")
+
+    @lokalise_operation('get_project')
+    def get_project_statistics(self) -> Dict:
+        """Get the project's statistics (key, word and progress counts per language)"""
+        try:
+            return self.client.project(self.project_id).statistics or {}
+        except Exception as e:
+            raise Exception(f"Error fetching project: {str(e)}")
+
+    @lokalise_operation('download_files')
+    def download_bundle(self, file_format: str, destination: Path, languages: Optional[List[str]] = None) -> None:
+        """
+        Export the project's translations as a zip bundle
+
+        Args:
+            file_format: Lokalise export format (json, yaml, xml, ...)
+            destination: Path the bundle is streamed to
+            languages: Languages to include (default: all)
+        """
+        try:
+            params = {
+                'format': file_format,
+                'original_filenames': True,
+                'replace_breaks': False
+            }
+            if languages:
+                params['filter_langs'] = languages
+            bundle_url = self.client.download_files(self.project_id, params)['bundle_url']
+
+            with requests.get(bundle_url, stream=True, timeout=settings.LOKALISE_UPLOAD_TIMEOUT_SECONDS) as response:
+                if response.status_code != 200:
+                    raise Exception(f"Bundle download error: {response.status_code}")
+                with open(destination, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        f.write(chunk)
+        except Exception as e:
+            raise Exception(f"Error exporting files: {str(e)}")
+
+    @lokalise_operation('list_keys')
+    def get_all_keys(self, include_translations: bool = True, filters: Optional[Dict] = None) -> List[Dict]:
+        """
+        Get all keys from the project
+
+        Args:
+            include_translations: Whether to include the translations of each key
+            filters: Optional key selection filters (tags, platforms, key_ids,
+                key_name_pattern, key_name_regex, modified_since). Filters the
+                API supports are sent with the query, the rest are applied locally.
+        """
+        response = None
         try:
             params = {
                 'limit': 1000,  # Adjust as needed
                 'include_translations': 1 if include_translations else 0
             }
+            params.update(build_lokalise_key_params(filters))
             response = self.client.keys(
                 project_id=self.project_id,
                 params=params
             )
+            items = list(response.items)
+            while getattr(response, 'current_page', 0) and response.has_next_page() is True:
+                response = self.client.keys(
+                    project_id=self.project_id,
+                    params={**params, 'page': response.current_page + 1}
+                )
+                items.extend(response.items)
+
             # The response is already a list of keys
-            return [{
+            keys = [{
                 'key_id': key.key_id,
                 'key_name': key.key_name,
                 'translations': key.translations if include_translations else [],
                 'tags': key.tags or [],
                 'description': key.description,
-                'platforms': key.platforms
-            } for key in response.items]            
+                'platforms': key.platforms,
+                'modified_at_timestamp': key.modified_at_timestamp,
+                'translations_modified_at_timestamp': key.translations_modified_at_timestamp
+            } for key in items]
+            return [key for key in keys if key_matches_filters(key, filters)]
         except Exception as e:
-            print(f"Debug - Response type: {type(response)}")  # Debug log
-            print(f"Debug - Response: {response}")  # Debug log
             raise Exception(f"Error fetching keys: {str(e)}")
 
+    @lokalise_operation('get_key')
     def get_key_translations(self, key_id: str) -> Dict:
         """Get translations for a specific key"""
         try:
@@ -142,8 +342,6 @@ class LokaliseService:
             }
             
         except Exception as e:
-            print(f"Debug - Key response type: {type(key)}")  # Debug log
-            print(f"Debug - Key response: {key}")  # Debug log
             raise Exception(f"Error fetching key translations: {str(e)}")
 
     def upload_translation(self, keys: List[Dict]) -> List[Dict]:
@@ -175,16 +373,17 @@ class LokaliseService:
                     })
 
                 # Make API request to update key
-                response = requests.put(
-                    f'https://api.lokalise.com/api2/projects/{self.project_id}/keys/{key["key_id"]}',
-                    headers=headers,
-                    json={
-                        'translations': translations
-                    }
-                )
-                if response.status_code != 200:
-                    raise Exception(f"API error: {response.text}")
-                
+                with track_lokalise_call('update_key', self.project_id):
+                    response = requests.put(
+                        f'https://api.lokalise.com/api2/projects/{self.project_id}/keys/{key["key_id"]}',
+                        headers=headers,
+                        json={
+                            'translations': translations
+                        }
+                    )
+                    if response.status_code != 200:
+                        raise Exception(f"API error: {response.text}")
+
                 results.append({
                     'key_id': key['key_id'],
                     'key_name': key['key_name'],
@@ -219,6 +418,4 @@ class LokaliseService:
                 'status': 'reviewed'
             }
         except Exception as e:
-            print(f"Debug - Review response type: {type(response)}")  # Debug log
-            print(f"Debug - Review response: {response}")  # Debug log
             raise Exception(f"Error marking translation as reviewed: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,211 @@
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+from collections import deque
+from django.conf import settings
+import asyncio
+import math
+import time
+
+T = TypeVar('T')
+
+
+class ModelStats:
+    """Rolling latency and error statistics for a single model"""
+
+    def __init__(self, window_size: int = 200):
+        self.latencies: Deque[float] = deque(maxlen=window_size)
+        self.outcomes: Deque[bool] = deque(maxlen=window_size)
+
+    def record_success(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+
+    def record_error(self) -> None:
+        self.outcomes.append(False)
+
+    def record_abandoned(self, elapsed: float) -> None:
+        """
+        Record a call that was cancelled after losing a hedge race.
+
+        The elapsed time is only a lower bound of the real latency, but dropping
+        it would bias the percentiles towards the fast calls and keep shrinking
+        the hedge deadline.
+        """
+        self.latencies.append(elapsed)
+
+    @property
+    def sample_count(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile of the recorded latencies (pct between 0 and 100)"""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        rank = max(1, math.ceil(pct / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def snapshot(self) -> Dict:
+        return {
+            'samples': self.sample_count,
+            'error_rate': self.error_rate,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+        }
+
+
+class ModelRouter:
+    """
+    Route LLM requests between a primary model and its fallbacks.
+
+    The primary model is tried first. If it has not answered by its p95 latency
+    (or the configured hedge delay while there are too few samples), a hedged
+    duplicate request is sent to the next model and whichever answers first wins;
+    the slower request is cancelled. Failed requests fall through to the next
+    model immediately.
+    """
+
+    def __init__(
+        self,
+        primary_model: Optional[str] = None,
+        fallback_models: Optional[List[str]] = None,
+        hedge_delay: Optional[float] = None,
+        min_samples: int = 20,
+        max_error_rate: float = 0.5,
+        window_size: int = 200,
+    ):
+        self.primary_model = primary_model or settings.LLM_MODEL
+        if fallback_models is None:
+            fallback_models = settings.LLM_FALLBACK_MODELS
+        self.fallback_models = [m for m in fallback_models if m and m != self.primary_model]
+        self.hedge_delay = settings.LLM_HEDGE_DELAY_SECONDS if hedge_delay is None else hedge_delay
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.stats: Dict[str, ModelStats] = {
+            model: ModelStats(window_size) for model in self.models
+        }
+
+    @property
+    def models(self) -> List[str]:
+        return [self.primary_model] + self.fallback_models
+
+    def _is_degraded(self, model: str) -> bool:
+        stats = self.stats[model]
+        return (
+            len(stats.outcomes) >= self.min_samples
+            and stats.error_rate > self.max_error_rate
+        )
+
+    def ranked_models(self) -> List[str]:
+        """Models in the order they should be tried, degraded models last"""
+        healthy = [m for m in self.models if not self._is_degraded(m)]
+        degraded = [m for m in self.models if self._is_degraded(m)]
+        return healthy + degraded
+
+    def hedge_deadline(self, model: str) -> float:
+        """Seconds to wait for a model before sending a hedged request"""
+        stats = self.stats[model]
+        if stats.sample_count < self.min_samples:
+            return self.hedge_delay
+        return stats.percentile(95)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        return {model: stats.snapshot() for model, stats in self.stats.items()}
+
+    async def _timed_call(self, model: str, request: Callable[[str, Callable[[], None]], Awaitable[T]], started: asyncio.Future) -> T:
+        stats = self.stats[model]
+
+        def mark_started() -> None:
+            if not started.done():
+                started.set_result(time.monotonic())
+
+        try:
+            result = await request(model, mark_started)
+        except asyncio.CancelledError:
+            # A request cancelled before it was sent says nothing about the model
+            if started.done():
+                stats.record_abandoned(time.monotonic() - started.result())
+            raise
+        except Exception:
+            stats.record_error()
+            raise
+        mark_started()
+        stats.record_success(time.monotonic() - started.result())
+        return result
+
+    async def run(self, request: Callable[[str, Callable[[], None]], Awaitable[T]]) -> T:
+        """
+        Execute a request against the routed models
+
+        Args:
+            request: Coroutine factory taking the model name to call and a
+                callback to call once the request is sent. The model's latency
+                and the hedge deadline are measured from that call, so time
+                spent queueing beforehand (e.g. for a concurrency slot)
+                neither counts as latency nor triggers a hedge.
+
+        Returns:
+            The result of the first model that answers successfully
+
+        Raises:
+            The last model error if every model failed
+        """
+        loop = asyncio.get_running_loop()
+        queue = self.ranked_models()
+        running: Dict[asyncio.Task, str] = {}
+        started_at: Dict[asyncio.Task, asyncio.Future] = {}
+        last_error: Optional[BaseException] = None
+
+        def launch(model: str) -> None:
+            started = loop.create_future()
+            task = asyncio.ensure_future(self._timed_call(model, request, started))
+            running[task] = model
+            started_at[task] = started
+
+        launch(queue.pop(0))
+        try:
+            while running:
+                timeout = None
+                waiting = set(running)
+                if queue and len(running) == 1:
+                    (task, model), = running.items()
+                    started = started_at[task]
+                    if started.done():
+                        elapsed = time.monotonic() - started.result()
+                        timeout = max(0.0, self.hedge_deadline(model) - elapsed)
+                    else:
+                        # Not sent yet: wake up when it is, to start the hedge clock
+                        waiting.add(started)
+
+                done, _ = await asyncio.wait(
+                    waiting,
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Deadline passed: hedge with the next model
+                    launch(queue.pop(0))
+                    continue
+
+                for task in done:
+                    if task not in running:
+                        continue
+                    running.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    last_error = error
+
+                if not running and queue:
+                    launch(queue.pop(0))
+
+            raise last_error
+        finally:
+            # Cancel whichever request lost the race
+            for task in running:
+                task.cancel()
@@ -0,0 +1,84 @@
+from typing import Callable, Dict
+from .bulk_uploader import BulkUploader
+from .export_cache import ExportCache
+from .run_coalescer import RunCoalescer
+from .lokalise_service import LokaliseService
+from .translation_pipeline import TranslationPipeline
+from .translation_service import TranslationService
+import threading
+
+
+class ServiceRegistry:
+    """
+    Process-wide service instances, created on first use.
+
+    Services are expensive to build (Lokalise clients, glossary parsing) and
+    safe to share between requests, so each is constructed once per process.
+    Construction is guarded by a lock so concurrent first requests build a
+    service only once. The lock is re-entrant because factories read the
+    services they depend on through the registry.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._instances: Dict[str, object] = {}
+
+    def _get(self, name: str, factory: Callable[[], object]):
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = factory()
+                    self._instances[name] = instance
+        return instance
+
+    @property
+    def lokalise_service(self) -> LokaliseService:
+        return self._get('lokalise_service', LokaliseService)
+
+    @property
+    def bulk_uploader(self) -> BulkUploader:
+        return self._get(
+            'bulk_uploader',
+            lambda: BulkUploader(lokalise_service=self.lokalise_service)
+        )
+
+    @property
+    def export_cache(self) -> ExportCache:
+        return self._get(
+            'export_cache',
+            lambda: ExportCache(lokalise_service=self.lokalise_service)
+        )
+
+    @property
+    def run_coalescer(self) -> RunCoalescer:
+        return self._get('run_coalescer', RunCoalescer)
+
+    @property
+    def translation_pipeline(self) -> TranslationPipeline:
+        return self._get(
+            'translation_pipeline',
+            lambda: TranslationPipeline(lokalise_service=self.lokalise_service)
+        )
+
+    @property
+    def translation_service(self) -> TranslationService:
+        return self._get(
+            'translation_service',
+            lambda: TranslationService(pipeline=self.translation_pipeline)
+        )
+
+    def warm_up(self) -> None:
+        """Build every service up front, e.g. when a server worker starts"""
+        self.translation_service
+        self.bulk_uploader
+        self.export_cache
+
+    def reset(self) -> None:
+        """Drop all instances; the next access builds fresh ones"""
+        with self._lock:
+            self._instances.clear()
+
+
+registry = ServiceRegistry()
@@ -0,0 +1,169 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+from django.conf import settings
+import base64
+import json
+import os
+import re
+import time
+import uuid
+
+RUN_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class RunResultStore:
+    """
+    Per-key results of a translation run, written to disk as they are added.
+
+    Results are appended to `TRANSLATION_STATE_DIR/runs/<run_id>.jsonl` and the
+    summary counters are updated on each `add`, so building the summary needs
+    no pass over the results and any worker can page through the details
+    later. The counters are saved next to the results when the run ends.
+    Cursors are opaque byte offsets into the file.
+    """
+
+    def __init__(self, run_id: Optional[str] = None):
+        if run_id is not None and not RUN_ID_PATTERN.match(run_id):
+            raise Exception(f"Invalid run id: {run_id}")
+        self.run_id = run_id or uuid.uuid4().hex
+        self.counters = {
+            'total_processed': 0,
+            'successful': 0,
+            'failed': 0,
+            'skipped': 0,
+            'deferred': 0,
+            'new_translations': 0,
+            'updated_translations': 0,
+            'llm_calls_avoided': 0,
+            'evaluated': 0,
+            'unchanged_translations': 0,
+        }
+        # Keys sharing a source text share its LLM call, so avoided calls are counted per text
+        self._passthrough_texts = set()
+        self._file = None
+
+    @staticmethod
+    def directory() -> Path:
+        return Path(settings.TRANSLATION_STATE_DIR) / 'runs'
+
+    @property
+    def path(self) -> Path:
+        return self.directory() / f'{self.run_id}.jsonl'
+
+    @property
+    def summary_path(self) -> Path:
+        return self.directory() / f'{self.run_id}.json'
+
+    @classmethod
+    def open(cls, run_id: str) -> 'RunResultStore':
+        """Open the store of a finished run for reading"""
+        store = cls(run_id)
+        try:
+            with open(store.summary_path, 'r', encoding='utf-8') as f:
+                store.counters = json.load(f)
+        except FileNotFoundError:
+            raise Exception(f"Unknown run: {run_id}")
+        return store
+
+    def start(self) -> None:
+        """Create the run file that results are appended to"""
+        self.directory().mkdir(parents=True, exist_ok=True)
+        self._prune()
+        self._file = open(self.path, 'w', encoding='utf-8')
+
+    def finish(self) -> None:
+        """Close the run file and save the counters"""
+        self._file.close()
+        self._file = None
+        with open(self.summary_path, 'w', encoding='utf-8') as f:
+            json.dump(self.counters, f)
+
+    def __enter__(self) -> 'RunResultStore':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.finish()
+
+    def add(self, result: Dict) -> None:
+        """Append a result and update the counters"""
+        self._file.write(json.dumps(result, default=str))
+        self._file.write('\n')
+
+        counters = self.counters
+        status = result['status']
+        counters['total_processed'] += 1
+        if status == 'success':
+            counters['successful'] += 1
+            if result.get('is_new_translation', False):
+                counters['new_translations'] += 1
+            else:
+                counters['updated_translations'] += 1
+        elif status == 'error':
+            counters['failed'] += 1
+        elif status == 'skipped':
+            counters['skipped'] += 1
+        elif status == 'deferred':
+            counters['deferred'] += 1
+        if result.get('passthrough_reason'):
+            self._passthrough_texts.add(result.get('source_text'))
+            counters['llm_calls_avoided'] = len(self._passthrough_texts)
+        if 'quality' in result:
+            counters['evaluated'] += 1
+        if result.get('reason') == 'Translation unchanged':
+            counters['unchanged_translations'] += 1
+
+    def extend(self, results: Iterable[Dict]) -> None:
+        for result in results:
+            self.add(result)
+
+    def page(self, cursor: Optional[str] = None, limit: Optional[int] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Read results starting at a cursor
+
+        Args:
+            cursor: Cursor returned by a previous page, None for the first page
+            limit: Maximum number of results (default: RESULT_PAGE_SIZE)
+
+        Returns:
+            Tuple of (results, cursor of the next page or None at the end)
+        """
+        limit = limit or settings.RESULT_PAGE_SIZE
+        if self._file is not None:
+            self._file.flush()
+
+        results = []
+        with open(self.path, 'rb') as f:
+            f.seek(self._decode_cursor(cursor))
+            while len(results) < limit:
+                line = f.readline()
+                if not line:
+                    return results, None
+                results.append(json.loads(line))
+            offset = f.tell()
+            at_end = not f.read(1)
+        return results, None if at_end else self._encode_cursor(offset)
+
+    @staticmethod
+    def _encode_cursor(offset: int) -> str:
+        return base64.urlsafe_b64encode(str(offset).encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str]) -> int:
+        if not cursor:
+            return 0
+        try:
+            return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+        except (ValueError, UnicodeDecodeError):
+            raise Exception("Invalid cursor")
+
+    def _prune(self) -> None:
+        # Drop run files past the retention period
+        cutoff = time.time() - settings.RESULT_STORE_RETENTION_SECONDS
+        for pattern in ('*.jsonl', '*.json'):
+            for path in self.directory().glob(pattern):
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        os.remove(path)
+                except FileNotFoundError:
+                    pass
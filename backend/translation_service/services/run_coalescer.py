@@ -0,0 +1,91 @@
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from pathlib import Path
+from django.conf import settings
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+
+class RunCoalescer:
+    """
+    Share translation runs between identical concurrent requests.
+
+    A run is identified by the project, the languages and a hash of its
+    options. While a run is in flight, requests for the same run on this
+    worker attach to it and receive its result instead of starting a
+    duplicate. The run itself is shielded, so it completes even if the
+    request that started it goes away.
+
+    Idempotency keys map to the run they started, in files under
+    `TRANSLATION_STATE_DIR/idempotency`, so a retried request is answered
+    with the stored run by any worker until RESULT_STORE_RETENTION_SECONDS.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+
+    @staticmethod
+    def run_key(project_id: str, source_language: str, target_language: str, options: Dict) -> str:
+        """Identifier of a run; equal for requests that would do the same work"""
+        payload = json.dumps(
+            [project_id, source_language, target_language, options],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    async def run(self, key: str, start: Callable[[], Awaitable]) -> Tuple[object, bool]:
+        """
+        Run `start()` unless a run with the same key is in flight
+
+        Returns:
+            Tuple of (result of the run, whether this call attached to a run in flight)
+        """
+        loop_key = (asyncio.get_running_loop(), key)
+        future = self._in_flight.get(loop_key)
+        coalesced = future is not None
+        if future is None:
+            future = asyncio.ensure_future(start())
+            self._in_flight[loop_key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(loop_key, None))
+        return await asyncio.shield(future), coalesced
+
+    @staticmethod
+    def _idempotency_path(idempotency_key: str) -> Path:
+        name = hashlib.sha256(idempotency_key.encode('utf-8')).hexdigest()
+        return Path(settings.TRANSLATION_STATE_DIR) / 'idempotency' / f'{name}.json'
+
+    def get_idempotent(self, idempotency_key: str) -> Optional[Dict]:
+        """The run recorded for an idempotency key, as {'run_key', 'run_id'}"""
+        path = self._idempotency_path(idempotency_key)
+        try:
+            if time.time() - path.stat().st_mtime >= settings.RESULT_STORE_RETENTION_SECONDS:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save_idempotent(self, idempotency_key: str, run_key: str, run_id: str) -> None:
+        """Record the run an idempotency key started"""
+        path = self._idempotency_path(idempotency_key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._prune(path.parent)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'run_key': run_key, 'run_id': run_id}, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _prune(directory: Path) -> None:
+        # Drop keys past the retention period of the runs they point to
+        cutoff = time.time() - settings.RESULT_STORE_RETENTION_SECONDS
+        for path in directory.glob('*.json'):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
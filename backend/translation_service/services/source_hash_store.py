@@ -0,0 +1,101 @@
+from typing import Dict, Iterable, Optional, Tuple
+from pathlib import Path
+from django.conf import settings
+import fcntl
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+
+
+class SourceHashStore:
+    """
+    Remember, for each (key, language), a hash of the source text the current
+    translation was produced from.
+
+    Hashes are kept in one JSON file per project under
+    `TRANSLATION_STATE_DIR/source_hashes` and written atomically. Several
+    workers share the file: reads reload it when it changed on disk, and
+    updates merge into its current content under a file lock, so no worker
+    overwrites hashes recorded by another.
+    """
+
+    def __init__(self, project_id: Optional[str] = None):
+        self.project_id = project_id or settings.LOKALISE_PROJECT_ID
+        self._hashes: Optional[Dict[str, str]] = None
+        self._version: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        safe_project_id = re.sub(r'[^\w.\-]', '_', self.project_id or 'default')
+        return Path(settings.TRANSLATION_STATE_DIR) / 'source_hashes' / f'{safe_project_id}.json'
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _entry_key(key_id, language: str) -> str:
+        return f'{key_id}:{language}'
+
+    def _file_version(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        # The file is replaced on every write, so a new inode means new content
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _load(self) -> Dict[str, str]:
+        # Reload when another worker (or store) replaced the file
+        version = self._file_version()
+        if self._hashes is None or version != self._version:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._hashes = json.load(f)
+            except FileNotFoundError:
+                self._hashes = {}
+            self._version = version
+        return self._hashes
+
+    def get(self, key_id, language: str) -> Optional[str]:
+        """Return the stored source hash for a key and language, if any"""
+        with self._lock:
+            return self._load().get(self._entry_key(key_id, language))
+
+    def has_changed(self, key_id, language: str, source_text: str) -> bool:
+        """Whether the source text differs from the one the translation was made from"""
+        stored = self.get(key_id, language)
+        return stored is not None and stored != self.hash_text(source_text)
+
+    def update(self, entries: Iterable[Tuple[object, str, str]]) -> None:
+        """
+        Record the source texts translations were produced from
+
+        Args:
+            entries: Iterable of (key_id, language, source_text)
+        """
+        entries = list(entries)
+        if not entries:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.path.with_suffix('.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Merge into what is on disk now, not into a stale copy
+                hashes = dict(self._load())
+                for key_id, language, source_text in entries:
+                    hashes[self._entry_key(key_id, language)] = self.hash_text(source_text)
+
+                fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix='.tmp')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(hashes, f)
+                os.replace(tmp_path, self.path)
+                self._hashes = hashes
+                self._version = self._file_version()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
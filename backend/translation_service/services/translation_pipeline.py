@@ -1,26 +1,148 @@
 import requests
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from django.conf import settings
 from .lokalise_service import LokaliseService
+from .model_router import ModelRouter
+from .result_store import RunResultStore
+from .source_hash_store import SourceHashStore
+from .translation_scheduler import TranslationScheduler
+from ..utils.bleu_scorer import score_pairs
+from ..utils.bounded_cache import BoundedCache
+from ..utils.concurrency_limit import ConcurrencyLimit
+from ..utils.metrics import (
+    KEY_OUTCOMES,
+    LLM_REQUESTS_IN_FLIGHT,
+    OPENROUTER_REQUEST_SECONDS,
+    OPENROUTER_TOKENS,
+    STAGE_SECONDS,
+    record_cache_lookup
+)
+from ..utils.text_classifier import classify_source_text
+from ..utils.profiling import record_stage_timing
+from ..utils.tracing import span, trace_run
+from ..utils.placeholder_masking import (
+    SENTINEL_PATTERN,
+    find_placeholder_issues,
+    mask_placeholders,
+    unmask_placeholders
+)
+from collections import Counter
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
 from pprint import pprint
 import asyncio
 import aiohttp
 import json
+import math
 import os
+import time
+import weakref
 
-LLM_MODEL = 'openai/gpt-4o-mini'
+# Rough characters-per-token ratio used for dry-run token estimates
+CHARS_PER_TOKEN = 4
+# Translations are usually a bit longer than their source text
+COMPLETION_TOKEN_RATIO = 1.3
+# Transient OpenRouter responses worth retrying (rate limits, gateway errors)
+RETRYABLE_STATUSES = {429, 502, 503, 504}
 
 class TranslationPipeline:
-    def __init__(self):
-        self.lokalise_service = LokaliseService()
+    def __init__(self, lokalise_service: Optional[LokaliseService] = None):
+        self.lokalise_service = lokalise_service or LokaliseService()
         self.openrouter_api_key = settings.OPEN_ROUTER_API_KEY
+        self.openrouter_base_url = settings.OPEN_ROUTER_BASE_URL.rstrip('/')
+        self.model_router = ModelRouter()
+        # LLM request slots, shared by every run and caller in the process
+        self.llm_slots = ConcurrencyLimit(settings.TRANSLATION_CONCURRENCY)
+        self.translation_memory = BoundedCache(settings.TRANSLATION_MEMORY_SIZE)
+        self.glossary_cache = BoundedCache(settings.GLOSSARY_CACHE_SIZE)
+        self.source_hash_store = SourceHashStore()
+        # aiohttp sessions are bound to their event loop, so each loop has its own
+        self._loop_state = weakref.WeakKeyDictionary()
         # Load glossary
         glossary_path = os.path.join(settings.BASE_DIR, 'core', 'statics', 'glossary.json')
         with open(glossary_path, 'r', encoding='utf-8') as f:
             self.glossary = json.load(f)
+        self.do_not_translate = self._build_do_not_translate_terms()
+
+    def _build_do_not_translate_terms(self) -> frozenset:
+        """
+        Collect terms that are never translated: the configured product names and
+        glossary terms whose translation is the term itself in every language
+        """
+        terms = {term.lower() for term in settings.DO_NOT_TRANSLATE_TERMS if term}
+        for term_entry in self.glossary.get('translations', []):
+            translations = {t['translation'] for t in term_entry.get('translations', [])}
+            if translations == {term_entry['term']}:
+                terms.add(term_entry['term'].lower())
+        return frozenset(terms)
+
+    @property
+    def concurrency(self) -> int:
+        """Maximum number of LLM requests in flight in the process"""
+        return self.llm_slots.limit
+
+    @concurrency.setter
+    def concurrency(self, value: int) -> None:
+        self.llm_slots.limit = value
+
+    def _get_loop_state(self) -> Dict:
+        loop = asyncio.get_running_loop()
+        state = self._loop_state.get(loop)
+        if state is None:
+            state = {
+                'session': None,
+                'exit_stack': None,
+                'users': 0,
+            }
+            self._loop_state[loop] = state
+        return state
+
+    @asynccontextmanager
+    async def client_session(self):
+        """
+        Borrow the OpenRouter HTTP session of the running event loop.
+
+        Concurrent runs and ad-hoc translations share one session, and so its
+        connection pool; it is closed when the last user returns it.
+        """
+        state = self._get_loop_state()
+        if state['session'] is None:
+            exit_stack = AsyncExitStack()
+            state['session'] = await exit_stack.enter_async_context(aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=settings.OPEN_ROUTER_TIMEOUT_SECONDS)
+            ))
+            state['exit_stack'] = exit_stack
+        state['users'] += 1
+        try:
+            yield state['session']
+        finally:
+            state['users'] -= 1
+            if not state['users']:
+                exit_stack = state['exit_stack']
+                state['session'] = state['exit_stack'] = None
+                await exit_stack.aclose()
+
+    def classify_passthrough(self, texts: List[str]) -> Dict[str, str]:
+        """
+        Find texts copied without an LLM call: placeholders, numbers, URLs and product names
+
+        Returns:
+            Dict mapping each such text to the reason
+        """
+        passthrough = {}
+        for text in texts:
+            reason = classify_source_text(text, self.do_not_translate)
+            if reason:
+                passthrough[text] = reason
+        return passthrough
 
     def _get_relevant_glossary_terms(self, source_text: str, target_language: str) -> List[Dict]:
         """Get glossary terms that appear in the source text"""
+        cache_key = (source_text, target_language)
+        cached = self.glossary_cache.get(cache_key)
+        record_cache_lookup('glossary', target_language, cached is not None)
+        if cached is not None:
+            return cached
+
         relevant_terms = []
         
         for term_entry in self.glossary['translations']:
@@ -40,6 +162,7 @@ class TranslationPipeline:
                         'part_of_speech': term_entry.get('part_of_speech', '')
                     })
         
+        self.glossary_cache.put(cache_key, relevant_terms)
         return relevant_terms
 
     def _format_glossary_terms(self, terms: List[Dict]) -> str:
@@ -60,13 +183,16 @@ class TranslationPipeline:
             
         return "Glossary Terms:\n" + '\n\n'.join(formatted_terms)
 
-    async def translate_with_ai(self, source_text: str, target_language: str, session: aiohttp.ClientSession) -> str:
-        """
-        Translate text using OpenRouter's AI model with glossary support
-        """
+    def _build_prompt(self, source_text: str, target_language: str) -> str:
+        """Build the translation prompt, including the relevant glossary terms"""
         # Get relevant glossary terms
-        relevant_terms = self._get_relevant_glossary_terms(source_text, target_language)
+        with span('glossary_lookup') as attributes:
+            relevant_terms = self._get_relevant_glossary_terms(source_text, target_language)
+            attributes['terms'] = len(relevant_terms)
         glossary_section = self._format_glossary_terms(relevant_terms)
+        placeholder_guideline = ''
+        if SENTINEL_PATTERN.search(source_text):
+            placeholder_guideline = "\n6. Keep every ⟦n⟧ token exactly once and unchanged; they stand for placeholders and markup"
         
         prompt = f"""Translate the following text to {'Italian' if target_language == 'it' else target_language}.
 
@@ -78,13 +204,46 @@ Translation Guidelines:
 2. Use the provided glossary terms exactly as shown when they appear
 3. Preserve any special characters, numbers, or formatting
 4. Keep any untranslatable terms (like product names) unchanged
-5. Maintain any HTML or markdown formatting if present
+5. Maintain any HTML or markdown formatting if present{placeholder_guideline}
 
 Text to translate:
 {source_text}
 
 Translation:"""
 
+        return prompt
+
+    async def translate_with_ai(self, source_text: str, target_language: str, session: aiohttp.ClientSession) -> str:
+        """
+        Translate text using OpenRouter's AI model with glossary support.
+
+        Placeholders and markup are masked before the request and restored
+        afterwards; translations that lose or duplicate one are retried.
+        """
+        with span('build_prompt'):
+            masked_text, placeholders = mask_placeholders(source_text)
+            prompt = self._build_prompt(masked_text, target_language)
+
+        async def attempt(model: str, started: Callable[[], None]) -> str:
+            return await self._request_completion(prompt, model, session, target_language, started=started)
+
+        issues = []
+        for _ in range(settings.PLACEHOLDER_MAX_RETRIES + 1):
+            translated_text = await self.model_router.run(attempt)
+            issues = find_placeholder_issues(translated_text, len(placeholders))
+            if not issues:
+                return unmask_placeholders(translated_text, placeholders)
+
+        raise Exception(f"Placeholder validation failed: {'; '.join(issues)}")
+
+    async def _request_completion(self, prompt: str, model: str, session: aiohttp.ClientSession, target_language: str = '', started: Optional[Callable[[], None]] = None) -> str:
+        """
+        Send a single chat completion request to OpenRouter for the given model
+
+        Every HTTP call, hedges and retries included, holds one of the LLM
+        slots; the slot is given back while backing off before a retry.
+        `started` is called whenever a call has its slot and is being sent.
+        """
         headers = {
             "Authorization": f"Bearer {self.openrouter_api_key}",
             "Content-Type": "application/json",
@@ -93,23 +252,129 @@ Translation:"""
         }
 
         data = {
-            "model": LLM_MODEL,
+            "model": model,
             "messages": [{"role": "user", "content": prompt}]
         }
 
-        async with session.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            json=data
-        ) as response:
-            if response.status != 200:
-                text = await response.text()
-                raise Exception(f"OpenRouter API error: {text}")
+        for attempt in range(settings.OPEN_ROUTER_MAX_RETRIES + 1):
+            async with self.llm_slots:
+                if started is not None:
+                    started()
+                with LLM_REQUESTS_IN_FLIGHT.track_inprogress(), span('llm_request', model=model, attempt=attempt) as attributes:
+                    start = time.perf_counter()
+                    async with session.post(
+                        f"{self.openrouter_base_url}/chat/completions",
+                        headers=headers,
+                        json=data
+                    ) as response:
+                        attributes['status'] = response.status
+                        OPENROUTER_REQUEST_SECONDS.labels(model, target_language, str(response.status)).observe(
+                            time.perf_counter() - start
+                        )
+                        if response.status in RETRYABLE_STATUSES and attempt < settings.OPEN_ROUTER_MAX_RETRIES:
+                            # Honour Retry-After, otherwise back off exponentially
+                            retry_after = response.headers.get('Retry-After')
+                            delay = settings.OPEN_ROUTER_RETRY_BACKOFF_SECONDS * 2 ** attempt
+                            if retry_after:
+                                try:
+                                    delay = float(retry_after)
+                                except ValueError:
+                                    pass
+                        else:
+                            if response.status != 200:
+                                text = await response.text()
+                                raise Exception(f"OpenRouter API error: {text}")
+
+                            json_response = await response.json()
+                            usage = json_response.get("usage") or {}
+                            for kind in ('prompt_tokens', 'completion_tokens'):
+                                if usage.get(kind):
+                                    OPENROUTER_TOKENS.labels(model, target_language, kind).inc(usage[kind])
+                            return json_response["choices"][0]["message"]["content"].strip()
+            await asyncio.sleep(delay)
+
+    def _select_keys(self, all_keys: List[Dict], target_language: str, source_language: str, force_translate: bool, incremental: bool = False) -> Tuple[List[Dict], List[Tuple]]:
+        """
+        Decide which keys need a translation
+
+        In incremental mode, existing translations are refreshed when the source
+        text changed since the translation was produced.
+
+        Returns:
+            Tuple of (results for skipped keys, list of (key, source_text, target_trans, has_translation))
+        """
+        results = []
+        keys_to_translate = []
+
+        for key in all_keys:
+            # Get source text
+            source_trans = next((i for i in key['translations'] if i['language_iso'] == source_language), {})
+            source_text = source_trans.get('translation', '')
+            
+            # Check if we should translate this key
+            target_trans = next((i for i in key['translations'] if i['language_iso'] == target_language), {})
+            has_translation = bool(target_trans.get('translation', ''))
             
-            json_response = await response.json()
-            return json_response["choices"][0]["message"]["content"].strip()
+            if not source_text:
+                results.append({
+                    'key_id': key['key_id'],
+                    'key_name': key['key_name'],
+                    'status': 'skipped',
+                    'reason': f'No {source_language} source text available',
+                })
+                continue
+                
+            source_changed = incremental and has_translation and self.source_hash_store.has_changed(
+                key['key_id'], target_language, source_text
+            )
+            if has_translation and not force_translate and not source_changed:
+                results.append({
+                    'key_id': key['key_id'],
+                    'key_name': key['key_name'],
+                    'status': 'skipped',
+                    'reason': 'Translation already exists',
+                    'source_text': source_text,
+                    'existing_translation': target_trans.get('translation', '')
+                })
+                continue
+
+            keys_to_translate.append((key, source_text, target_trans, has_translation))
 
-    async def process_translations(self, target_language: str, source_language: str = 'en', force_translate: bool = False) -> List[Dict]:
+        return results, keys_to_translate
+
+    async def _translate_texts(self, texts: List[str], target_language: str, session: aiohttp.ClientSession, scheduler: Optional[TranslationScheduler] = None, priorities: Optional[Dict[str, Tuple]] = None) -> Tuple[Dict[str, str], Dict[str, Exception], List[str]]:
+        """
+        Translate distinct source texts, serving repeats from the translation memory.
+        The rest run through the scheduler in priority order, with at most
+        `concurrency` LLM requests in flight.
+
+        Returns:
+            Tuple of (translations by source text, errors by source text, deferred source texts)
+        """
+        scheduler = scheduler or TranslationScheduler(self.concurrency, language=target_language)
+        priorities = priorities or {}
+        translations = {}
+        pending = {}
+        for text in texts:
+            cached = self.translation_memory.get((text, target_language))
+            record_cache_lookup('translation_memory', target_language, cached is not None)
+            if cached is not None:
+                translations[text] = cached
+            else:
+                pending[text] = priorities.get(text) or scheduler.priority(text, is_new=True, is_tagged=False)
+
+        async def translate(text: str) -> str:
+            with span('translate_text', language=target_language):
+                translated_text = await self.translate_with_ai(text, target_language, session)
+            self.translation_memory.put((text, target_language), translated_text)
+            return translated_text
+
+        translated_texts, errors, deferred = await scheduler.run(pending, translate)
+        translations.update(translated_texts)
+
+        return translations, errors, deferred
+
+    async def process_translations(self, target_language: str, source_language: str = 'en', force_translate: bool = False, key_filters: Optional[Dict] = None, incremental: bool = False, priority_tags: Optional[List[str]] = None, time_budget: Optional[float] = None, evaluate: bool = False, skip_similar_threshold: Optional[float] = None, result_store: Optional[RunResultStore] = None) -> List[Dict]:
         """
         Process translations for all keys
         
@@ -117,101 +382,311 @@ Translation:"""
             target_language: Language to translate to
             source_language: Source language (default: 'en')
             force_translate: Whether to translate even if translation exists
+            key_filters: Optional key selection filters (see `LokaliseService.get_all_keys`)
+            incremental: Retranslate existing translations whose source text changed
+            priority_tags: Tags whose keys are translated first (default: TRANSLATION_PRIORITY_TAGS)
+            time_budget: Wall-clock seconds after which no new translations are started;
+                keys not reached are reported as deferred
+            evaluate: Score new translations against existing ones (BLEU and chrF)
+            skip_similar_threshold: chrF score from which a new translation counts as
+                unchanged and is not uploaded; implies `evaluate`
+            result_store: Open store the results are written to as each stage
+                finishes them, instead of being collected for the whole run
             
         Returns:
-            List of results for each key
+            List of results for each key (empty when they go to `result_store`)
         """
+        async with trace_run():
+            with span('run', project=self.lokalise_service.project_id or '', language=target_language):
+                return await self._process_translations(
+                    target_language=target_language,
+                    source_language=source_language,
+                    force_translate=force_translate,
+                    key_filters=key_filters,
+                    incremental=incremental,
+                    priority_tags=priority_tags,
+                    time_budget=time_budget,
+                    evaluate=evaluate,
+                    skip_similar_threshold=skip_similar_threshold,
+                    result_store=result_store
+                )
+
+    async def _process_translations(self, target_language: str, source_language: str = 'en', force_translate: bool = False, key_filters: Optional[Dict] = None, incremental: bool = False, priority_tags: Optional[List[str]] = None, time_budget: Optional[float] = None, evaluate: bool = False, skip_similar_threshold: Optional[float] = None, result_store: Optional[RunResultStore] = None) -> List[Dict]:
+        """`process_translations` within the run's trace"""
+        deadline = time.monotonic() + time_budget if time_budget else None
+        scheduler = TranslationScheduler(self.concurrency, deadline=deadline, language=target_language)
+        if priority_tags is None:
+            priority_tags = settings.TRANSLATION_PRIORITY_TAGS
+        priority_tags = set(priority_tags)
+
         results = []
-        translation_tasks = []
-        keys_to_translate = []
-        
-        # Get all keys with their translations
-        all_keys = self.lokalise_service.get_all_keys(include_translations=True)
-
-        # Prepare translation tasks
-        async with aiohttp.ClientSession() as session:
-            for key in all_keys:
-                # Get source text
-                source_trans = next((i for i in key['translations'] if i['language_iso'] == source_language), {})
-                source_text = source_trans.get('translation', '')
-                
-                # Check if we should translate this key
-                target_trans = next((i for i in key['translations'] if i['language_iso'] == target_language), {})
-                has_translation = bool(target_trans.get('translation', ''))
-                
-                if not source_text:
-                    results.append({
-                        'key_id': key['key_id'],
-                        'key_name': key['key_name'],
-                        'status': 'skipped',
-                        'reason': f'No {source_language} source text available',
-                    })
-                    continue
-                    
-                if has_translation and not force_translate:
-                    results.append({
-                        'key_id': key['key_id'],
-                        'key_name': key['key_name'],
-                        'status': 'skipped',
-                        'reason': 'Translation already exists',
-                        'source_text': source_text,
-                        'existing_translation': target_trans.get('translation', '')
-                    })
-                    continue
-
-                # Add to translation tasks
-                translation_tasks.append(self.translate_with_ai(source_text, target_language, session))
-                keys_to_translate.append((key, source_text, target_trans, has_translation))
-
-            # Execute all translations concurrently
-            try:
-                translated_texts = await asyncio.gather(*translation_tasks)
-
-                # Map results back to keys
-                for (key, source_text, target_trans, has_translation), translated_text in zip(keys_to_translate, translated_texts):
-                    results.append({
-                        'key_id': key['key_id'],
-                        'key_name': key['key_name'],
-                        'status': 'success',
-                        'source_text': source_text,
-                        'translated_text': translated_text,
-                        'existing_translation': target_trans.get('translation', ''),
-                        'is_new_translation': not has_translation
-                    })
-                    key['key_id'] = int(key['key_id'])
-
-                    if target_trans == {}:
-                        target_trans['translation'] = translated_text
-                        target_trans['is_reviewed'] = False
-                        target_trans['is_fuzzy'] = True
-                        target_trans['language_iso'] = target_language
-                        target_trans['key_id'] = int(key['key_id'])
-                        target_trans['words'] = len(translated_text.split(' '))
-                        key['translations'].append(target_trans)
-                    else:
-                        target_trans['translation'] = translated_text
-                        target_trans['key_id'] = int(key['key_id'])
-
-            except Exception as e:
-                # If a translation fails, add error results for remaining keys
-                for key, source_text, _, _ in keys_to_translate:
-                    results.append({
-                        'key_id': key['key_id'],
-                        'key_name': key['key_name'],
-                        'status': 'error',
-                        'error': str(e)
-                    })
+        hash_entries = []
+        outcomes = Counter()
+
+        async def emit(batch: List[Dict]) -> None:
+            # Results are final once emitted; with a store they are written out
+            # as each stage finishes instead of being held until the run ends
+            outcomes.update(result['status'] for result in batch)
+            hash_entries.extend(
+                await asyncio.to_thread(self._source_hash_entries, batch, target_language, incremental)
+            )
+            if result_store is None:
+                results.extend(batch)
+            elif batch:
+                await asyncio.to_thread(result_store.extend, batch)
+
+        # Get all keys with their translations; the Lokalise client is blocking
+        with self._stage('fetch_keys', target_language):
+            all_keys = await asyncio.to_thread(
+                self.lokalise_service.get_all_keys, include_translations=True, filters=key_filters
+            )
+        with self._stage('select', target_language):
+            skipped, keys_to_translate = self._select_keys(
+                all_keys, target_language, source_language, force_translate, incremental
+            )
+        await emit(skipped)
+        del skipped
+
+        # Keys sharing the same source text are translated once
+        unique_texts = list(dict.fromkeys(source_text for _, source_text, _, _ in keys_to_translate))
+
+        # Placeholders, numbers, URLs and product names are copied without an LLM call
+        passthrough = self.classify_passthrough(unique_texts)
+
+        # A source text shared by several keys gets the highest priority among them
+        priorities = {}
+        for key, source_text, _, has_translation in keys_to_translate:
+            if source_text in passthrough:
+                continue
+            priority = scheduler.priority(
+                source_text,
+                is_new=not has_translation,
+                is_tagged=bool(priority_tags & set(key.get('tags') or []))
+            )
+            priorities[source_text] = min(priority, priorities.get(source_text, priority))
 
-        # Bulk update translations
-        upload_results = self.lokalise_service.upload_translation(all_keys)
+        with self._stage('translate', target_language):
+            async with self.client_session() as session:
+                translations, errors, deferred = await self._translate_texts(
+                    list(priorities), target_language, session, scheduler, priorities
+                )
+        translations.update({text: text for text in passthrough})
+        deferred = set(deferred)
+
+        # Map results back to keys
+        mapped = []
+        translated = []
+        for key, source_text, target_trans, has_translation in keys_to_translate:
+            if source_text in deferred:
+                mapped.append({
+                    'key_id': key['key_id'],
+                    'key_name': key['key_name'],
+                    'status': 'deferred',
+                    'reason': 'Time budget exhausted',
+                    'source_text': source_text
+                })
+                continue
+
+            if source_text not in translations:
+                mapped.append({
+                    'key_id': key['key_id'],
+                    'key_name': key['key_name'],
+                    'status': 'error',
+                    'error': str(errors.get(source_text))
+                })
+                continue
+
+            result = {
+                'key_id': key['key_id'],
+                'key_name': key['key_name'],
+                'status': 'success',
+                'source_text': source_text,
+                'translated_text': translations[source_text],
+                'existing_translation': target_trans.get('translation', ''),
+                'is_new_translation': not has_translation
+            }
+            if source_text in passthrough:
+                result['passthrough_reason'] = passthrough[source_text]
+            if has_translation and incremental and not force_translate:
+                result['source_changed'] = True
+            mapped.append(result)
+            translated.append((key, target_trans, result))
+
+        if evaluate or skip_similar_threshold is not None:
+            with self._stage('evaluate', target_language):
+                await self._evaluate_translations([result for _, _, result in translated], target_language)
+
+        keys_to_upload = []
+        for key, target_trans, result in translated:
+            quality = result.get('quality')
+            if skip_similar_threshold is not None and quality and quality['chrf_score'] >= skip_similar_threshold:
+                result['status'] = 'skipped'
+                result['reason'] = 'Translation unchanged'
+                continue
+
+            translated_text = result['translated_text']
+            keys_to_upload.append(key)
+            key['key_id'] = int(key['key_id'])
+
+            if target_trans == {}:
+                target_trans['translation'] = translated_text
+                target_trans['is_reviewed'] = False
+                target_trans['is_fuzzy'] = True
+                target_trans['language_iso'] = target_language
+                target_trans['key_id'] = int(key['key_id'])
+                target_trans['words'] = len(translated_text.split(' '))
+                key['translations'].append(target_trans)
+            else:
+                target_trans['translation'] = translated_text
+                target_trans['key_id'] = int(key['key_id'])
+
+        # Bulk update the translated keys
+        with self._stage('upload', target_language):
+            upload_results = await asyncio.to_thread(
+                self.lokalise_service.upload_translation, keys_to_upload
+            ) if keys_to_upload else []
         
         # Update results with upload status
+        uploaded = {str(result['key_id']): result for _, _, result in translated}
         for upload_result in upload_results:
-            for result in results:
-                if result['key_id'] == upload_result['key_id']:
-                    if upload_result['status'] == 'error':
-                        result['status'] = 'error'
-                        result['error'] = upload_result.get('error', 'Upload failed')
-                    break
-
-        return results
\ No newline at end of file
+            result = uploaded.get(str(upload_result['key_id']))
+            if result is not None and upload_result['status'] == 'error':
+                result['status'] = 'error'
+                result['error'] = upload_result.get('error', 'Upload failed')
+        await emit(mapped)
+
+        with self._stage('record_hashes', target_language):
+            await asyncio.to_thread(self.source_hash_store.update, hash_entries)
+
+        project = self.lokalise_service.project_id or ''
+        for outcome, count in outcomes.items():
+            KEY_OUTCOMES.labels(outcome, project, target_language).inc(count)
+
+        return results
+
+    @contextmanager
+    def _stage(self, name: str, target_language: str):
+        """Time and trace a stage of a translation run"""
+        start = time.perf_counter()
+        try:
+            with span(name, language=target_language):
+                yield
+        finally:
+            elapsed = time.perf_counter() - start
+            STAGE_SECONDS.labels(name, self.lokalise_service.project_id or '', target_language).observe(elapsed)
+            record_stage_timing(name, elapsed)
+
+    async def _evaluate_translations(self, results: List[Dict], target_language: str) -> None:
+        """
+        Score new translations against the existing ones and attach the scores
+        as `quality` to each result that had an existing translation.
+
+        Scoring is CPU bound, so it runs in a thread, which also waits for the
+        process pool `score_pairs` uses for big batches.
+        """
+        to_evaluate = [result for result in results if result['existing_translation']]
+        pairs = list(dict.fromkeys(
+            (result['existing_translation'], result['translated_text']) for result in to_evaluate
+        ))
+        if not pairs:
+            return
+
+        scores = await asyncio.to_thread(score_pairs, pairs, target_language)
+
+        quality = {
+            pair: {'bleu_score': bleu_score, 'chrf_score': chrf_score}
+            for pair, bleu_score, chrf_score in zip(pairs, scores['bleu_scores'], scores['chrf_scores'])
+        }
+        for result in to_evaluate:
+            result['quality'] = quality[(result['existing_translation'], result['translated_text'])]
+
+    def _source_hash_entries(self, results: List[Dict], target_language: str, incremental: bool) -> List[Tuple]:
+        """
+        Source hash entries remembering which source text each uploaded
+        translation came from.
+
+        Existing translations without a stored hash are taken as a baseline in
+        incremental runs, so later source changes can be detected.
+        """
+        entries = []
+        for result in results:
+            if result['status'] == 'success' or result.get('reason') == 'Translation unchanged':
+                entries.append((result['key_id'], target_language, result['source_text']))
+            elif (
+                incremental
+                and result.get('reason') == 'Translation already exists'
+                and self.source_hash_store.get(result['key_id'], target_language) is None
+            ):
+                entries.append((result['key_id'], target_language, result['source_text']))
+        return entries
+
+    def plan_translations(self, target_language: str, source_language: str = 'en', force_translate: bool = False, key_filters: Optional[Dict] = None, incremental: bool = False) -> Dict:
+        """
+        Dry-run the pipeline: select keys, deduplicate source texts and match
+        glossary terms locally, without calling the LLM or uploading anything
+        
+        Args:
+            target_language: Language to translate to
+            source_language: Source language (default: 'en')
+            force_translate: Whether to translate even if translation exists
+            key_filters: Optional key selection filters (see `LokaliseService.get_all_keys`)
+            incremental: Retranslate existing translations whose source text changed
+            
+        Returns:
+            Dict with the planned work and its estimated tokens and duration
+        """
+        all_keys = self.lokalise_service.get_all_keys(include_translations=True, filters=key_filters)
+        skipped, keys_to_translate = self._select_keys(
+            all_keys, target_language, source_language, force_translate, incremental
+        )
+
+        unique_texts = list(dict.fromkeys(source_text for _, source_text, _, _ in keys_to_translate))
+        passthrough = {text for text in unique_texts if classify_source_text(text, self.do_not_translate)}
+        translatable = [text for text in unique_texts if text not in passthrough]
+        memory_hits = [text for text in translatable if (text, target_language) in self.translation_memory]
+        llm_texts = [text for text in translatable if (text, target_language) not in self.translation_memory]
+
+        prompt_tokens = sum(
+            self._estimate_tokens(self._build_prompt(mask_placeholders(text)[0], target_language)) for text in llm_texts
+        )
+        completion_tokens = sum(
+            math.ceil(self._estimate_tokens(text) * COMPLETION_TOKEN_RATIO) for text in llm_texts
+        )
+        glossary_matches = sum(
+            len(self._get_relevant_glossary_terms(text, target_language)) for text in unique_texts
+        )
+
+        primary_stats = self.model_router.stats[self.model_router.primary_model]
+        latency = primary_stats.percentile(50) or settings.TRANSLATION_ESTIMATED_LATENCY_SECONDS
+        waves = math.ceil(len(llm_texts) / self.concurrency) if llm_texts else 0
+        duplicate_hits = len(keys_to_translate) - len(unique_texts)
+        cache_hits = duplicate_hits + len(memory_hits)
+
+        return {
+            'total_keys': len(all_keys),
+            'keys_to_translate': len(keys_to_translate),
+            'keys_skipped': len(skipped),
+            'skip_reasons': dict(Counter(result['reason'] for result in skipped)),
+            'unique_source_texts': len(unique_texts),
+            'llm_calls': len(llm_texts),
+            'llm_calls_avoided': len(passthrough),
+            'glossary_matches': glossary_matches,
+            'cache_hits': {
+                'duplicate_source_texts': duplicate_hits,
+                'translation_memory': len(memory_hits),
+                'hit_rate': cache_hits / len(keys_to_translate) if keys_to_translate else 0.0
+            },
+            'estimated_tokens': {
+                'prompt': prompt_tokens,
+                'completion': completion_tokens,
+                'total': prompt_tokens + completion_tokens
+            },
+            'concurrency': self.concurrency,
+            'estimated_seconds_per_call': latency,
+            'estimated_duration_seconds': waves * latency
+        }
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Estimate the token count of a text from its length"""
+        return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
@@ -0,0 +1,78 @@
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from django.conf import settings
+from ..utils.metrics import QUEUE_DEPTH
+import asyncio
+import heapq
+import time
+
+PRIORITY_CRITERIA = ('tagged', 'new', 'short')
+
+
+class TranslationScheduler:
+    """
+    Run translation jobs in priority order on a fixed number of workers.
+
+    Priority is a tuple built from the configured criteria, lowest first:
+        tagged: jobs for keys carrying one of the priority tags
+        new:    jobs for keys without a translation yet
+        short:  shorter source texts, for fast feedback
+
+    With a deadline, workers stop picking up new jobs once it has passed;
+    jobs already running are allowed to finish and the rest are deferred.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, priority_order: Optional[List[str]] = None, deadline: Optional[float] = None, language: str = ''):
+        self.concurrency = concurrency or settings.TRANSLATION_CONCURRENCY
+        self.priority_order = list(priority_order or settings.TRANSLATION_PRIORITY_ORDER)
+        unknown = set(self.priority_order) - set(PRIORITY_CRITERIA)
+        if unknown:
+            raise Exception(f"Unknown priority criteria: {', '.join(sorted(unknown))}")
+        self.deadline = deadline
+        # Label of the queue depth metric
+        self.queue_depth = QUEUE_DEPTH.labels(language)
+
+    def priority(self, source_text: str, is_new: bool, is_tagged: bool) -> Tuple:
+        """Build the sort key of a job"""
+        values = {
+            'tagged': 0 if is_tagged else 1,
+            'new': 0 if is_new else 1,
+            'short': len(source_text),
+        }
+        return tuple(values[criterion] for criterion in self.priority_order)
+
+    def _deadline_passed(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    async def run(self, priorities: Dict[Hashable, Tuple], worker: Callable[[Hashable], Awaitable]) -> Tuple[Dict, Dict, List]:
+        """
+        Execute the jobs
+
+        Args:
+            priorities: Dict mapping each job to its priority tuple
+            worker: Coroutine function executing a single job
+
+        Returns:
+            Tuple of (results by job, exceptions by job, deferred jobs in priority order)
+        """
+        heap = [(priority, index, job) for index, (job, priority) in enumerate(priorities.items())]
+        heapq.heapify(heap)
+        results = {}
+        errors = {}
+        self.queue_depth.inc(len(heap))
+
+        async def consume():
+            while heap and not self._deadline_passed():
+                _, _, job = heapq.heappop(heap)
+                self.queue_depth.dec()
+                try:
+                    results[job] = await worker(job)
+                except Exception as e:
+                    errors[job] = e
+
+        try:
+            await asyncio.gather(*(consume() for _ in range(min(self.concurrency, len(heap)))))
+        finally:
+            self.queue_depth.dec(len(heap))
+
+        deferred = [job for _, _, job in sorted(heap)]
+        return results, errors, deferred
@@ -2,17 +2,37 @@ import requests
 from django.conf import settings
 from lokalise import Client as LokaliseClient
 from typing import Dict, List, Optional
-from ..utils.bleu_scorer import compute_bleu_score
+from ..utils.bleu_scorer import (
+    bleu_from_statistics,
+    chrf_from_statistics,
+    compute_bleu_score,
+    compute_chrf_score,
+    score_pairs
+)
+from .translation_pipeline import TranslationPipeline
+import math
 
 class TranslationService:
-    def __init__(self):
+    def __init__(self, pipeline: Optional[TranslationPipeline] = None):
         self.lokalise_client = LokaliseClient(settings.LOKALISE_API_KEY)
         self.openrouter_api_key = settings.OPEN_ROUTER_API_KEY
+        self.openrouter_base_url = settings.OPEN_ROUTER_BASE_URL.rstrip('/')
         self.project_id = settings.LOKALISE_PROJECT_ID
+        self._pipeline = pipeline
+
+    @property
+    def pipeline(self) -> TranslationPipeline:
+        """Pipeline whose HTTP session, LLM concurrency limit and caches are shared"""
+        if self._pipeline is None:
+            self._pipeline = TranslationPipeline()
+        return self._pipeline
 
     def translate_with_ai(self, source_text: str, target_language: str) -> str:
         """
         Use OpenRouter's AI model to translate the text
+
+        Blocking, single-text variant without glossary or placeholder handling;
+        prefer `translate_with_ai_async` / `translate_batch`.
         """
         prompt = f"""
         Translate the following text to {target_language}. 
@@ -29,14 +49,15 @@ class TranslationService:
             "Content-Type": "application/json",
         }
         data = {
-            "model": "openai/gpt-3.5-turbo",  # Free model for POC
+            "model": settings.LLM_MODEL,
             "messages": [{"role": "user", "content": prompt}]
         }
 
         response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
+            f"{self.openrouter_base_url}/chat/completions",
             headers=headers,
-            json=data
+            json=data,
+            timeout=settings.OPEN_ROUTER_TIMEOUT_SECONDS
         )
 
         if response.status_code != 200:
@@ -44,25 +65,116 @@ class TranslationService:
 
         return response.json()["choices"][0]["message"]["content"].strip()
 
-    def check_translation_quality(self, source_text: str, reference_translation: str, candidate_translation: str) -> Dict:
+    async def translate_with_ai_async(self, source_text: str, target_language: str) -> str:
+        """
+        Translate a single text through the pipeline
+
+        Raises:
+            Exception: If the translation failed
+        """
+        result = (await self.translate_batch([source_text], target_language))[0]
+        if result['status'] != 'success':
+            raise Exception(result['error'])
+        return result['translated_text']
+
+    async def translate_batch(self, source_texts: List[str], target_language: str) -> List[Dict]:
+        """
+        Translate ad-hoc texts with the same machinery as the bulk pipeline:
+        shared HTTP session, LLM concurrency limit, translation memory,
+        passthrough classification, placeholder masking and model fallback
+
+        Args:
+            source_texts: Texts to translate; repeated texts are translated once
+            target_language: Language to translate to
+
+        Returns:
+            List of results in input order, each with status 'success' and
+            translated_text, or status 'error' and error
         """
-        Compute BLEU score for translation quality
+        pipeline = self.pipeline
+        unique_texts = list(dict.fromkeys(source_texts))
+        passthrough = pipeline.classify_passthrough(unique_texts)
+
+        async with pipeline.client_session() as session:
+            translations, errors, _ = await pipeline._translate_texts(
+                [text for text in unique_texts if text not in passthrough], target_language, session
+            )
+        translations.update({text: text for text in passthrough})
+
+        results = []
+        for source_text in source_texts:
+            if source_text in translations:
+                result = {
+                    'status': 'success',
+                    'source_text': source_text,
+                    'translated_text': translations[source_text]
+                }
+                if source_text in passthrough:
+                    result['passthrough_reason'] = passthrough[source_text]
+            else:
+                result = {
+                    'status': 'error',
+                    'source_text': source_text,
+                    'error': str(errors.get(source_text))
+                }
+            results.append(result)
+        return results
+
+    def check_translation_quality(self, source_text: str, reference_translation: str, candidate_translation: str, target_language: Optional[str] = None) -> Dict:
+        """
+        Compute BLEU and chrF scores for translation quality
         
         Args:
             source_text: Original text (for reference)
             reference_translation: Reference translation to compare against
             candidate_translation: Candidate translation to evaluate
+            target_language: Language of the translations, selects the tokenizer
             
         Returns:
-            Dict containing BLEU score and translations
+            Dict containing BLEU score, chrF score and translations
         """
-        bleu_score = compute_bleu_score(reference_translation, candidate_translation)
+        bleu_score = compute_bleu_score(reference_translation, candidate_translation, target_language)
+        chrf_score = compute_chrf_score(reference_translation, candidate_translation, target_language)
         
         return {
             "bleu_score": bleu_score,
+            "chrf_score": chrf_score,
             "translations": {
                 "source_text": source_text,
                 "reference_translation": reference_translation,
                 "candidate_translation": candidate_translation
             }
         }
+
+    def check_translation_quality_batch(self, pairs: List[Dict], target_language: Optional[str] = None) -> Dict:
+        """
+        Compute BLEU and chrF scores for many translation pairs at once
+
+        Batches of at least QUALITY_BATCH_PROCESS_THRESHOLD pairs are split
+        across a process pool, since scoring is CPU bound.
+
+        Args:
+            pairs: Dicts with existing_translation, llm_translation and an optional id
+            target_language: Language of the translations, selects the tokenizer
+
+        Returns:
+            Dict containing per-pair scores in input order, mean BLEU and corpus BLEU/chrF
+        """
+        text_pairs = [(pair['existing_translation'], pair['llm_translation']) for pair in pairs]
+        scores = score_pairs(text_pairs, target_language)
+
+        results = []
+        for pair, bleu_score, chrf_score in zip(pairs, scores['bleu_scores'], scores['chrf_scores']):
+            result = {"bleu_score": bleu_score, "chrf_score": chrf_score}
+            if pair.get('id') is not None:
+                result["id"] = pair['id']
+            results.append(result)
+
+        bleu_scores = scores['bleu_scores']
+        return {
+            "count": len(results),
+            "corpus_bleu": bleu_from_statistics(scores['bleu_statistics']),
+            "corpus_chrf": chrf_from_statistics(scores['chrf_statistics']),
+            "mean_bleu": math.fsum(bleu_scores) / len(bleu_scores) if bleu_scores else 0.0,
+            "results": results
+        }
@@ -1,63 +1,548 @@
-import nltk
-from nltk.translate.bleu_score import sentence_bleu
-from typing import List
+"""
+BLEU and chrF between an existing and a candidate translation.
+
+Texts are tokenized per target language: whitespace-separated words by
+default, single characters for scripts written without spaces (zh, ja).
+
+Two BLEU engines are available:
+    native: self-contained Counter-based implementation (default)
+    nltk:   NLTK's `sentence_bleu`, kept as the reference implementation
+
+The native engine reproduces NLTK's scores, including the brevity penalty and
+the supported smoothing methods. Compare the two with:
+
+    python -m translation_service.utils.bleu_scorer --pairs 2000
+"""
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from functools import partial
+from nltk.translate.bleu_score import SmoothingFunction, sentence_bleu
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import argparse
+import math
+import os
+import random
 import re
 import string
+import sys
+import time
+
+ENGINES = ('native', 'nltk')
+DEFAULT_WEIGHTS = (0.25, 0.25, 0.25, 0.25)
+
+# Smoothing option -> NLTK SmoothingFunction method it is equivalent to
+SMOOTHING_METHODS = {
+    'none': 'method0',         # zero precisions count as sys.float_info.min
+    'epsilon': 'method1',      # zero match counts replaced by epsilon
+    'add_one': 'method2',      # add one to matches and totals for n > 1
+    'exponential': 'method3',  # zero match counts replaced by 1 / 2^k
+}
+DEFAULT_EPSILON = 0.1
+
+# chrF defaults: character 6-grams, word bigrams (chrF++), recall weighted twice as much
+CHRF_CHAR_ORDER = 6
+CHRF_BETA = 2
+
+# Built once instead of on every call
+CJK_PUNCTUATION = '，。！？、；：「」『』（）《》〈〉【】〔〕…～·・“”‘’'
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation + CJK_PUNCTUATION)
+
+# Languages written without spaces between words: tokenized per character
+CHARACTER_LANGUAGES = frozenset({'zh', 'ja', 'yue'})
+CJK_CHARACTER = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+# One token per CJK character; runs of anything else (Latin words, numbers) stay whole
+CHARACTER_TOKEN_PATTERN = re.compile(f'[{CJK_CHARACTER}]|[^\\s{CJK_CHARACTER}]+')
 
-def preprocess_text(text: str) -> List[str]:
+
+def _base_language(language: Optional[str]) -> str:
+    # 'zh_CN', 'zh-Hant' -> 'zh'
+    return re.split(r'[_\-]', language or '', maxsplit=1)[0].lower()
+
+
+def preprocess_text(text: str, language: Optional[str] = None) -> List[str]:
     """
     Preprocess text for BLEU score computation:
     1. Convert to lowercase
     2. Remove all punctuation
     3. Normalize whitespace
-    4. Tokenize into words
+    4. Tokenize into words, or characters for zh/ja
     """
-    # Convert to lowercase
-    text = text.lower()
+    text = text.lower().translate(PUNCTUATION_TABLE)
+    if _base_language(language) in CHARACTER_LANGUAGES:
+        return CHARACTER_TOKEN_PATTERN.findall(text)
+    return text.split()
 
-    # Remove all punctuation
-    text = text.translate(str.maketrans('', '', string.punctuation))
 
-    # Normalize whitespace
-    text = ' '.join(text.split())
+def _ngram_counts(tokens: Sequence[str], max_order: int) -> Counter:
+    # All orders in one Counter; an n-gram's order is the length of its tuple
+    counts = Counter()
+    for order in range(1, max_order + 1):
+        counts.update(zip(*(tokens[i:] for i in range(order))))
+    return counts
+
+
+def _smooth_precisions(matches: List[int], totals: List[int], smoothing: str, epsilon: float) -> List[float]:
+    precisions = []
+    exponent = 1
+    for index, (match, total) in enumerate(zip(matches, totals)):
+        if smoothing == 'add_one' and index > 0:
+            precisions.append((match + 1) / (total + 1))
+        elif match:
+            precisions.append(match / total)
+        elif smoothing == 'epsilon':
+            precisions.append(epsilon / total)
+        elif smoothing == 'exponential':
+            precisions.append(1 / (2 ** exponent * total))
+            exponent += 1
+        else:
+            precisions.append(sys.float_info.min)
+    return precisions
+
+
+def bleu_statistics(reference_tokens: Sequence[str], candidate_tokens: Sequence[str], max_order: int = 4) -> List[int]:
+    """
+    Sufficient statistics of a sentence pair; they add up across a corpus
+
+    Returns:
+        [candidate length, reference length, matches for n=1..max_order, totals for n=1..max_order]
+    """
+    reference_counts = _ngram_counts(reference_tokens, max_order)
+    matches = [0] * max_order
+    for ngram, count in _ngram_counts(candidate_tokens, max_order).items():
+        reference_count = reference_counts.get(ngram)
+        if reference_count:
+            # Clip by the number of occurrences in the reference
+            matches[len(ngram) - 1] += min(count, reference_count)
+    totals = [max(1, len(candidate_tokens) - order + 1) for order in range(1, max_order + 1)]
+    return [len(candidate_tokens), len(reference_tokens)] + matches + totals
 
-    # Split into words
-    return text.split()
 
-def compute_bleu_score(reference: str, candidate: str) -> float:
+def bleu_from_statistics(
+    statistics: Sequence[int],
+    weights: Sequence[float] = DEFAULT_WEIGHTS,
+    smoothing: str = 'none',
+    epsilon: float = DEFAULT_EPSILON
+) -> float:
     """
-    Compute BLEU score between reference and candidate translations using NLTK
-    
+    BLEU score from (summed) `bleu_statistics`
+
+    Args:
+        statistics: Output of `bleu_statistics`, or the element-wise sum over a corpus
+        weights: Weight of each n-gram order, starting with unigrams
+        smoothing: One of SMOOTHING_METHODS
+        epsilon: Numerator used for zero counts by the 'epsilon' smoothing
+
+    Returns:
+        float: BLEU score between 0 and 1
+    """
+    if smoothing not in SMOOTHING_METHODS:
+        raise Exception(f"Unknown BLEU smoothing: {smoothing}")
+
+    max_order = len(weights)
+    candidate_length, reference_length = statistics[0], statistics[1]
+    matches = list(statistics[2:2 + max_order])
+    totals = list(statistics[2 + max_order:2 + 2 * max_order])
+
+    # Without a single unigram match the score is 0 whatever the smoothing
+    if not matches[0]:
+        return 0.0
+
+    if candidate_length > reference_length:
+        brevity_penalty = 1.0
+    else:
+        brevity_penalty = math.exp(1 - reference_length / candidate_length)
+
+    precisions = _smooth_precisions(matches, totals, smoothing, epsilon)
+    return brevity_penalty * math.exp(math.fsum(
+        weight * math.log(precision) for weight, precision in zip(weights, precisions) if precision > 0
+    ))
+
+
+def native_sentence_bleu(
+    reference_tokens: Sequence[str],
+    candidate_tokens: Sequence[str],
+    weights: Sequence[float] = DEFAULT_WEIGHTS,
+    smoothing: str = 'none',
+    epsilon: float = DEFAULT_EPSILON
+) -> float:
+    """
+    Sentence BLEU of tokenized texts against a single reference
+
+    Returns:
+        float: BLEU score between 0 and 1
+    """
+    statistics = bleu_statistics(reference_tokens, candidate_tokens, len(weights))
+    return bleu_from_statistics(statistics, weights, smoothing, epsilon)
+
+
+def _nltk_sentence_bleu(reference_tokens: List[str], candidate_tokens: List[str], smoothing: str, epsilon: float) -> float:
+    if smoothing not in SMOOTHING_METHODS:
+        raise Exception(f"Unknown BLEU smoothing: {smoothing}")
+    smoothing_function = getattr(SmoothingFunction(epsilon=epsilon), SMOOTHING_METHODS[smoothing])
+    return sentence_bleu(
+        references=[reference_tokens],  # NLTK expects a list of references
+        hypothesis=candidate_tokens,
+        smoothing_function=smoothing_function
+    )
+
+
+def compute_bleu_score(
+    reference: str,
+    candidate: str,
+    language: Optional[str] = None,
+    engine: Optional[str] = None,
+    smoothing: str = 'none',
+    epsilon: float = DEFAULT_EPSILON
+) -> float:
+    """
+    Compute BLEU score between reference and candidate translations
+
     Args:
         reference: The reference (existing) translation
         candidate: The candidate (LLM) translation
-        
+        language: Language of both translations, selects the tokenizer
+        engine: 'native' or 'nltk', defaults to settings.BLEU_ENGINE
+        smoothing: One of SMOOTHING_METHODS
+        epsilon: Numerator used for zero counts by the 'epsilon' smoothing
+
     Returns:
-        float: BLEU score between 0 and 100
+        float: BLEU score between 0 and 1
     """
     try:
-        # Download required NLTK data if not already present
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt')
+        engine = engine or settings.BLEU_ENGINE
 
         # Preprocess and tokenize texts
-        reference_tokens = preprocess_text(reference)
-        candidate_tokens = preprocess_text(candidate)
-        
+        reference_tokens = preprocess_text(reference, language)
+        candidate_tokens = preprocess_text(candidate, language)
+
         # If either is empty, return 0
         if not reference_tokens or not candidate_tokens:
             return 0.0
-        
-        # Use NLTK's sentence_bleu
-        score = sentence_bleu(
-            references=[reference_tokens],  # NLTK expects a list of references
-            hypothesis=candidate_tokens
-        )
-        
-        return score
-        
+
+        if engine == 'native':
+            return native_sentence_bleu(reference_tokens, candidate_tokens, smoothing=smoothing, epsilon=epsilon)
+        if engine == 'nltk':
+            return _nltk_sentence_bleu(reference_tokens, candidate_tokens, smoothing, epsilon)
+        raise Exception(f"Unknown BLEU engine: {engine}")
+
     except Exception as e:
         print(f"BLEU computation error: {str(e)}")
-        return 0.0 
\ No newline at end of file
+        return 0.0
+
+
+def compute_bleu_scores(
+    pairs: Sequence[Tuple[str, str]],
+    language: Optional[str] = None,
+    engine: Optional[str] = None,
+    smoothing: str = 'none',
+    epsilon: float = DEFAULT_EPSILON
+) -> List[float]:
+    """
+    Compute BLEU scores for many (reference, candidate) pairs
+
+    Returns:
+        List of scores in the order of the pairs
+    """
+    engine = engine or settings.BLEU_ENGINE
+    return [
+        compute_bleu_score(reference, candidate, language, engine=engine, smoothing=smoothing, epsilon=epsilon)
+        for reference, candidate in pairs
+    ]
+
+
+def score_bleu_batch(
+    pairs: Sequence[Tuple[str, str]],
+    language: Optional[str] = None,
+    engine: Optional[str] = None,
+    smoothing: str = 'none',
+    epsilon: float = DEFAULT_EPSILON
+) -> Tuple[List[float], List[int]]:
+    """
+    Sentence scores and summed corpus statistics in a single pass over the pairs
+
+    The statistics of several batches can be added element-wise and passed to
+    `bleu_from_statistics` for the corpus score, so batches may be scored in
+    separate processes.
+
+    Returns:
+        Tuple of (sentence scores in pair order, summed `bleu_statistics`)
+    """
+    engine = engine or settings.BLEU_ENGINE
+    if engine not in ENGINES:
+        raise Exception(f"Unknown BLEU engine: {engine}")
+
+    scores = []
+    corpus_statistics = [0] * (2 + 2 * len(DEFAULT_WEIGHTS))
+    for reference, candidate in pairs:
+        reference_tokens = preprocess_text(reference, language)
+        candidate_tokens = preprocess_text(candidate, language)
+        statistics = bleu_statistics(reference_tokens, candidate_tokens)
+        corpus_statistics = [a + b for a, b in zip(corpus_statistics, statistics)]
+
+        if not reference_tokens or not candidate_tokens:
+            scores.append(0.0)
+        elif engine == 'native':
+            scores.append(bleu_from_statistics(statistics, smoothing=smoothing, epsilon=epsilon))
+        else:
+            scores.append(_nltk_sentence_bleu(reference_tokens, candidate_tokens, smoothing, epsilon))
+    return scores, corpus_statistics
+
+
+def corpus_bleu(
+    pairs: Sequence[Tuple[str, str]],
+    language: Optional[str] = None,
+    smoothing: str = 'none',
+    epsilon: float = DEFAULT_EPSILON
+) -> float:
+    """
+    Corpus-level BLEU of (reference, candidate) pairs, as NLTK's `corpus_bleu`
+
+    N-gram matches and lengths are summed over all pairs before computing
+    precisions, so it is not the mean of the sentence scores.
+    """
+    _, statistics = score_bleu_batch(pairs, language, engine='native', smoothing=smoothing, epsilon=epsilon)
+    return bleu_from_statistics(statistics, smoothing=smoothing, epsilon=epsilon)
+
+
+def _char_ngrams(text: str, order: int) -> Iterable[str]:
+    # map/slice keeps the iteration in C
+    return map(text.__getitem__, map(slice, range(len(text) - order + 1), range(order, len(text) + 1)))
+
+
+def _clipped_statistics(candidate_ngrams: Iterable, reference_ngrams: Iterable) -> List[int]:
+    candidate_counts = Counter(candidate_ngrams)
+    reference_counts = Counter(reference_ngrams)
+    matches = 0
+    for ngram, count in candidate_counts.items():
+        reference_count = reference_counts.get(ngram)
+        if reference_count:
+            matches += min(count, reference_count)
+    return [sum(candidate_counts.values()), sum(reference_counts.values()), matches]
+
+
+def chrf_statistics(
+    reference: str,
+    candidate: str,
+    language: Optional[str] = None,
+    char_order: int = CHRF_CHAR_ORDER,
+    word_order: int = 2
+) -> List[int]:
+    """
+    Sufficient chrF statistics of a sentence pair; they add up across a corpus
+
+    Character n-grams ignore whitespace; word n-grams use the language's
+    tokenizer. Unlike BLEU, chrF is case- and punctuation-sensitive at the
+    character level, as in the reference implementation.
+
+    Returns:
+        [candidate count, reference count, matches] per character order, then per word order
+    """
+    reference_chars = ''.join(reference.split())
+    candidate_chars = ''.join(candidate.split())
+    statistics = []
+    for order in range(1, char_order + 1):
+        statistics += _clipped_statistics(_char_ngrams(candidate_chars, order), _char_ngrams(reference_chars, order))
+
+    if word_order:
+        reference_words = preprocess_text(reference, language)
+        candidate_words = preprocess_text(candidate, language)
+        for order in range(1, word_order + 1):
+            statistics += _clipped_statistics(
+                zip(*(candidate_words[i:] for i in range(order))),
+                zip(*(reference_words[i:] for i in range(order)))
+            )
+    return statistics
+
+
+def chrf_from_statistics(statistics: Sequence[int], beta: float = CHRF_BETA) -> float:
+    """
+    chrF score from (summed) `chrf_statistics`
+
+    Precision and recall are averaged over the n-gram orders present in both
+    texts, then combined into an F-beta score.
+
+    Returns:
+        float: chrF score between 0 and 1
+    """
+    precision = recall = 0.0
+    effective_order = 0
+    for index in range(0, len(statistics), 3):
+        candidate_count, reference_count, matches = statistics[index:index + 3]
+        if candidate_count and reference_count:
+            precision += matches / candidate_count
+            recall += matches / reference_count
+            effective_order += 1
+
+    if not effective_order:
+        return 0.0
+    precision /= effective_order
+    recall /= effective_order
+    if not precision + recall:
+        return 0.0
+    factor = beta ** 2
+    return (1 + factor) * precision * recall / (factor * precision + recall)
+
+
+def compute_chrf_score(
+    reference: str,
+    candidate: str,
+    language: Optional[str] = None,
+    word_order: Optional[int] = None,
+    beta: float = CHRF_BETA
+) -> float:
+    """
+    Compute chrF (word_order=0) or chrF++ (word_order=2) between translations
+
+    Args:
+        reference: The reference (existing) translation
+        candidate: The candidate (LLM) translation
+        language: Language of both translations, selects the word tokenizer
+        word_order: Word n-gram order, defaults to settings.CHRF_WORD_ORDER
+        beta: Weight of recall relative to precision
+
+    Returns:
+        float: chrF score between 0 and 1
+    """
+    word_order = settings.CHRF_WORD_ORDER if word_order is None else word_order
+    return chrf_from_statistics(chrf_statistics(reference, candidate, language, word_order=word_order), beta)
+
+
+def score_translation_batch(
+    pairs: Sequence[Tuple[str, str]],
+    language: Optional[str] = None,
+    engine: Optional[str] = None,
+    word_order: Optional[int] = None
+) -> Dict:
+    """
+    BLEU and chrF scores of many (reference, candidate) pairs, with the
+    summed statistics needed for corpus scores
+
+    Results of separate batches can be combined with `merge_batch_scores`.
+
+    Returns:
+        Dict with bleu_scores, bleu_statistics, chrf_scores and chrf_statistics
+    """
+    word_order = settings.CHRF_WORD_ORDER if word_order is None else word_order
+    bleu_scores, bleu_corpus_statistics = score_bleu_batch(pairs, language, engine=engine)
+
+    chrf_scores = []
+    chrf_corpus_statistics = [0] * (3 * (CHRF_CHAR_ORDER + word_order))
+    for reference, candidate in pairs:
+        statistics = chrf_statistics(reference, candidate, language, word_order=word_order)
+        chrf_corpus_statistics = [a + b for a, b in zip(chrf_corpus_statistics, statistics)]
+        chrf_scores.append(chrf_from_statistics(statistics))
+
+    return {
+        'bleu_scores': bleu_scores,
+        'bleu_statistics': bleu_corpus_statistics,
+        'chrf_scores': chrf_scores,
+        'chrf_statistics': chrf_corpus_statistics,
+    }
+
+
+def split_into_batches(pairs: Sequence[Tuple[str, str]], count: int) -> List[Sequence[Tuple[str, str]]]:
+    """Split pairs into at most `count` contiguous batches of similar size"""
+    if not pairs:
+        return []
+    size = math.ceil(len(pairs) / max(1, count))
+    return [pairs[start:start + size] for start in range(0, len(pairs), size)]
+
+
+def merge_batch_scores(batches: Sequence[Dict]) -> Dict:
+    """Concatenate the scores and add up the statistics of `score_translation_batch` results"""
+    merged = {}
+    for batch in batches:
+        for name, values in batch.items():
+            if name not in merged:
+                merged[name] = list(values)
+            elif name.endswith('_scores'):
+                merged[name].extend(values)
+            else:
+                merged[name] = [a + b for a, b in zip(merged[name], values)]
+    return merged
+
+
+def score_pairs(pairs: Sequence[Tuple[str, str]], language: Optional[str] = None) -> Dict:
+    """
+    `score_translation_batch` for any number of pairs
+
+    From QUALITY_BATCH_PROCESS_THRESHOLD pairs the batch is split across a
+    process pool of QUALITY_BATCH_WORKERS (one per CPU when 0), since scoring
+    is CPU bound. This blocks until scoring is done: call it from a thread in
+    async code.
+    """
+    workers = settings.QUALITY_BATCH_WORKERS or os.cpu_count() or 1
+    if workers <= 1 or len(pairs) < settings.QUALITY_BATCH_PROCESS_THRESHOLD:
+        return score_translation_batch(pairs, language)
+
+    # Resolve settings here so workers don't depend on Django settings
+    score = partial(
+        score_translation_batch,
+        language=language,
+        engine=settings.BLEU_ENGINE,
+        word_order=settings.CHRF_WORD_ORDER
+    )
+    batches = split_into_batches(pairs, workers)
+    with ProcessPoolExecutor(max_workers=len(batches)) as executor:
+        return merge_batch_scores(list(executor.map(score, batches)))
+
+
+def _random_pairs(count: int, seed: int) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    vocabulary = [f'word{i}' for i in range(300)]
+    pairs = []
+    for _ in range(count):
+        reference = rng.choices(vocabulary, k=rng.randint(3, 40))
+        candidate = [token if rng.random() < 0.7 else rng.choice(vocabulary) for token in reference]
+        if rng.random() < 0.3:
+            candidate = candidate[:rng.randint(1, len(candidate))]
+        pairs.append((' '.join(reference), ' '.join(candidate)))
+    return pairs
+
+
+def benchmark(pairs: Sequence[Tuple[str, str]], smoothing: str = 'none') -> dict:
+    """
+    Time both engines on the same pairs and report the largest score difference
+
+    Returns:
+        Dict with per-engine timings, speedup and max_abs_difference
+    """
+    timings = {}
+    scores = {}
+    for engine in ENGINES:
+        start = time.perf_counter()
+        scores[engine] = compute_bleu_scores(pairs, engine=engine, smoothing=smoothing)
+        timings[engine] = time.perf_counter() - start
+
+    return {
+        'pairs': len(pairs),
+        'smoothing': smoothing,
+        'seconds': timings,
+        'speedup': timings['nltk'] / timings['native'] if timings['native'] else None,
+        'max_abs_difference': max(
+            (abs(a - b) for a, b in zip(scores['native'], scores['nltk'])), default=0.0
+        ),
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Benchmark the native engine against NLTK on synthetic sentence pairs
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pairs', type=int, default=2000)
+    parser.add_argument('--smoothing', choices=list(SMOOTHING_METHODS), default='none')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    import warnings
+    warnings.simplefilter('ignore')  # NLTK warns on every zero n-gram overlap
+    result = benchmark(_random_pairs(args.pairs, args.seed), smoothing=args.smoothing)
+    for engine, seconds in result['seconds'].items():
+        print(f"{engine:>6}: {seconds:.3f}s ({result['pairs'] / seconds:,.0f} pairs/s)")
+    print(f"speedup: {result['speedup']:.1f}x, max |native - nltk|: {result['max_abs_difference']:.2e}")
+
+
+if __name__ == "__main__":
+    main()
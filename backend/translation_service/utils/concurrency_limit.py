@@ -0,0 +1,80 @@
+from collections import deque
+import asyncio
+import threading
+
+
+class ConcurrencyLimit:
+    """
+    Semaphore for coroutines that holds across all event loops of the process.
+
+    `asyncio.Semaphore` only coordinates the tasks of one event loop, while a
+    process may run several (one per thread under `async_to_sync`, for
+    example). Here slots are counted under a thread lock and a released slot
+    is handed to the longest waiter, on whatever loop it waits.
+
+    Usage:
+        limit = ConcurrencyLimit(10)
+        async with limit:
+            ...
+
+    Changing `limit` takes effect as slots are acquired and released.
+    """
+
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise Exception("Concurrency limit must be at least 1")
+        self.limit = limit
+        self._in_use = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._in_use < self.limit and not self._waiters:
+                self._in_use += 1
+                return
+            future = loop.create_future()
+            waiter = (loop, future)
+            self._waiters.append(waiter)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            # The slot was handed over: give it back unless the hand-over
+            # callback will, having found the future cancelled
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters and self._in_use <= self.limit:
+                loop, future = self._waiters.popleft()
+                if loop.is_closed():
+                    continue
+                # The slot passes to the waiter without being freed
+                loop.call_soon_threadsafe(self._hand_over, future)
+                return
+            self._in_use -= 1
+
+    def _hand_over(self, future: asyncio.Future) -> None:
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    async def __aenter__(self) -> 'ConcurrencyLimit':
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
@@ -0,0 +1,233 @@
+"""
+Local stand-in for the OpenRouter chat completions API.
+
+Serves deterministic pseudo-translations with configurable latency and
+injected 429/5xx failures, so the pipeline's concurrency, retries and hedging
+can be exercised and benchmarked offline. Point OPEN_ROUTER_BASE_URL at it:
+
+    python -m translation_service.utils.fake_openrouter --port 8001 \
+        --latency lognormal:800:0.6 --rate-limit-rate 0.05 --error-rate 0.02
+    OPEN_ROUTER_BASE_URL=http://localhost:8001/api/v1
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+TARGET_LANGUAGE_PATTERN = re.compile(r'Translate the following text to (.+?)\.\n')
+SOURCE_TEXT_PATTERN = re.compile(r'Text to translate:\n(.*)\n\nTranslation:', re.DOTALL)
+# Tokens the pseudo-translation must leave untouched
+PROTECTED_PATTERN = re.compile(r'(⟦\d+⟧|\{[^{}]*\}|%\w|<[^<>]+>)')
+PSEUDO_CHARACTERS = str.maketrans('aeiouAEIOUcnsyz', 'áéíóúÁÉÍÓÚçñšýž')
+SERVER_ERRORS = (500, 502, 503)
+
+
+class LatencyModel:
+    """
+    Latency distribution in milliseconds
+
+    Spec format is "<distribution>:<mean_ms>[:<spread>]" where distribution is
+    fixed, uniform (spread = +/- ms), exponential or lognormal (spread = sigma).
+    """
+
+    DISTRIBUTIONS = ('fixed', 'uniform', 'exponential', 'lognormal')
+
+    def __init__(self, distribution: str = 'fixed', mean_ms: float = 0.0, spread: float = 0.0):
+        if distribution not in self.DISTRIBUTIONS:
+            raise Exception(f"Unknown latency distribution: {distribution}")
+        self.distribution = distribution
+        self.mean_ms = mean_ms
+        self.spread = spread
+
+    @classmethod
+    def parse(cls, spec: str) -> 'LatencyModel':
+        parts = spec.split(':')
+        distribution = parts[0]
+        mean_ms = float(parts[1]) if len(parts) > 1 else 0.0
+        spread = float(parts[2]) if len(parts) > 2 else 0.0
+        return cls(distribution, mean_ms, spread)
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw a latency in seconds"""
+        if self.distribution == 'uniform':
+            value = rng.uniform(self.mean_ms - self.spread, self.mean_ms + self.spread)
+        elif self.distribution == 'exponential':
+            value = rng.expovariate(1 / self.mean_ms) if self.mean_ms else 0.0
+        elif self.distribution == 'lognormal':
+            # Parametrised so that the distribution's mean is mean_ms
+            if self.mean_ms:
+                mu = math.log(self.mean_ms) - self.spread ** 2 / 2
+                value = rng.lognormvariate(mu, self.spread)
+            else:
+                value = 0.0
+        else:
+            value = self.mean_ms
+        return max(0.0, value) / 1000
+
+
+def pseudo_translate(text: str, target_language: str) -> str:
+    """Deterministic pseudo-translation that keeps placeholders and sentinels intact"""
+    parts = PROTECTED_PATTERN.split(text)
+    translated = [
+        part if PROTECTED_PATTERN.fullmatch(part) else part.translate(PSEUDO_CHARACTERS)
+        for part in parts
+    ]
+    return f"[{target_language}] {''.join(translated)}"
+
+
+class FakeOpenRouter:
+    """Request handler state: configuration, RNG and counters"""
+
+    def __init__(
+        self,
+        latency: Optional[LatencyModel] = None,
+        model_latency: Optional[Dict[str, LatencyModel]] = None,
+        rate_limit_rate: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float = 1.0,
+        seed: int = 0,
+        stream_chunk_size: int = 16,
+    ):
+        self.latency = latency or LatencyModel()
+        self.model_latency = model_latency or {}
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.stream_chunk_size = stream_chunk_size
+        self.rng = random.Random(seed)
+        self.stats = {
+            'requests': 0,
+            'rate_limited': 0,
+            'server_errors': 0,
+            'completed': 0,
+            'in_flight': 0,
+            'max_in_flight': 0,
+        }
+
+    def _completion(self, model: str, content: str, prompt: str) -> Dict:
+        return {
+            'id': f"fake-{self.stats['requests']}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop',
+            }],
+            'usage': {
+                'prompt_tokens': max(1, len(prompt) // 4),
+                'completion_tokens': max(1, len(content) // 4),
+                'total_tokens': max(1, len(prompt) // 4) + max(1, len(content) // 4),
+            },
+        }
+
+    async def chat_completions(self, request: web.Request) -> web.StreamResponse:
+        self.stats['requests'] += 1
+        self.stats['in_flight'] += 1
+        self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.stats['in_flight'])
+        try:
+            body = await request.json()
+            model = body.get('model', 'fake/model')
+            prompt = '\n'.join(m.get('content', '') for m in body.get('messages', []))
+
+            latency = self.model_latency.get(model, self.latency)
+            await asyncio.sleep(latency.sample(self.rng))
+
+            roll = self.rng.random()
+            if roll < self.rate_limit_rate:
+                self.stats['rate_limited'] += 1
+                return web.json_response(
+                    {'error': {'code': 429, 'message': 'Rate limit exceeded'}},
+                    status=429,
+                    headers={'Retry-After': str(self.retry_after)}
+                )
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.stats['server_errors'] += 1
+                code = self.rng.choice(SERVER_ERRORS)
+                return web.json_response({'error': {'code': code, 'message': 'Upstream error'}}, status=code)
+
+            language_match = TARGET_LANGUAGE_PATTERN.search(prompt)
+            source_match = SOURCE_TEXT_PATTERN.search(prompt)
+            source_text = source_match.group(1) if source_match else prompt
+            content = pseudo_translate(source_text, language_match.group(1) if language_match else 'xx')
+
+            self.stats['completed'] += 1
+            if body.get('stream'):
+                return await self._stream(request, model, content)
+            return web.json_response(self._completion(model, content, prompt))
+        finally:
+            self.stats['in_flight'] -= 1
+
+    async def _stream(self, request: web.Request, model: str, content: str) -> web.StreamResponse:
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+        for start in range(0, len(content), self.stream_chunk_size):
+            chunk = {
+                'id': f"fake-{self.stats['requests']}",
+                'object': 'chat.completion.chunk',
+                'model': model,
+                'choices': [{'index': 0, 'delta': {'content': content[start:start + self.stream_chunk_size]}}],
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+
+
+FAKE_OPENROUTER_KEY = web.AppKey('fake_openrouter', FakeOpenRouter)
+
+
+def create_app(fake: Optional[FakeOpenRouter] = None) -> web.Application:
+    """Build the aiohttp application serving the fake API under /api/v1"""
+    fake = fake or FakeOpenRouter()
+    app = web.Application()
+    app[FAKE_OPENROUTER_KEY] = fake
+    app.router.add_post('/api/v1/chat/completions', fake.chat_completions)
+    app.router.add_get('/stats', fake.get_stats)
+    return app
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Run the fake server
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency', default='fixed:0', help='Default latency spec, e.g. lognormal:800:0.6')
+    parser.add_argument('--model-latency', action='append', default=[],
+                        help='Per-model latency, e.g. openai/gpt-4o-mini=uniform:1200:400')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Share of requests answered with 429')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with 5xx')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    model_latency = {}
+    for spec in args.model_latency:
+        model, _, latency = spec.partition('=')
+        model_latency[model] = LatencyModel.parse(latency)
+
+    fake = FakeOpenRouter(
+        latency=LatencyModel.parse(args.latency),
+        model_latency=model_latency,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    web.run_app(create_app(fake), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
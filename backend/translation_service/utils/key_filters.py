@@ -0,0 +1,92 @@
+import fnmatch
+import re
+from datetime import datetime
+from typing import Dict, Optional
+
+GLOB_CHARACTERS = set('*?[')
+
+
+def build_lokalise_key_params(filters: Optional[Dict]) -> Dict:
+    """
+    Translate key selection filters into Lokalise "List keys" query parameters
+
+    Only filters the API can evaluate are pushed down; the rest are applied
+    locally by `key_matches_filters`.
+
+    Args:
+        filters: Key selection filters (tags, platforms, key_ids, key_name_pattern, ...)
+
+    Returns:
+        Dict of query parameters to merge into the request
+    """
+    if not filters:
+        return {}
+
+    params = {}
+    if filters.get('tags'):
+        params['filter_tags'] = ','.join(filters['tags'])
+    if filters.get('platforms'):
+        params['filter_platforms'] = ','.join(filters['platforms'])
+    if filters.get('key_ids'):
+        params['filter_key_ids'] = ','.join(str(key_id) for key_id in filters['key_ids'])
+
+    # A pattern without wildcards is an exact key name the API can match
+    pattern = filters.get('key_name_pattern')
+    if pattern and not GLOB_CHARACTERS & set(pattern):
+        params['filter_keys'] = pattern
+
+    return params
+
+
+def key_matches_filters(key: Dict, filters: Optional[Dict]) -> bool:
+    """
+    Check a key against the filters, including those Lokalise cannot evaluate
+
+    Args:
+        key: Key as returned by `LokaliseService.get_all_keys`
+        filters: Key selection filters
+
+    Returns:
+        bool: Whether the key is selected
+    """
+    if not filters:
+        return True
+
+    if filters.get('tags') and not set(filters['tags']) & set(key.get('tags') or []):
+        return False
+
+    if filters.get('platforms') and not set(filters['platforms']) & set(key.get('platforms') or []):
+        return False
+
+    if filters.get('key_ids') and int(key['key_id']) not in {int(key_id) for key_id in filters['key_ids']}:
+        return False
+
+    key_name = _key_name(key)
+    pattern = filters.get('key_name_pattern')
+    if pattern and not fnmatch.fnmatchcase(key_name, pattern):
+        return False
+
+    regex = filters.get('key_name_regex')
+    if regex and not re.search(regex, key_name):
+        return False
+
+    modified_since = filters.get('modified_since')
+    if modified_since is not None:
+        if isinstance(modified_since, datetime):
+            modified_since = modified_since.timestamp()
+        modified_at = max(
+            key.get('modified_at_timestamp') or 0,
+            key.get('translations_modified_at_timestamp') or 0
+        )
+        if modified_at < modified_since:
+            return False
+
+    return True
+
+
+def _key_name(key: Dict) -> str:
+    # Lokalise returns per-platform names as a dict; match on the web/other name
+    key_name = key.get('key_name') or ''
+    if isinstance(key_name, dict):
+        key_name = key_name.get('web') or key_name.get('other') or next(iter(key_name.values()), '')
+    return key_name
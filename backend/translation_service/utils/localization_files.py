@@ -0,0 +1,178 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+# Formats parsed locally; other supported formats are uploaded as they are
+PARSED_FORMATS = {
+    '.json': 'json',
+    '.yml': 'yaml',
+    '.yaml': 'yaml',
+}
+
+# Keys of an ICU-style plural object, which must stay in one key
+PLURAL_FORMS = {'zero', 'one', 'two', 'few', 'many', 'other'}
+
+# Separator Lokalise uses for key names of nested JSON/YAML files
+NESTED_KEY_SEPARATOR = '::'
+
+Unit = Tuple[Tuple[str, ...], Any]
+
+
+def file_format(filename: str) -> Optional[str]:
+    """Local parser format of a file, None if it isn't parsed locally"""
+    return PARSED_FORMATS.get(os.path.splitext(filename.lower())[1])
+
+
+def parse_file(filename: str, content: bytes) -> Dict:
+    """
+    Parse a JSON or YAML localization file
+
+    Raises:
+        Exception: If the format isn't parsed locally or the file is invalid
+    """
+    fmt = file_format(filename)
+    try:
+        if fmt == 'json':
+            data = json.loads(content)
+        elif fmt == 'yaml':
+            data = yaml.safe_load(content)
+        else:
+            raise Exception("unsupported format")
+    except Exception as e:
+        raise Exception(f"Could not parse {filename}: {str(e)}")
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise Exception(f"Could not parse {filename}: top level is not a mapping")
+    return data
+
+
+def dump_file(filename: str, data: Dict) -> bytes:
+    """Serialize data in the format of `filename`"""
+    if file_format(filename) == 'yaml':
+        return yaml.safe_dump(data, allow_unicode=True, sort_keys=False).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _is_plural(value: Any) -> bool:
+    return isinstance(value, dict) and bool(value) and set(value) <= PLURAL_FORMS
+
+
+def flatten(data: Dict, prefix: Tuple[str, ...] = ()) -> List[Unit]:
+    """
+    Split parsed data into keys, in file order
+
+    Each unit is (path, value): nested mappings are descended into, while
+    strings, lists and plural objects are the values of a single key.
+    """
+    units = []
+    for name, value in data.items():
+        path = prefix + (str(name),)
+        if isinstance(value, dict) and value and not _is_plural(value):
+            units.extend(flatten(value, path))
+        else:
+            units.append((path, value))
+    return units
+
+
+def unflatten(units: List[Unit]) -> Dict:
+    """Rebuild the nested structure of `units`"""
+    data: Dict = {}
+    for path, value in units:
+        node = data
+        for name in path[:-1]:
+            node = node.setdefault(name, {})
+        node[path[-1]] = value
+    return data
+
+
+def key_name(path: Tuple[str, ...]) -> str:
+    """Lokalise key name of a unit path"""
+    return NESTED_KEY_SEPARATOR.join(path)
+
+
+def split_units(units: List[Unit], chunk_keys: int) -> List[List[Unit]]:
+    """Consecutive key ranges of at most `chunk_keys` keys"""
+    return [units[start:start + chunk_keys] for start in range(0, len(units), chunk_keys)]
+
+
+def split_file(filename: str, units: List[Unit], chunk_keys: int) -> List[bytes]:
+    """
+    Serialize parsed keys as files of at most `chunk_keys` keys
+
+    Chunks are consecutive key ranges in file order, in the format of
+    `filename`, and keep the nesting of the original.
+    """
+    return [dump_file(filename, unflatten(chunk)) for chunk in split_units(units, chunk_keys)]
+
+
+def build_key_index(keys: List[Dict], lang_iso: str) -> Dict[str, Optional[str]]:
+    """
+    Map the names of existing Lokalise keys to their translation in `lang_iso`
+
+    Args:
+        keys: Keys as returned by `LokaliseService.get_all_keys`
+        lang_iso: Language of the file being uploaded
+
+    Returns:
+        Dict of key name to translation (None when the key has none in that language)
+    """
+    index = {}
+    for key in keys:
+        names = key['key_name']
+        # Lokalise keeps one name per platform
+        names = set(names.values()) if isinstance(names, dict) else {names}
+        translation = next(
+            (t['translation'] for t in key.get('translations') or [] if t['language_iso'] == lang_iso),
+            None
+        )
+        for name in names:
+            if name:
+                index[name] = translation
+    return index
+
+
+def _same_value(value: Any, translation: Optional[str]) -> bool:
+    if translation is None:
+        return False
+    if isinstance(value, str):
+        return value == translation
+    # Plural objects and lists are stored as JSON strings
+    try:
+        return json.loads(translation) == value
+    except (TypeError, ValueError):
+        return False
+
+
+def diff_units(units: List[Unit], index: Dict[str, Optional[str]]) -> Tuple[List[Unit], Dict]:
+    """
+    Keep only the keys that are new or differ from the project
+
+    Args:
+        units: Keys of the file being uploaded, from `flatten`
+        index: Existing keys, from `build_key_index`
+
+    Returns:
+        Tuple of (units to upload, report with the new/changed counts and the
+        names of the skipped keys)
+    """
+    changed = []
+    new_keys = 0
+    skipped = []
+    for path, value in units:
+        name = key_name(path)
+        if name not in index:
+            new_keys += 1
+        elif _same_value(value, index[name]):
+            skipped.append(name)
+            continue
+        changed.append((path, value))
+
+    report = {
+        'new_keys': new_keys,
+        'changed_keys': len(changed) - new_keys,
+        'skipped_keys': skipped,
+    }
+    return changed, report
@@ -0,0 +1,119 @@
+"""
+Prometheus metrics of the translation service, exposed at /metrics.
+
+With several server workers, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory so every worker's samples are aggregated into one scrape.
+"""
+from contextlib import contextmanager
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+from .tracing import span
+import functools
+import os
+import time
+
+# Lokalise calls range from ~100ms key pages to minutes-long bundle exports
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+LOKALISE_REQUEST_SECONDS = Histogram(
+    'lokalise_request_seconds',
+    'Latency of Lokalise API calls',
+    ['operation', 'project', 'outcome'],
+    buckets=LATENCY_BUCKETS
+)
+OPENROUTER_REQUEST_SECONDS = Histogram(
+    'openrouter_request_seconds',
+    'Latency of OpenRouter chat completion requests',
+    ['model', 'language', 'status'],
+    buckets=LATENCY_BUCKETS
+)
+OPENROUTER_TOKENS = Counter(
+    'openrouter_tokens',
+    'Tokens reported by OpenRouter',
+    ['model', 'language', 'kind']
+)
+CACHE_LOOKUPS = Counter(
+    'translation_cache_lookups',
+    'Translation memory and glossary cache lookups',
+    ['cache', 'language', 'result']
+)
+QUEUE_DEPTH = Gauge(
+    'translation_queue_depth',
+    'Translation jobs waiting for a scheduler worker',
+    ['language'],
+    multiprocess_mode='livesum'
+)
+LLM_REQUESTS_IN_FLIGHT = Gauge(
+    'translation_llm_requests_in_flight',
+    'LLM requests holding a concurrency slot',
+    multiprocess_mode='livesum'
+)
+RUNS_IN_FLIGHT = Gauge(
+    'translation_runs_in_flight',
+    'Translation runs in progress',
+    ['project', 'language'],
+    multiprocess_mode='livesum'
+)
+STAGE_SECONDS = Histogram(
+    'translation_stage_seconds',
+    'Duration of translation pipeline stages',
+    ['stage', 'project', 'language'],
+    buckets=LATENCY_BUCKETS
+)
+KEY_OUTCOMES = Counter(
+    'translation_key_outcomes',
+    'Per-key results of translation runs',
+    ['status', 'project', 'language']
+)
+
+
+@contextmanager
+def track_lokalise_call(operation: str, project: str):
+    """Time a Lokalise call, labelled with whether it raised, and trace it"""
+    start = time.perf_counter()
+    outcome = 'success'
+    try:
+        with span(f'lokalise.{operation}', project=project or ''):
+            yield
+    except Exception:
+        outcome = 'error'
+        raise
+    finally:
+        LOKALISE_REQUEST_SECONDS.labels(operation, project or '', outcome).observe(time.perf_counter() - start)
+
+
+def lokalise_operation(operation: str):
+    """Decorator timing a `LokaliseService` method as one Lokalise call"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with track_lokalise_call(operation, self.project_id):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_cache_lookup(cache: str, language: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache, language, 'hit' if hit else 'miss').inc()
+
+
+def render_metrics():
+    """
+    Serialize the metrics in the Prometheus text format
+
+    Returns:
+        Tuple of (body, content type)
+    """
+    registry = REGISTRY
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
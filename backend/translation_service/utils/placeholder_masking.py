@@ -0,0 +1,146 @@
+import re
+from typing import List, Optional, Tuple
+from .text_classifier import PLACEHOLDER_PATTERN
+
+SENTINEL_PATTERN = re.compile(r'⟦(\d+)⟧')
+
+ICU_HEADER_PATTERN = re.compile(r'\{\s*\w+\s*,\s*(plural|selectordinal|select)\s*,')
+ICU_SELECTOR_PATTERN = re.compile(r'\s*(?:offset:\d+\s+)?(?:=\d+|\w+)\s*\{')
+ICU_CLOSE_PATTERN = re.compile(r'\s*\}')
+
+
+def _sentinel(index: int) -> str:
+    return f'⟦{index}⟧'
+
+
+class _Masker:
+    """Collects masked fragments while walking a source string"""
+
+    def __init__(self):
+        self.placeholders: List[str] = []
+
+    def add(self, value: str) -> str:
+        self.placeholders.append(value)
+        return _sentinel(len(self.placeholders))
+
+    def mask_message(self, text: str, in_plural: bool = False) -> str:
+        """Mask ICU plural/select structure, keeping the branch texts translatable"""
+        out = []
+        pos = 0
+        while pos < len(text):
+            char = text[pos]
+            if char == '{' and ICU_HEADER_PATTERN.match(text, pos):
+                masked = self._mask_icu_block(text, pos)
+                if masked:
+                    fragment, pos = masked
+                    out.append(fragment)
+                    continue
+            if char == '#' and in_plural:
+                out.append(self.add('#'))
+                pos += 1
+                continue
+            out.append(char)
+            pos += 1
+        return ''.join(out)
+
+    def _mask_icu_block(self, text: str, start: int) -> Optional[Tuple[str, int]]:
+        checkpoint = len(self.placeholders)
+        header = ICU_HEADER_PATTERN.match(text, start)
+        in_plural = header.group(1) != 'select'
+        structure = header.group(0)
+        out = []
+        pos = header.end()
+
+        while True:
+            selector = ICU_SELECTOR_PATTERN.match(text, pos)
+            if not selector:
+                close = ICU_CLOSE_PATTERN.match(text, pos)
+                if not close:
+                    break
+                out.append(self.add(structure + close.group(0)))
+                return ''.join(out), close.end()
+
+            out.append(self.add(structure + selector.group(0)))
+            branch_end = _find_closing_brace(text, selector.end())
+            if branch_end is None:
+                break
+            out.append(self.mask_message(text[selector.end():branch_end], in_plural))
+            structure = '}'
+            pos = branch_end + 1
+
+        # Malformed block: leave it untouched
+        del self.placeholders[checkpoint:]
+        return None
+
+
+def _find_closing_brace(text: str, start: int) -> Optional[int]:
+    depth = 0
+    for pos in range(start, len(text)):
+        if text[pos] == '{':
+            depth += 1
+        elif text[pos] == '}':
+            if depth == 0:
+                return pos
+            depth -= 1
+    return None
+
+
+def mask_placeholders(text: str) -> Tuple[str, List[str]]:
+    """
+    Replace placeholders, ICU structure and markup with compact sentinel tokens
+
+    Args:
+        text: Source text
+
+    Returns:
+        Tuple of (masked text, list of original fragments; sentinel ⟦n⟧ stands for item n-1)
+    """
+    masker = _Masker()
+    # Sentinel-like text already in the source is masked first, as a fragment
+    # of its own, so it is never mistaken for one of the sentinels added here
+    masked = SENTINEL_PATTERN.sub(lambda m: masker.add(m.group(0)), text)
+    masked = masker.mask_message(masked)
+    # Placeholders and markup are replaced by a single sentinel each
+    masked = PLACEHOLDER_PATTERN.sub(lambda m: masker.add(m.group(0)), masked)
+
+    # Renumber sentinels in reading order
+    order = [int(index) for index in SENTINEL_PATTERN.findall(masked)]
+    counter = iter(range(1, len(order) + 1))
+    masked = SENTINEL_PATTERN.sub(lambda m: _sentinel(next(counter)), masked)
+    return masked, [masker.placeholders[index - 1] for index in order]
+
+
+def unmask_placeholders(text: str, placeholders: List[str]) -> str:
+    """Restore the original fragments in a masked (translated) text"""
+    def restore(match):
+        index = int(match.group(1))
+        if 1 <= index <= len(placeholders):
+            return placeholders[index - 1]
+        return match.group(0)
+
+    return SENTINEL_PATTERN.sub(restore, text)
+
+
+def find_placeholder_issues(text: str, placeholder_count: int) -> List[str]:
+    """
+    Check that a masked translation kept every sentinel exactly once
+
+    Returns:
+        List of human readable issues, empty if the translation is valid
+    """
+    found = [int(index) for index in SENTINEL_PATTERN.findall(text)]
+    issues = []
+
+    missing = sorted(set(range(1, placeholder_count + 1)) - set(found))
+    if missing:
+        issues.append(f"missing {', '.join(_sentinel(i) for i in missing)}")
+
+    duplicated = sorted({i for i in found if found.count(i) > 1})
+    if duplicated:
+        issues.append(f"duplicated {', '.join(_sentinel(i) for i in duplicated)}")
+
+    unknown = sorted({i for i in found if not 1 <= i <= placeholder_count})
+    if unknown:
+        issues.append(f"unknown {', '.join(_sentinel(i) for i in unknown)}")
+
+    return issues
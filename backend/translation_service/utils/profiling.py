@@ -0,0 +1,122 @@
+"""
+Opt-in request profiling.
+
+A profiled request is sampled by a background thread that records the stack
+of every thread at PROFILE_SAMPLE_INTERVAL_SECONDS. Coroutines show up on the
+event loop thread while they run and blocking calls offloaded with
+`asyncio.to_thread` on the worker threads, so one profile covers both. Samples
+are written in the collapsed stack format read by flamegraph.pl and
+speedscope. Other requests served by the process at the same time are
+sampled too.
+
+Pipeline stages run during the request are timed in `stage_timings`.
+"""
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Optional
+from django.conf import settings
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+# Stage durations of the profiled request, in seconds; None when not profiling
+STAGE_TIMINGS: ContextVar[Optional[Dict[str, float]]] = ContextVar('stage_timings', default=None)
+
+
+def record_stage_timing(stage: str, seconds: float) -> None:
+    """Add the duration of a pipeline stage to the profiled request, if any"""
+    timings = STAGE_TIMINGS.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+def profiles_directory() -> Path:
+    return Path(settings.TRANSLATION_STATE_DIR) / 'profiles'
+
+
+def profile_path(profile_id: str) -> Path:
+    return profiles_directory() / f'{profile_id}.txt'
+
+
+class RequestProfile:
+    """
+    Sample the stacks of all threads and time pipeline stages while active
+
+    Usage:
+        profile = RequestProfile()
+        profile.start()
+        ...
+        profile.stop()
+        profile.save()
+    """
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = settings.PROFILE_SAMPLE_INTERVAL_SECONDS if interval is None else interval
+        self.id = uuid.uuid4().hex
+        self.samples: Counter = Counter()
+        self.stage_timings: Dict[str, float] = {}
+        self.duration = 0.0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._token = None
+        self._start = 0.0
+
+    def start(self) -> None:
+        self._token = STAGE_TIMINGS.set(self.stage_timings)
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, name='request-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._start
+        STAGE_TIMINGS.reset(self._token)
+
+    def _sample(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def server_timing(self) -> str:
+        """Stage timings as a Server-Timing header value, in milliseconds"""
+        entries = [f'{stage};dur={seconds * 1000:.1f}' for stage, seconds in self.stage_timings.items()]
+        entries.append(f'total;dur={self.duration * 1000:.1f}')
+        return ', '.join(entries)
+
+    def save(self) -> Path:
+        """Write the samples to `profiles/{id}.txt` in the collapsed stack format"""
+        directory = profiles_directory()
+        directory.mkdir(parents=True, exist_ok=True)
+        _prune(directory)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f'{stack} {count}\n')
+        path = profile_path(self.id)
+        os.replace(tmp_path, path)
+        return path
+
+
+def _prune(directory: Path) -> None:
+    cutoff = time.time() - settings.PROFILE_RETENTION_SECONDS
+    for path in directory.glob('*.txt'):
+        try:
+            if path.stat().st_mtime < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
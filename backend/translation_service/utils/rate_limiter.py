@@ -0,0 +1,38 @@
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Space out calls to at most `rate` per second.
+
+    Each `acquire` reserves the next free slot before sleeping, so callers on
+    the same event loop are released one interval apart in arrival order.
+    Code running in worker threads (`asyncio.to_thread`) takes its slots with
+    the blocking `wait` from the same schedule. A rate of 0 disables the limit.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Reserve the next free slot and return how long to wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        return slot - now
+
+    async def acquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def wait(self) -> None:
+        """Blocking `acquire`, for calls made from worker threads"""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
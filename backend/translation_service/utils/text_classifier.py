@@ -0,0 +1,54 @@
+import re
+import string
+from typing import AbstractSet, Optional
+
+# Placeholders and markup that carry no translatable text
+PLACEHOLDER_PATTERN = re.compile(
+    r'\{\{\s*[\w.\-]+\s*\}\}'                                   # {{var}}
+    r'|\{\s*[\w.\-]+\s*(?:,\s*(?:number|date|time)\s*(?:,\s*[\w\-:]+\s*)?)?\}'  # {var}, {0}, {n, number}
+    r'|%(?:\d+\$)?[-+ 0#]*\d*(?:\.\d+)?[sdifuxXoeEgGc@]'        # %s, %1$d, %.2f, %@
+    r'|%\(\w+\)[sdif]'                                          # %(name)s
+    r'|\[%[^\]]*\]'                                             # Lokalise universal placeholders
+    r'|<[^<>]+>'                                                # HTML/XML tags
+    r'|&(?:\w+|#\d+);'                                          # HTML entities
+)
+URL_PATTERN = re.compile(r'^(?:https?://|www\.)\S+$', re.IGNORECASE)
+EMAIL_PATTERN = re.compile(r'^[\w.+\-]+@[\w\-]+(?:\.[\w\-]+)+$')
+NUMERIC_PATTERN = re.compile(r'^[\d\s.,:;%+\-−*/×x()#$€£¥₩]+$')
+
+
+def classify_source_text(text: str, do_not_translate: AbstractSet[str] = frozenset()) -> Optional[str]:
+    """
+    Detect source texts that do not need an LLM translation
+
+    Args:
+        text: Source text of a key
+        do_not_translate: Lowercased product names and other terms that are never translated
+
+    Returns:
+        str: Reason the text can be copied as-is, or None if it needs translating
+    """
+    stripped = text.strip()
+    if not stripped:
+        return 'empty'
+
+    if stripped.lower() in do_not_translate:
+        return 'do_not_translate'
+
+    if URL_PATTERN.match(stripped):
+        return 'url'
+
+    if EMAIL_PATTERN.match(stripped):
+        return 'email'
+
+    if NUMERIC_PATTERN.match(stripped) and any(ch.isdigit() for ch in stripped):
+        return 'numeric'
+
+    remainder = PLACEHOLDER_PATTERN.sub('', stripped)
+    if remainder != stripped and not remainder.strip(string.whitespace + string.punctuation):
+        return 'placeholders_only'
+
+    if not any(ch.isalpha() for ch in stripped):
+        return 'no_letters'
+
+    return None
@@ -0,0 +1,237 @@
+"""
+Lightweight tracing of translation runs.
+
+A run is traced between `trace_run` and its end: every `span` opened in the
+meantime, in the run's tasks and in the threads it starts with
+`asyncio.to_thread`, is recorded with the run id, its parent span and its
+start and end times. Outside a traced run, `span` does nothing.
+
+When the run ends its spans go to the exporters in TRACE_EXPORTERS:
+  - 'jsonl': one span per line in `TRANSLATION_STATE_DIR/traces/<run_id>.jsonl`
+  - 'otlp': OTLP/HTTP JSON posted to TRACE_OTLP_ENDPOINT (a local collector)
+
+`waterfall` lays the spans of a run out by start offset and depth.
+"""
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Optional
+from django.conf import settings
+import asyncio
+import json
+import os
+import requests
+import tempfile
+import time
+import uuid
+
+
+class Trace:
+    """Spans recorded for one run, capped at TRACE_MAX_SPANS"""
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.spans: List[Dict] = []
+        self.dropped = 0
+
+    def add(self, span: Dict) -> None:
+        # list.append is atomic, so spans may end in any thread
+        if len(self.spans) < settings.TRACE_MAX_SPANS:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+
+CURRENT_TRACE: ContextVar[Optional[Trace]] = ContextVar('current_trace', default=None)
+CURRENT_SPAN: ContextVar[Optional[str]] = ContextVar('current_span', default=None)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Record a span around a block of the current run
+
+    Yields the span's attributes, so the block can add to them. Exceptions
+    mark the span as failed and propagate.
+    """
+    trace = CURRENT_TRACE.get()
+    if trace is None:
+        yield attributes
+        return
+
+    record = {
+        'run_id': trace.run_id,
+        'span_id': uuid.uuid4().hex[:16],
+        'parent_id': CURRENT_SPAN.get(),
+        'name': name,
+        'start': time.time(),
+        'attributes': attributes,
+        'status': 'ok',
+    }
+    token = CURRENT_SPAN.set(record['span_id'])
+    start = time.perf_counter()
+    try:
+        yield attributes
+    except BaseException as e:
+        record['status'] = 'error'
+        record['error'] = str(e) or type(e).__name__
+        raise
+    finally:
+        record['duration_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        CURRENT_SPAN.reset(token)
+        trace.add(record)
+
+
+@asynccontextmanager
+async def trace_run(run_id: Optional[str] = None):
+    """
+    Trace a run, or join the run already traced in this context
+
+    Args:
+        run_id: Id of the run (32 hex digits); a new one is generated if omitted
+
+    Yields:
+        The Trace of the run
+    """
+    trace = CURRENT_TRACE.get()
+    if trace is not None:
+        yield trace
+        return
+
+    trace = Trace(run_id or uuid.uuid4().hex)
+    token = CURRENT_TRACE.set(trace)
+    try:
+        yield trace
+    finally:
+        CURRENT_TRACE.reset(token)
+        if trace.dropped:
+            print(f"Trace {trace.run_id}: dropped {trace.dropped} spans over TRACE_MAX_SPANS")
+        await asyncio.to_thread(export, trace)
+
+
+def export(trace: Trace) -> None:
+    """Send the spans of a finished run to the configured exporters"""
+    if not trace.spans:
+        return
+    for exporter in settings.TRACE_EXPORTERS:
+        try:
+            if exporter == 'jsonl':
+                write_jsonl(trace)
+            elif exporter == 'otlp':
+                post_otlp(trace)
+        except Exception as e:
+            print(f"Error exporting trace {trace.run_id} to {exporter}: {str(e)}")
+
+
+def traces_directory() -> Path:
+    return Path(settings.TRANSLATION_STATE_DIR) / 'traces'
+
+
+def trace_path(run_id: str) -> Path:
+    return traces_directory() / f'{run_id}.jsonl'
+
+
+def write_jsonl(trace: Trace) -> Path:
+    directory = traces_directory()
+    directory.mkdir(parents=True, exist_ok=True)
+    _prune(directory)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        for record in trace.spans:
+            f.write(json.dumps(record, default=str))
+            f.write('\n')
+    path = trace_path(trace.run_id)
+    os.replace(tmp_path, path)
+    return path
+
+
+def to_otlp(trace: Trace) -> Dict:
+    """Spans of a run as an OTLP/JSON ExportTraceServiceRequest"""
+    spans = []
+    for record in trace.spans:
+        start_ns = int(record['start'] * 1e9)
+        attributes = [
+            {'key': key, 'value': {'stringValue': str(value)}}
+            for key, value in record['attributes'].items()
+        ]
+        attributes.append({'key': 'run_id', 'value': {'stringValue': trace.run_id}})
+        otlp_span = {
+            'traceId': trace.run_id,
+            'spanId': record['span_id'],
+            'name': record['name'],
+            'kind': 1,
+            'startTimeUnixNano': str(start_ns),
+            'endTimeUnixNano': str(start_ns + int(record['duration_ms'] * 1e6)),
+            'attributes': attributes,
+            # STATUS_CODE_OK = 1, STATUS_CODE_ERROR = 2
+            'status': {'code': 2, 'message': record['error']} if record['status'] == 'error' else {'code': 1},
+        }
+        if record['parent_id']:
+            otlp_span['parentSpanId'] = record['parent_id']
+        spans.append(otlp_span)
+
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': 'translation-service'}}]},
+            'scopeSpans': [{'scope': {'name': 'translation_service'}, 'spans': spans}],
+        }]
+    }
+
+
+def post_otlp(trace: Trace) -> None:
+    response = requests.post(
+        settings.TRACE_OTLP_ENDPOINT,
+        json=to_otlp(trace),
+        timeout=settings.TRACE_OTLP_TIMEOUT_SECONDS
+    )
+    if response.status_code >= 300:
+        raise Exception(f"Collector returned {response.status_code}: {response.text}")
+
+
+def load_trace(run_id: str) -> List[Dict]:
+    """Read the spans of a run exported to JSON lines"""
+    try:
+        with open(trace_path(run_id), 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        raise Exception(f"Unknown trace: {run_id}")
+
+
+def waterfall(spans: List[Dict]) -> List[Dict]:
+    """
+    Order spans by start time and add each one's offset from the start of
+    the run and its depth in the span tree
+
+    Returns:
+        List of spans with `offset_ms` and `depth`
+    """
+    if not spans:
+        return []
+    by_id = {record['span_id']: record for record in spans}
+    run_start = min(record['start'] for record in spans)
+
+    def depth(record: Dict) -> int:
+        level = 0
+        while record['parent_id'] in by_id:
+            record = by_id[record['parent_id']]
+            level += 1
+        return level
+
+    rows = []
+    for record in sorted(spans, key=lambda record: record['start']):
+        rows.append({
+            **record,
+            'offset_ms': round((record['start'] - run_start) * 1000, 3),
+            'depth': depth(record),
+        })
+    return rows
+
+
+def _prune(directory: Path) -> None:
+    cutoff = time.time() - settings.TRACE_RETENTION_SECONDS
+    for path in directory.glob('*.jsonl'):
+        try:
+            if path.stat().st_mtime < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -36,6 +36,12 @@ LOKALISE_SUPPORTED_FORMATS: Dict[str, str] = {
     '.nested.yaml': 'Nested YAML'
 }
 
+# Formats the export endpoint can request from Lokalise
+LOKALISE_EXPORT_FORMATS = [
+    'json', 'json_structured', 'yaml', 'xml', 'strings', 'stringsdict', 'plist',
+    'properties', 'po', 'xliff', 'resx', 'arb', 'csv', 'xlsx', 'ini', 'ts'
+]
+
 def validate_target_language(target_language: str) -> str:
     """
     Validate if the target language is supported
@@ -1,28 +1,65 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .services import TranslationService
+from .services import registry
 from .serializers import (
+    BulkUploadSerializer,
+    ExportSerializer,
     FileUploadSerializer,
-    QualityCheckSerializer
+    KeyFilterSerializer,
+    QualityCheckBatchSerializer,
+    QualityCheckSerializer,
+    SchedulingSerializer
 )
+from .mixins import AsyncViewSetMixin
+from .utils.metrics import RUNS_IN_FLIGHT, render_metrics
+from .utils.profiling import profile_path
+from .utils.tracing import load_trace, trace_run, waterfall
+from .services.result_store import RunResultStore
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
 from typing import Dict, Any
-from .services.translation_pipeline import TranslationPipeline
-from .services.lokalise_service import LokaliseService
-import requests
-from asgiref.sync import async_to_sync
-
-class TranslationViewSet(viewsets.ViewSet):    
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.translation_pipeline = TranslationPipeline()
-        self.lokalise_service = LokaliseService()
-        self.translation_service = TranslationService()
+from .services import BulkUploader, ExportCache, LokaliseService, RunCoalescer, TranslationPipeline, TranslationService
+import asyncio
+import os
+import uuid
+
+class TranslationViewSet(AsyncViewSetMixin, viewsets.ViewSet):
+    # Actions are async; blocking Lokalise calls and CPU-bound scoring run in threads
+    # Services are process-wide singletons, built on first use (or at worker start)
+    @property
+    def translation_pipeline(self) -> TranslationPipeline:
+        return registry.translation_pipeline
+
+    @property
+    def lokalise_service(self) -> LokaliseService:
+        return registry.lokalise_service
+
+    @property
+    def translation_service(self) -> TranslationService:
+        return registry.translation_service
+
+    @property
+    def bulk_uploader(self) -> BulkUploader:
+        return registry.bulk_uploader
+
+    @property
+    def export_cache(self) -> ExportCache:
+        return registry.export_cache
+
+    @property
+    def run_coalescer(self) -> RunCoalescer:
+        return registry.run_coalescer
 
     @action(detail=False, methods=['POST'], url_path='upload-file')
-    def upload_file(self, request) -> Response:
+    async def upload_file(self, request) -> Response:
         """
         Upload a file to Lokalise for translation
+
+        With `split`, a big JSON/YAML file is uploaded as parallel key-range
+        chunks and the response is the merged report of their imports.
+        With `diff`, only keys that are new or differ from the project are
+        uploaded and the skipped ones are reported.
         """
         serializer = FileUploadSerializer(data=request.data)
         if not serializer.is_valid():
@@ -31,9 +68,31 @@ class TranslationViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        if serializer.validated_data['split'] or serializer.validated_data['diff']:
+            file = serializer.validated_data['file']
+            try:
+                outcomes = await self.bulk_uploader.upload(
+                    [(file.name, file)],
+                    lang_iso=serializer.validated_data['lang_iso'],
+                    detect_icu_plurals=serializer.validated_data['detect_icu_plurals'],
+                    tags=serializer.validated_data.get('tags'),
+                    split=serializer.validated_data['split'],
+                    diff=serializer.validated_data['diff']
+                )
+            except Exception as e:
+                return Response(
+                    {"error": str(e)},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+            return Response(
+                outcomes[0],
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR if outcomes[0]['status'] == 'error' else status.HTTP_200_OK
+            )
+
         try:
             file = request.FILES['file']
-            result = self.lokalise_service.upload_file(
+            result = await asyncio.to_thread(
+                self.lokalise_service.upload_file,
                 file=file,
                 filename=file.name,
                 lang_iso=serializer.validated_data['lang_iso'],
@@ -49,10 +108,114 @@ class TranslationViewSet(viewsets.ViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=False, methods=['POST'], url_path='bulk-upload')
+    async def bulk_upload(self, request) -> Response:
+        """
+        Upload many files, or a zip archive of them, to Lokalise
+
+        Files are uploaded concurrently; with `wait` (default) the response
+        is sent once every import finished, failed or timed out.
+        """
+        serializer = BulkUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        data = serializer.validated_data
+
+        files = [(file.name, file) for file in data['files']]
+        outcomes = []
+        if data.get('archive'):
+            try:
+                archive_files, outcomes = await asyncio.to_thread(
+                    self.bulk_uploader.expand_archive, data['archive']
+                )
+            except Exception as e:
+                return Response(
+                    {"error": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            files.extend(archive_files)
+
+        try:
+            outcomes.extend(await self.bulk_uploader.upload(
+                files,
+                lang_iso=data['lang_iso'],
+                detect_icu_plurals=data['detect_icu_plurals'],
+                tags=data['tags'],
+                wait=data['wait'],
+                split=data['split'],
+                diff=data['diff']
+            ))
+        except Exception as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        finally:
+            for _, file in files:
+                file.close()
+
+        summary = {'total': len(outcomes), 'success': 0, 'pending': 0, 'error': 0, 'skipped': 0}
+        for outcome in outcomes:
+            summary[outcome['status']] += 1
+        summary['files'] = outcomes
+        return Response(summary, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['GET'])
+    async def export(self, request):
+        """
+        Download the project's translations as a zip bundle
+
+        Query params `file_format` (default json) and `languages` (comma-separated,
+        default all). Bundles are cached per project state and revalidated
+        with ETag / If-None-Match.
+        """
+        serializer = ExportSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        file_format = serializer.validated_data['file_format']
+        languages = serializer.validated_data['languages']
+
+        try:
+            path, etag = await self.export_cache.get_bundle_async(file_format, languages)
+        except Exception as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_502_BAD_GATEWAY
+            )
+
+        quoted_etag = f'"{etag}"'
+        # GZipMiddleware weakens ETags, so compare without the W/ prefix
+        if_none_match = request.headers.get('If-None-Match', '')
+        if quoted_etag in (tag.strip().removeprefix('W/') for tag in if_none_match.split(',')):
+            response = HttpResponseNotModified()
+        else:
+            bundle = open(path, 'rb')
+            response = StreamingHttpResponse(self._stream_file(bundle), content_type='application/zip')
+            response['Content-Disposition'] = f'attachment; filename="translations-{file_format}.zip"'
+            response['Content-Length'] = str(os.fstat(bundle.fileno()).st_size)
+        response['ETag'] = quoted_etag
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+    @staticmethod
+    async def _stream_file(file, chunk_size: int = 64 * 1024):
+        # Async iterator, so ASGI streams the file instead of buffering it
+        try:
+            while chunk := await asyncio.to_thread(file.read, chunk_size):
+                yield chunk
+        finally:
+            file.close()
+
     @action(detail=False, methods=['post'])
-    def check_quality(self, request) -> Response:
+    async def check_quality(self, request) -> Response:
         """
-        Check translation quality and compute BLEU score between existing and LLM translations
+        Check translation quality and compute BLEU and chrF scores between existing and LLM translations
         """
         try:
             source_text = request.data.get('source_text')
@@ -67,12 +230,40 @@ class TranslationViewSet(viewsets.ViewSet):
                 )
 
             # Use translation service for quality check
-            result = self.translation_service.check_translation_quality(
+            result = await asyncio.to_thread(
+                self.translation_service.check_translation_quality,
                 source_text,
                 existing_translation,
                 llm_translation,
+                target_language
+            )
+
+            return Response(result, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    @action(detail=False, methods=['POST'], url_path='check-quality-batch')
+    async def check_quality_batch(self, request) -> Response:
+        """
+        Compute BLEU and chrF scores for a list of (existing, LLM) translation
+        pairs, plus the corpus-level scores of the whole batch
+        """
+        serializer = QualityCheckBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
             )
 
+        try:
+            result = await asyncio.to_thread(
+                self.translation_service.check_translation_quality_batch,
+                serializer.validated_data['pairs'],
+                serializer.validated_data['target_language']
+            )
             return Response(result, status=status.HTTP_200_OK)
         except Exception as e:
             return Response(
@@ -81,16 +272,35 @@ class TranslationViewSet(viewsets.ViewSet):
             )
 
     @action(detail=False, methods=['POST'], url_path='process-translations')
-    def process_translations(self, request) -> Response:
+    async def process_translations(self, request) -> Response:
         """
         Process translations for all keys in Lokalise:
         1. Get keys from Lokalise
         2. Translate each key using AI
         3. Upload translations back to Lokalise
+
+        With `dry_run` set, only returns the estimated plan for the run.
+        `filters` restricts the run to keys matching tags, platforms, key ids,
+        a key name glob/regex or a modified-since timestamp. `incremental`
+        retranslates existing translations whose source text changed.
+        `priority_tags` and `time_budget_seconds` control scheduling; keys not
+        started within the budget are reported as deferred.
+        `evaluate` scores new translations against existing ones;
+        `skip_similar_threshold` (chrF, 0-1) also skips uploading those that
+        are near-identical.
+
+        Identical concurrent requests share one run (`coalesced` in the
+        response). Retries carrying the same `Idempotency-Key` header get the
+        stored run back instead of starting a new one.
         """
         target_language = request.data.get('target_language')
         source_language = request.data.get('source_language', 'en')
         force_translate = request.data.get('force_translate', False)
+        incremental = request.data.get('incremental', False)
+        time_budget = request.data.get('time_budget_seconds')
+        evaluate = request.data.get('evaluate', False)
+        skip_similar_threshold = request.data.get('skip_similar_threshold')
+        dry_run = request.data.get('dry_run', False)
 
         if not target_language:
             return Response(
@@ -98,21 +308,198 @@ class TranslationViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Convert async call to sync
-        results = async_to_sync(self.translation_pipeline.process_translations)(
-            target_language=target_language,
-            source_language=source_language,
-            force_translate=force_translate
-        )
+        filters_serializer = KeyFilterSerializer(data=request.data.get('filters') or {})
+        if not filters_serializer.is_valid():
+            return Response(
+                {"error": "Invalid filters", "filters": filters_serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        key_filters = filters_serializer.validated_data or None
+
+        scheduling_serializer = SchedulingSerializer(data={'priority_tags': request.data.get('priority_tags')})
+        if not scheduling_serializer.is_valid():
+            return Response(
+                scheduling_serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        priority_tags = scheduling_serializer.validated_data['priority_tags']
+
+        if time_budget is not None:
+            try:
+                time_budget = float(time_budget)
+            except (TypeError, ValueError):
+                return Response(
+                    {"error": "time_budget_seconds must be a number"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
-        summary = {
-            'total_processed': len(results),
-            'successful': len([r for r in results if r['status'] == 'success']),
-            'failed': len([r for r in results if r['status'] == 'error']),
-            'skipped': len([r for r in results if r['status'] == 'skipped']),
-            'new_translations': len([r for r in results if r['status'] == 'success' and r.get('is_new_translation', False)]),
-            'updated_translations': len([r for r in results if r['status'] == 'success' and not r.get('is_new_translation', False)]),
-            'details': results
+        if skip_similar_threshold is not None:
+            try:
+                skip_similar_threshold = float(skip_similar_threshold)
+            except (TypeError, ValueError):
+                skip_similar_threshold = None
+            if skip_similar_threshold is None or not 0 <= skip_similar_threshold <= 1:
+                return Response(
+                    {"error": "skip_similar_threshold must be a number between 0 and 1"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        if dry_run:
+            plan = await asyncio.to_thread(
+                self.translation_pipeline.plan_translations,
+                target_language=target_language,
+                source_language=source_language,
+                force_translate=force_translate,
+                key_filters=key_filters,
+                incremental=incremental
+            )
+            return Response(plan, status=status.HTTP_200_OK)
+
+        options = {
+            'force_translate': force_translate,
+            'key_filters': key_filters,
+            'incremental': incremental,
+            'priority_tags': priority_tags,
+            'time_budget': time_budget,
+            'evaluate': evaluate,
+            'skip_similar_threshold': skip_similar_threshold
         }
+        run_key = self.run_coalescer.run_key(
+            self.lokalise_service.project_id, source_language, target_language, options
+        )
+
+        idempotency_key = request.headers.get('Idempotency-Key')
+        if idempotency_key:
+            record = await asyncio.to_thread(self.run_coalescer.get_idempotent, idempotency_key)
+            if record is not None:
+                if record['run_key'] != run_key:
+                    return Response(
+                        {"error": "Idempotency-Key was already used for a different request"},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                    )
+                try:
+                    store = RunResultStore.open(record['run_id'])
+                except Exception:
+                    store = None
+                if store is not None:
+                    response = await self._run_response(store, coalesced=True)
+                    response['Idempotent-Replayed'] = 'true'
+                    return response
+
+        async def start_run() -> RunResultStore:
+            # The run id names both the run's trace and its stored results
+            run_id = uuid.uuid4().hex
+            store = RunResultStore(run_id)
+            with RUNS_IN_FLIGHT.labels(self.lokalise_service.project_id or '', target_language).track_inprogress():
+                # Results are written and counted as the pipeline produces them
+                await asyncio.to_thread(store.start)
+                try:
+                    async with trace_run(run_id):
+                        await self.translation_pipeline.process_translations(
+                            target_language=target_language,
+                            source_language=source_language,
+                            result_store=store,
+                            **options
+                        )
+                finally:
+                    await asyncio.to_thread(store.finish)
+            return store
+
+        store, coalesced = await self.run_coalescer.run(run_key, start_run)
+        if idempotency_key:
+            await asyncio.to_thread(self.run_coalescer.save_idempotent, idempotency_key, run_key, store.run_id)
+        return await self._run_response(store, coalesced)
+
+    @staticmethod
+    async def _run_response(store: RunResultStore, coalesced: bool) -> Response:
+        details, next_cursor = await asyncio.to_thread(store.page)
+
+        summary = dict(store.counters)
+        summary['run_id'] = store.run_id
+        summary['coalesced'] = coalesced
+        summary['details'] = details
+        summary['next_cursor'] = next_cursor
+
+        return Response(summary, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['GET'], url_path=r'runs/(?P<run_id>[0-9a-f]{32})/details')
+    async def run_details(self, request, run_id=None) -> Response:
+        """
+        Page through the per-key results of a run
+
+        Query params `cursor` (from a previous page's `next_cursor`) and `limit`.
+        """
+        try:
+            limit = int(request.query_params.get('limit') or settings.RESULT_PAGE_SIZE)
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= settings.RESULT_PAGE_MAX_SIZE:
+            return Response(
+                {"error": f"limit must be between 1 and {settings.RESULT_PAGE_MAX_SIZE}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            store = RunResultStore.open(run_id)
+            details, next_cursor = await asyncio.to_thread(
+                store.page, request.query_params.get('cursor'), limit
+            )
+        except Exception as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response(
+            {'run_id': run_id, 'details': details, 'next_cursor': next_cursor},
+            status=status.HTTP_200_OK
+        )
+
+    @action(detail=False, methods=['GET'], url_path=r'runs/(?P<run_id>[0-9a-f]{32})/trace')
+    async def run_trace(self, request, run_id=None) -> Response:
+        """
+        Spans of a run as a waterfall: ordered by start, with each span's
+        `offset_ms` from the start of the run and its `depth`
+        """
+        try:
+            spans = await asyncio.to_thread(load_trace, run_id)
+        except Exception as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response(
+            {'run_id': run_id, 'spans': waterfall(spans)},
+            status=status.HTTP_200_OK
+        )
+
+    @action(detail=False, methods=['GET'], url_path=r'profiles/(?P<profile_id>[0-9a-f]{32})')
+    async def profile(self, request, profile_id=None):
+        """
+        Download a request profile, in the collapsed stack format
+
+        Profiles are recorded for requests sent with `X-Profile: 1` when
+        REQUEST_PROFILING_ENABLED is set; the id is in their X-Profile-Id header.
+        """
+        if not (settings.REQUEST_PROFILING_ENABLED or settings.PROFILE_ALL_REQUESTS):
+            return Response(
+                {"error": "Profiling is disabled"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        try:
+            file = await asyncio.to_thread(open, profile_path(profile_id), 'rb')
+        except FileNotFoundError:
+            return Response(
+                {"error": "Unknown profile"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        response = StreamingHttpResponse(self._stream_file(file), content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="profile-{profile_id}.txt"'
+        return response
+
 
-        return Response(summary, status=status.HTTP_200_OK) 
\ No newline at end of file
+def metrics(request) -> HttpResponse:
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)